@@ -1,402 +1,530 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import time
-import base64
-import tempfile
-from gtts import gTTS
-from modules.auth import create_user, verify_user
+from modules import metrics, session_store
+from modules.lazy import LazyModule, warm_up
 
-from modules.resume_parser import parse_resume
-from modules.question_generator import generate_questions
-from modules.faq_bot import faq_chatbot
-from modules.video_recorder import video_interview_ui
+# Page modules load on first use; see modules/lazy.py.
+auth = LazyModule("modules.auth")
+resume_parser = LazyModule("modules.resume_parser")
+question_generator = LazyModule("modules.question_generator")
+faq_bot = LazyModule("modules.faq_bot")
+video_recorder = LazyModule("modules.video_recorder")
+tts = LazyModule("modules.tts")
 
 st.set_page_config(layout="wide", page_title="Interview Bot", page_icon="🤖")
+metrics.start_exporters()
+metrics.start_rerun(st.session_state.get("page", "Home"))
 
-# -------------------- Theming & Global Styles --------------------
-st.markdown(
-    """
-    <style>
-      .main {
-        background: radial-gradient(1200px 800px at 10% 10%, rgba(76,175,80,0.08), transparent 40%),
-                    radial-gradient(1200px 800px at 90% 20%, rgba(33,150,243,0.08), transparent 40%);
-      }
-      .app-card {
-        background: rgba(255,255,255,0.75);
-        border: 1px solid rgba(0,0,0,0.06);
-        border-radius: 14px;
-        padding: 18px 18px 8px 18px;
-        box-shadow: 0 6px 18px rgba(0,0,0,0.06);
-        backdrop-filter: blur(6px);
-      }
-      .timer {
-        font-weight: 700; font-size: 18px;
-        background: #111; color: #fff; display: inline-block; padding: 6px 12px; border-radius: 10px;
-      }
-      /* Sidebar enhancements */
-      section[data-testid="stSidebar"] .stButton > button {
-        background: linear-gradient(135deg, #1f2937, #111827);
-        border: 1px solid rgba(255,255,255,0.08);
-      }
-      section[data-testid="stSidebar"] .stButton > button:hover {
-        background: linear-gradient(135deg, #10b981, #059669);
-        box-shadow: 0 8px 18px rgba(16,185,129,.35);
-      }
-      section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] h2, 
-      section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] h3 {
-        color: #e5e7eb;
-      }
-    </style>
-    """,
-    unsafe_allow_html=True,
-)
-
-# -------------------- Initialize Session --------------------
-if "questions" not in st.session_state:
-    st.session_state.questions = []
-if "current_index" not in st.session_state:
-    st.session_state.current_index = 0
-if "resume_text" not in st.session_state:
-    st.session_state.resume_text = ""
-if "timer" not in st.session_state:
-    st.session_state.timer = 60
-if "video_started" not in st.session_state:
-    st.session_state.video_started = False
-if "last_spoken_index" not in st.session_state:
-    st.session_state.last_spoken_index = -1
-if "waiting_for_audio" not in st.session_state:
-    st.session_state.waiting_for_audio = False
-if "page" not in st.session_state:
-    st.session_state.page = "Upload Resume"
-if "started" not in st.session_state:
-    st.session_state.started = False
-if "authenticated" not in st.session_state:
-    st.session_state.authenticated = False
-if "login_prompt" not in st.session_state:
-    st.session_state.login_prompt = False
-
-# Title/caption visible only after successful login
-if st.session_state.get("authenticated", False):
-    st.title("🤖 Interview Bot")
-    st.caption("AI-powered resume-based interview practice with video recording and HR FAQ bot")
-
-# -------------------- Landing Page (shown until Start Now) --------------------
-if not st.session_state.started:
-    # Hide sidebar visually on landing
+# Everything below is one run; however it ends (end of script, st.stop,
+# st.rerun, an exception or an interrupting rerun) the run is recorded once.
+try:
+    # -------------------- Theming & Global Styles --------------------
     st.markdown(
         """
         <style>
-          section[data-testid="stSidebar"] {display: none;} 
+          .main {
+            background: radial-gradient(1200px 800px at 10% 10%, rgba(76,175,80,0.08), transparent 40%),
+                        radial-gradient(1200px 800px at 90% 20%, rgba(33,150,243,0.08), transparent 40%);
+          }
+          .app-card {
+            background: rgba(255,255,255,0.75);
+            border: 1px solid rgba(0,0,0,0.06);
+            border-radius: 14px;
+            padding: 18px 18px 8px 18px;
+            box-shadow: 0 6px 18px rgba(0,0,0,0.06);
+            backdrop-filter: blur(6px);
+          }
+          .timer {
+            font-weight: 700; font-size: 18px;
+            background: #111; color: #fff; display: inline-block; padding: 6px 12px; border-radius: 10px;
+          }
+          /* Sidebar enhancements */
+          section[data-testid="stSidebar"] .stButton > button {
+            background: linear-gradient(135deg, #1f2937, #111827);
+            border: 1px solid rgba(255,255,255,0.08);
+          }
+          section[data-testid="stSidebar"] .stButton > button:hover {
+            background: linear-gradient(135deg, #10b981, #059669);
+            box-shadow: 0 8px 18px rgba(16,185,129,.35);
+          }
+          section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] h2, 
+          section[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] h3 {
+            color: #e5e7eb;
+          }
         </style>
         """,
         unsafe_allow_html=True,
     )
 
-    # Header: logo left, Sign Up right
-    c1, c2 = st.columns([3,1])
-    with c1:
-        st.markdown("### interview.co")
-    with c2:
-        if st.button("Sign Up", key="landing_signup"):
-            st.session_state.started = True
-            st.session_state.page = "Sign Up"
-            st.rerun()
-
-    st.markdown("---")
-    hc1, hc2 = st.columns([1.2,1])
-    with hc1:
-        st.markdown("## Mock Interviews to Mastery. Prepare, practice and own the real one.")
-        st.write("AI-based practice to help you be ready for the real interview.")
-        if st.button("Start Now!", type="primary"):
+    # -------------------- Initialize Session --------------------
+    # Interview progress (questions, index, timer, resume text) lives in the
+    # server-side session store; see _interview_session() below.
+    if "video_started" not in st.session_state:
+        st.session_state.video_started = False
+    if "page" not in st.session_state:
+        st.session_state.page = "Upload Resume"
+    if "started" not in st.session_state:
+        st.session_state.started = False
+    if "authenticated" not in st.session_state:
+        st.session_state.authenticated = False
+    if "login_prompt" not in st.session_state:
+        st.session_state.login_prompt = False
+    if "question_stream" not in st.session_state:
+        st.session_state.question_stream = None
+    if "access_token" not in st.session_state:
+        st.session_state.access_token = None
+
+    # -------------------- Token Session --------------------
+    # The refresh token lives in the URL so a reconnect to any replica can resume
+    # the session; the short-lived access token is re-checked on every rerun.
+    def _restore_auth():
+        access = st.session_state.access_token
+        refresh = st.query_params.get("session")
+        if not access and not refresh:
+            # Anonymous visitor: no need to load the auth stack yet.
+            st.session_state.authenticated = False
+            return
+        if access and auth.verify_token(access):
+            st.session_state.authenticated = True
+            return
+        tokens = auth.refresh_tokens(refresh) if refresh else None
+        if tokens:
+            st.session_state.access_token = tokens["access"]
+            st.query_params["session"] = tokens["refresh"]
+            st.session_state.authenticated = True
             st.session_state.started = True
-            st.session_state.page = "Sign Up"
-            st.session_state.login_prompt = True
-            st.rerun()
-    with hc2:
-        st.image("https://images.unsplash.com/photo-1522199710521-72d69614c702?q=80&w=1200&auto=format&fit=crop", use_column_width=True)
-
-    st.stop()
-
-# -------------------- Custom Sidebar Menu --------------------
-sidebar_style = """
-    <style>
-        .stButton > button {
-            width: 100%;
-            background-color: #262730;
-            color: white;
-            padding: 10px;
-            border-radius: 10px;
-            text-align: left;
-            font-size: 16px;
-            transition: all 0.3s ease-in-out;
-            border: none;
-            margin-bottom: 10px;
-        }
-        .stButton > button:hover {
-            background-color: #4CAF50;
-            transform: scale(1.05);
-            box-shadow: 0px 0px 10px rgba(76, 175, 80, 0.8);
-        }
-        .active-btn {
-            background-color: #4CAF50 !important;
-            font-weight: bold;
-        }
-    </style>
-"""
-st.markdown(sidebar_style, unsafe_allow_html=True)
-
-if st.session_state.started and st.session_state.authenticated:
-    with st.sidebar:
-        st.markdown("## Explore")
-
-        if st.button("📄 Upload Resume", key="resume_btn"):
-            st.session_state.page = "Upload Resume"
-        if st.button("🎥 Interview", key="interview_btn"):
-            st.session_state.page = "Interview"
-        if st.button("💬 FAQ Bot", key="faq_btn"):
-            st.session_state.page = "FAQ Bot"
-
-# Highlight active page
-active_page = st.session_state.page
-js_highlight = f"""
+        else:
+            st.session_state.access_token = None
+            st.session_state.authenticated = False
+            if refresh:
+                del st.query_params["session"]
+
+    _restore_auth()
+
+    # Title/caption visible only after successful login
+    if st.session_state.get("authenticated", False):
+        st.title("🤖 Interview Bot")
+        st.caption("AI-powered resume-based interview practice with video recording and HR FAQ bot")
+
+    # -------------------- Landing Page (shown until Start Now) --------------------
+    if not st.session_state.started:
+        # Hide sidebar visually on landing
+        st.markdown(
+            """
+            <style>
+              section[data-testid="stSidebar"] {display: none;} 
+            </style>
+            """,
+            unsafe_allow_html=True,
+        )
+
+        # Header: logo left, Sign Up right
+        c1, c2 = st.columns([3,1])
+        with c1:
+            st.markdown("### interview.co")
+        with c2:
+            if st.button("Sign Up", key="landing_signup"):
+                st.session_state.started = True
+                st.session_state.page = "Sign Up"
+                st.rerun()
+
+        st.markdown("---")
+        hc1, hc2 = st.columns([1.2,1])
+        with hc1:
+            st.markdown("## Mock Interviews to Mastery. Prepare, practice and own the real one.")
+            st.write("AI-based practice to help you be ready for the real interview.")
+            if st.button("Start Now!", type="primary"):
+                st.session_state.started = True
+                st.session_state.page = "Sign Up"
+                st.session_state.login_prompt = True
+                st.rerun()
+        with hc2:
+            st.image("https://images.unsplash.com/photo-1522199710521-72d69614c702?q=80&w=1200&auto=format&fit=crop", use_column_width=True)
+
+        # Landing page is on screen; load the heavy page modules in the background.
+        warm_up(auth, resume_parser, question_generator, tts, video_recorder, faq_bot)
+        st.stop()
+
+    # -------------------- Custom Sidebar Menu --------------------
+    sidebar_style = """
+        <style>
+            .stButton > button {
+                width: 100%;
+                background-color: #262730;
+                color: white;
+                padding: 10px;
+                border-radius: 10px;
+                text-align: left;
+                font-size: 16px;
+                transition: all 0.3s ease-in-out;
+                border: none;
+                margin-bottom: 10px;
+            }
+            .stButton > button:hover {
+                background-color: #4CAF50;
+                transform: scale(1.05);
+                box-shadow: 0px 0px 10px rgba(76, 175, 80, 0.8);
+            }
+            .active-btn {
+                background-color: #4CAF50 !important;
+                font-weight: bold;
+            }
+        </style>
+    """
+    st.markdown(sidebar_style, unsafe_allow_html=True)
+
+    if st.session_state.started and st.session_state.authenticated:
+        with st.sidebar:
+            st.markdown("## Explore")
+
+            if st.button("📄 Upload Resume", key="resume_btn"):
+                st.session_state.page = "Upload Resume"
+            if st.button("🎥 Interview", key="interview_btn"):
+                st.session_state.page = "Interview"
+            if st.button("💬 FAQ Bot", key="faq_btn"):
+                st.session_state.page = "FAQ Bot"
+            if st.button("🚪 Logout", key="logout_btn"):
+                if st.session_state.access_token:
+                    auth.revoke_token(st.session_state.access_token)
+                refresh = st.query_params.get("session")
+                if refresh:
+                    auth.revoke_token(refresh, typ="refresh")
+                    del st.query_params["session"]
+                st.session_state.access_token = None
+                st.session_state.authenticated = False
+                st.session_state.pop("interview_id", None)
+                if "interview" in st.query_params:
+                    del st.query_params["interview"]
+                st.session_state.page = "Login"
+                st.rerun()
+
+    # Highlight active page
+    active_page = st.session_state.page
+    js_highlight = f"""
+        <script>
+        var buttons = window.parent.document.querySelectorAll('.stButton > button');
+        buttons.forEach(btn => {{
+            if(btn.innerText.includes("{active_page.split()[0]}")) {{
+                btn.classList.add("active-btn");
+            }}
+        }});
+        </script>
+    """
+    if st.session_state.started and st.session_state.authenticated:
+        st.markdown(js_highlight, unsafe_allow_html=True)
+
+    # -------------------- Interview Session --------------------
+    # st.session_state holds only the interview id. Like the refresh token, the id
+    # is mirrored in the URL, so a reconnect after a worker restart picks the
+    # interview up where it was; a session bound to another user is not resumed.
+    def _current_user():
+        claims = auth.verify_token(st.session_state.access_token) if st.session_state.access_token else None
+        return claims["sub"] if claims else None
+
+    def _interview_session():
+        store = session_store.get_store()
+        session_id = st.session_state.get("interview_id")
+        interview = store.get(session_id) if session_id else None
+        if interview is None:
+            user = _current_user()
+            restored = st.query_params.get("interview")
+            interview = store.get(restored) if restored else None
+            if interview is not None and interview.owner not in (None, user):
+                interview = None
+            if interview is None:
+                interview = store.create(user)
+            st.session_state.interview_id = interview.id
+            st.query_params["interview"] = interview.id
+        if interview.owner is None and st.session_state.authenticated:
+            interview.owner = _current_user()
+        return interview
+
+    interview = _interview_session() if st.session_state.page in ("Upload Resume", "Interview") else None
+
+    # -------------------- Helper: Speak Question --------------------
+    def speak_text(text):
+        # Served by Streamlit's media file manager as a content-hashed URL rather than
+        # an inline base64 data URI; audio is usually already cached by the prefetch.
+        with metrics.span("speak_text"):
+            audio_bytes = tts.get_audio(text, lang="en")
+            st.audio(audio_bytes, format="audio/mpeg", autoplay=True)
+
+    # -------------------- Helper: Answer Timer --------------------
+    # The countdown ticks in the browser; the server only wakes up once, at expiry,
+    # through a fragment scheduled for the remaining time.
+    COUNTDOWN_HTML = """
+    <span id="t" style="font:700 18px sans-serif;background:#111;color:#fff;display:inline-block;padding:6px 12px;border-radius:10px;"></span>
     <script>
-    var buttons = window.parent.document.querySelectorAll('.stButton > button');
-    buttons.forEach(btn => {{
-        if(btn.innerText.includes("{active_page.split()[0]}")) {{
-            btn.classList.add("active-btn");
-        }}
-    }});
+      const deadline = {deadline_ms};
+      const el = document.getElementById("t");
+      function tick() {{
+        const left = Math.max(0, Math.ceil((deadline - Date.now()) / 1000));
+        el.textContent = left > 0 ? "⏰ " + left + "s" : "⏰ Time's up!";
+        if (left > 0) setTimeout(tick, 250);
+      }}
+      tick();
     </script>
-"""
-if st.session_state.started and st.session_state.authenticated:
-    st.markdown(js_highlight, unsafe_allow_html=True)
-
-# -------------------- Helper: Speak Question --------------------
-def speak_text(text):
-    tts = gTTS(text=text, lang="en")
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp:
-        tts.save(tmp.name)
-        audio_file = tmp.name
-
-    with open(audio_file, "rb") as f:
-        audio_bytes = f.read()
-    b64 = base64.b64encode(audio_bytes).decode()
-    audio_html = f"""
-        <audio autoplay>
-            <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-        </audio>
     """
-    return audio_html
 
-# -------------------- Resume Upload --------------------
-if st.session_state.page == "Upload Resume":
-    st.header("📄 Upload Resume")
-    with st.container():
-        st.markdown('<div class="app-card">', unsafe_allow_html=True)
-        uploaded_file = st.file_uploader("Upload Resume (PDF/DOCX)", type=["pdf", "docx"])
-        if uploaded_file:
-            resume_text = parse_resume(uploaded_file)
-            st.session_state.resume_text = resume_text
-            st.success("Resume uploaded & parsed successfully!")
-            st.text_area("Extracted Resume Text", resume_text, height=260)
-
-            col_a, col_b = st.columns([1,1])
-            with col_a:
-                if st.button("✨ Generate Questions"):
-                    with st.spinner("Generating interview questions..."):
-                        st.session_state.questions = generate_questions(resume_text)
-                        st.session_state.current_index = 0
-                        st.session_state.timer = 60
-                        st.session_state.video_started = False
-                        st.session_state.last_spoken_index = -1
-                        st.session_state.waiting_for_audio = True
-                    st.success("Interview setup completed! Open the Interview tab.")
-            with col_b:
-                st.metric("Questions ready", len(st.session_state.questions))
-        else:
-            st.info("Upload your resume to generate personalized interview questions.")
-        st.markdown('</div>', unsafe_allow_html=True)
+    def answer_timer(interview):
+        if interview.timer_deadline is None:
+            interview.timer_deadline = time.time() + interview.timer
+        remaining = interview.timer_deadline - time.time()
 
-# -------------------- Interview --------------------
-elif st.session_state.page == "Interview":
-    st.header("🎥 AI Interview")
-
-    if not st.session_state.questions:
-        st.warning("⚠️ Please upload a resume and start interview first.")
-    else:
-        col1, col2 = st.columns([1.2, 1])
-        # Top-right Skip button
-        with col1:
-            top_right = st.container()
-            with top_right:
-                st.markdown(
-                    "<div style='display:flex; justify-content:flex-end; margin-top:-24px;'>" 
-                    "<span></span></div>",
-                    unsafe_allow_html=True,
-                )
-                if st.button("⏭️ Skip Interview", key="skip_top_right"):
-                    st.session_state.page = "FAQ Bot"
-                    st.session_state.questions = []
-                    st.session_state.current_index = 0
-                    st.session_state.timer = 60
-                    st.session_state.video_started = False
-                    st.session_state.last_spoken_index = -1
-                    st.session_state.waiting_for_audio = False
-                    st.rerun()
+        @st.fragment(run_every=max(1.0, remaining) if remaining > 0 else None)
+        def countdown():
+            # Allow for the browser firing the scheduled rerun slightly early.
+            if interview.timer_deadline - time.time() > 0.5:
+                deadline_ms = int(interview.timer_deadline * 1000)
+                components.html(COUNTDOWN_HTML.format(deadline_ms=deadline_ms), height=48)
+            elif interview.timer > 0:
+                # Expired: one full rerun so the page stops scheduling this fragment.
+                interview.timer = 0
+                st.rerun()
+            else:
+                st.markdown("⏰ Time's up!")
+
+        countdown()
+
+    def questions_pending(interview):
+        stream = st.session_state.question_stream
+        return stream is not None and not stream.done and stream.questions is interview.questions
 
-        rec_info = video_interview_ui(col2)
+    # -------------------- Resume Upload --------------------
+    if st.session_state.page == "Upload Resume":
+        st.header("📄 Upload Resume")
+        with st.container():
+            st.markdown('<div class="app-card">', unsafe_allow_html=True)
+            uploaded_file = st.file_uploader("Upload Resume (PDF/DOCX)", type=["pdf", "docx"])
+            resume_text = None
+            if uploaded_file:
+                try:
+                    resume_text = resume_parser.parse_resume_cached(uploaded_file)
+                except (resume_parser.ResumeTooLargeError, resume_parser.ResumeParseTimeoutError) as e:
+                    st.error(f"⚠️ {e}")
+            if resume_text is not None:
+                interview.resume_text = resume_text
+                st.success("Resume uploaded & parsed successfully!")
+                st.text_area("Extracted Resume Text", resume_text, height=260)
 
-        if rec_info and rec_info.get("active"):
+                col_a, col_b = st.columns([1,1])
+                with col_a:
+                    if st.button("✨ Generate Questions"):
+                        with st.spinner("Generating interview questions..."):
+                            # Questions keep streaming in on a background thread after the first arrives.
+                            def on_question(q, interview=interview):
+                                tts.prefetch([q])
+                                interview.sync()  # persist each streamed question
+
+                            stream = question_generator.start_question_stream(resume_text, on_question=on_question)
+                            st.session_state.question_stream = stream
+                            interview.update(
+                                questions=stream.wait_first(timeout=60),
+                                current_index=0,
+                                timer=60,
+                                timer_deadline=None,
+                                last_spoken_index=-1,
+                                waiting_for_audio=True,
+                            )
+                            st.session_state.video_started = False
+                        st.success("Interview setup completed! Open the Interview tab.")
+                        if stream.time_to_first is not None:
+                            st.caption(f"First question ready in {stream.time_to_first:.2f}s")
+                with col_b:
+                    st.metric("Questions ready", len(interview.questions))
+            elif not uploaded_file:
+                st.info("Upload your resume to generate personalized interview questions.")
+            st.markdown('</div>', unsafe_allow_html=True)
+
+    # -------------------- Interview --------------------
+    elif st.session_state.page == "Interview":
+        st.header("🎥 AI Interview")
+
+        if not interview.questions:
+            st.warning("⚠️ Please upload a resume and start interview first.")
+        else:
+            col1, col2 = st.columns([1.2, 1])
+            # Top-right Skip button
             with col1:
-                st.subheader(f"Question {st.session_state.current_index + 1}")
-                current_q = st.session_state.questions[st.session_state.current_index]
-                st.write(current_q)
-
-                # --- Speak question when waiting_for_audio is True ---
-                if st.session_state.waiting_for_audio:
-                    audio_html = speak_text(current_q)
-                    st.markdown(audio_html, unsafe_allow_html=True)
-                    st.info("🔊 AI is reading the question… Please listen.")
-                    st.session_state.waiting_for_audio = False
-                    st.session_state.last_spoken_index = st.session_state.current_index
-                    st.stop()
-
-                # If recording just stopped, move to next question immediately
-                if rec_info.get("stopped"):
-                    if st.session_state.current_index < len(st.session_state.questions) - 1:
-                        st.session_state.current_index += 1
-                        st.session_state.timer = 60
-                        st.session_state.waiting_for_audio = True
+                top_right = st.container()
+                with top_right:
+                    st.markdown(
+                        "<div style='display:flex; justify-content:flex-end; margin-top:-24px;'>" 
+                        "<span></span></div>",
+                        unsafe_allow_html=True,
+                    )
+                    if st.button("⏭️ Skip Interview", key="skip_top_right"):
+                        st.session_state.page = "FAQ Bot"
+                        interview.reset()
+                        video_recorder.stop_recording()
+                        st.session_state.video_started = False
                         st.rerun()
-                    else:
-                        st.success("✅ You have completed all questions!")
-
-                # --- Timer logic (after question audio finishes) ---
-                timer_placeholder = st.empty()
-                if st.session_state.timer > 0:
-                    timer_placeholder.markdown(f"<span class='timer'>⏰ {st.session_state.timer}s</span>", unsafe_allow_html=True)
-                    st.session_state.timer -= 1
-                    time.sleep(1)
-                    st.rerun()
+
+            rec_info = video_recorder.video_interview_ui(col2, interview.current_index)
+
+            if rec_info and rec_info.get("active"):
+                with col1:
+                    st.subheader(f"Question {interview.current_index + 1}")
+                    current_q = interview.questions[interview.current_index]
+                    st.write(current_q)
+
+                    # --- Speak question when waiting_for_audio is True ---
+                    if interview.waiting_for_audio:
+                        speak_text(current_q)
+                        st.info("🔊 AI is reading the question… Please listen.")
+                        interview.update(waiting_for_audio=False, last_spoken_index=interview.current_index)
+                        st.stop()
+
+                    # If recording just stopped, move to next question immediately
+                    if rec_info.get("stopped"):
+                        if interview.current_index < len(interview.questions) - 1:
+                            interview.update(
+                                current_index=interview.current_index + 1,
+                                timer=60,
+                                timer_deadline=None,
+                                waiting_for_audio=True,
+                            )
+                            st.rerun()
+                        elif questions_pending(interview):
+                            st.info("⏳ The next question is still being generated…")
+                        else:
+                            st.success("✅ You have completed all questions!")
+
+                    # --- Timer logic (after question audio finishes) ---
+                    answer_timer(interview)
+
+                    # Navigation buttons
+                    progress = (interview.current_index + 1) / max(1, len(interview.questions))
+                    st.progress(progress)
+
+                    # Action buttons row
+                    c1, c2, c3 = st.columns([1,1,1])
+                    if c1.button("➡️ Next"):
+                        if interview.current_index < len(interview.questions) - 1:
+                            interview.update(
+                                current_index=interview.current_index + 1,
+                                timer=60,
+                                timer_deadline=None,
+                                waiting_for_audio=True,  # ✅ each new Q will be spoken
+                            )
+                            st.rerun()
+                        elif questions_pending(interview):
+                            st.info("⏳ The next question is still being generated…")
+                        else:
+                            st.success("✅ You have completed all questions!")
+                    if c2.button("⏭️ Skip Interview"):
+                        st.session_state.page = "FAQ Bot"
+                        interview.reset()
+                        video_recorder.stop_recording()
+                        st.session_state.video_started = False
+                        st.rerun()
+                    if c3.button("🏁 Finish Test"):
+                        st.success("🎉 Interview finished! Redirecting to FAQ Bot…")
+                        interview.reset(clear_resume=True)
+                        video_recorder.stop_recording()
+                        st.session_state.video_started = False
+                        st.session_state.page = "FAQ Bot"
+                        st.rerun()
+
+    # -------------------- FAQ Bot --------------------
+    elif st.session_state.page == "FAQ Bot":
+        st.header("💬 HR FAQ Chatbot")
+        st.markdown('<div class="app-card">', unsafe_allow_html=True)
+        faq_bot.faq_chatbot()
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # -------------------- Auth: Sign Up --------------------
+    elif st.session_state.page == "Sign Up":
+        # Hide sidebar for auth pages
+        st.markdown(
+            """
+            <style>
+              section[data-testid=\"stSidebar\"] {display: none;}
+            </style>
+            """,
+            unsafe_allow_html=True,
+        )
+        st.markdown("### interview.co")
+        left, right = st.columns([1,1])
+        with right:
+            st.subheader("Create an Account")
+            with st.form("signup_form"):
+                full_name = st.text_input("Full Name")
+                email = st.text_input("Email Address")
+                pw = st.text_input("Password", type="password")
+                pw2 = st.text_input("Confirm Password", type="password")
+                submitted = st.form_submit_button("Sign Up")
+            if submitted:
+                if pw != pw2:
+                    st.error("Passwords do not match.")
+                elif not full_name or not email or not pw:
+                    st.error("All fields are required.")
                 else:
-                    timer_placeholder.markdown("⏰ Time's up!")
-
-                # Navigation buttons
-                progress = (st.session_state.current_index + 1) / max(1, len(st.session_state.questions))
-                st.progress(progress)
-
-                # Action buttons row
-                c1, c2, c3 = st.columns([1,1,1])
-                if c1.button("➡️ Next"):
-                    if st.session_state.current_index < len(st.session_state.questions) - 1:
-                        st.session_state.current_index += 1
-                        st.session_state.timer = 60
-                        st.session_state.waiting_for_audio = True   # ✅ each new Q will be spoken
+                    try:
+                        ok = auth.create_user(full_name, email, pw)
+                    except auth.AuthBusyError:
+                        ok = None
+                    if ok is None:
+                        st.warning("Server is busy right now. Please try again in a moment.")
+                    elif ok:
+                        st.success("Account created! Redirecting to login…")
+                        st.session_state.page = "Login"
                         st.rerun()
                     else:
-                        st.success("✅ You have completed all questions!")
-                if c2.button("⏭️ Skip Interview"):
-                    st.session_state.page = "FAQ Bot"
-                    st.session_state.questions = []
-                    st.session_state.current_index = 0
-                    st.session_state.timer = 60
-                    st.session_state.video_started = False
-                    st.session_state.last_spoken_index = -1
-                    st.session_state.waiting_for_audio = False
-                    st.rerun()
-                if c3.button("🏁 Finish Test"):
-                    st.success("🎉 Interview finished! Redirecting to FAQ Bot…")
-                    st.session_state.questions = []
-                    st.session_state.current_index = 0
-                    st.session_state.timer = 60
-                    st.session_state.resume_text = ""
-                    st.session_state.video_started = False
-                    st.session_state.last_spoken_index = -1
-                    st.session_state.waiting_for_audio = False
-                    st.session_state.page = "FAQ Bot"
-                    st.rerun()
+                        st.error("Email already registered. Try logging in.")
+            st.markdown(
+                """
+                <div style="margin-top: 18px; font-size: 16px;">
+                    Already have an account?
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
+            if st.button("Login", key="goto_login_link"):
+                st.session_state.page = "Login"
+                st.rerun()
 
-# -------------------- FAQ Bot --------------------
-elif st.session_state.page == "FAQ Bot":
-    st.header("💬 HR FAQ Chatbot")
-    st.markdown('<div class="app-card">', unsafe_allow_html=True)
-    faq_chatbot()
-    st.markdown('</div>', unsafe_allow_html=True)
+        with left:
+            st.image("https://images.unsplash.com/photo-1551836022-4c4c79ecde51?q=80&w=900&auto=format&fit=crop", use_column_width=True)
 
-# -------------------- Auth: Sign Up --------------------
-elif st.session_state.page == "Sign Up":
-    # Hide sidebar for auth pages
-    st.markdown(
-        """
-        <style>
-          section[data-testid=\"stSidebar\"] {display: none;}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-    st.markdown("### interview.co")
-    left, right = st.columns([1,1])
-    with right:
-        st.subheader("Create an Account")
-        with st.form("signup_form"):
-            full_name = st.text_input("Full Name")
-            email = st.text_input("Email Address")
-            pw = st.text_input("Password", type="password")
-            pw2 = st.text_input("Confirm Password", type="password")
-            submitted = st.form_submit_button("Sign Up")
-        if submitted:
-            if pw != pw2:
-                st.error("Passwords do not match.")
-            elif not full_name or not email or not pw:
-                st.error("All fields are required.")
-            else:
-                ok = create_user(full_name, email, pw)
-                if ok:
-                    st.success("Account created! Redirecting to login…")
-                    st.session_state.page = "Login"
-                    st.rerun()
-                else:
-                    st.error("Email already registered. Try logging in.")
+    # -------------------- Auth: Login --------------------
+    elif st.session_state.page == "Login":
+        # Hide sidebar for auth pages
         st.markdown(
             """
-            <div style="margin-top: 18px; font-size: 16px;">
-                Already have an account?
-            </div>
+            <style>
+              section[data-testid=\"stSidebar\"] {display: none;}
+            </style>
             """,
             unsafe_allow_html=True,
         )
-        if st.button("Login", key="goto_login_link"):
-            st.session_state.page = "Login"
-            st.rerun()
-          
-    with left:
-        st.image("https://images.unsplash.com/photo-1551836022-4c4c79ecde51?q=80&w=900&auto=format&fit=crop", use_column_width=True)
-
-# -------------------- Auth: Login --------------------
-elif st.session_state.page == "Login":
-    # Hide sidebar for auth pages
-    st.markdown(
-        """
-        <style>
-          section[data-testid=\"stSidebar\"] {display: none;}
-        </style>
-        """,
-        unsafe_allow_html=True,
-    )
-    st.markdown("### interview.co")
-    left, right = st.columns([1,1])
-    with right:
-        st.subheader("Login")
-        with st.form("login_form"):
-            email = st.text_input("Email Address")
-            pw = st.text_input("Password", type="password")
-            submitted = st.form_submit_button("Login")
-        if submitted:
-            if verify_user(email, pw):
-                st.success("Login successful. Redirecting…")
-                st.session_state.authenticated = True
-                st.session_state.page = "Upload Resume"
-                st.rerun()
-            else:
-                st.error("Invalid credentials.")
-    with left:
-        st.image("https://images.unsplash.com/photo-1515187029135-18ee286d815b?q=80&w=900&auto=format&fit=crop", use_column_width=True)
+        st.markdown("### interview.co")
+        left, right = st.columns([1,1])
+        with right:
+            st.subheader("Login")
+            with st.form("login_form"):
+                email = st.text_input("Email Address")
+                pw = st.text_input("Password", type="password")
+                submitted = st.form_submit_button("Login")
+            if submitted:
+                try:
+                    ok = auth.verify_user(email, pw)
+                except auth.AuthBusyError:
+                    ok = None
+                if ok is None:
+                    st.warning("Server is busy right now. Please try again in a moment.")
+                elif ok:
+                    st.success("Login successful. Redirecting…")
+                    tokens = auth.issue_tokens(email)
+                    st.session_state.access_token = tokens["access"]
+                    st.query_params["session"] = tokens["refresh"]
+                    st.session_state.authenticated = True
+                    st.session_state.page = "Upload Resume"
+                    st.rerun()
+                else:
+                    st.error("Invalid credentials.")
+        with left:
+            st.image("https://images.unsplash.com/photo-1515187029135-18ee286d815b?q=80&w=900&auto=format&fit=crop", use_column_width=True)
+finally:
+    metrics.end_rerun()
@@ -0,0 +1,96 @@
+# Synthetic resume files for the offline benchmarks (no PDF/DOCX libraries needed).
+import io
+import random
+import zipfile
+
+_WORDS = (
+    "python sql aws docker kubernetes react led team delivered pipeline analytics "
+    "customer stakeholder project migration latency reduced improved designed built "
+    "machine learning data engineer backend api microservices testing mentoring"
+).split()
+
+
+def resume_lines(n_lines: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(_WORDS) for _ in range(12)) for _ in range(n_lines)]
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    lines = resume_lines(pages * lines_per_page, seed)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(pages):
+        chunk = lines[p * lines_per_page:(p + 1) * lines_per_page]
+        body = "BT /F1 10 Tf 12 TL 40 800 Td " + " ".join(f"({l}) '" for l in chunk) + " ET"
+        objects.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for off in offsets:
+        out.write(f"{off:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(n_lines: int, seed: int = 0) -> bytes:
+    paras = "".join(f"<w:p><w:r><w:t>{l}</w:t></w:r></w:p>" for l in resume_lines(n_lines, seed))
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paras}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        zf.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+class Upload(io.BytesIO):
+    # Mimics streamlit's UploadedFile: a BytesIO with a MIME type and name.
+    def __init__(self, data: bytes, type: str, name: str = "resume"):
+        super().__init__(data)
+        self.type = type
+        self.name = name
+
+
+_FAQ_TOPICS = (
+    "interview dress code arrival resume copies salary negotiation notice period relocation "
+    "benefits leave policy probation onboarding referral background check offer letter remote "
+    "hybrid shift timings travel reimbursement laptop training appraisal promotion internship"
+).split()
+
+
+def make_faq(n_entries: int, seed: int = 0, answer_words: int = 25) -> str:
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n_entries):
+        a, b = rng.sample(_FAQ_TOPICS, 2)
+        answer = " ".join(rng.choice(_FAQ_TOPICS + _WORDS) for _ in range(answer_words))
+        entries.append(f"Q: What is the {a} policy for {b} case {i}?\nA: {answer}.")
+    return "\n\n".join(entries) + "\n"
+
+
+def faq_queries(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    return [f"how does {rng.choice(_FAQ_TOPICS)} work for {rng.choice(_FAQ_TOPICS)}" for _ in range(n)]
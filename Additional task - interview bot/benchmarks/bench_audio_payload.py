@@ -0,0 +1,48 @@
+# Websocket bytes per interview for question audio: inline base64 <audio> vs st.audio media URLs.
+# Usage: python benchmarks/bench_audio_payload.py [--questions 5] [--audio-kb 40]
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+_SCRIPT = """
+import base64
+import streamlit as st
+
+clips = [bytes([i]) * {size} for i in range({questions})]
+for clip in clips:
+    if {inline}:
+        b64 = base64.b64encode(clip).decode()
+        st.markdown(
+            f'<audio autoplay><source src="data:audio/mp3;base64,{{b64}}" type="audio/mp3"></audio>',
+            unsafe_allow_html=True,
+        )
+    else:
+        st.audio(clip, format="audio/mpeg", autoplay=True)
+"""
+
+
+def _delta_bytes(inline: bool, questions: int, size: int) -> int:
+    at = AppTest.from_string(_SCRIPT.format(inline=inline, questions=questions, size=size)).run()
+    return sum(node.proto.ByteSize() for node in at._tree[0].children.values())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--audio-kb", type=int, default=40)
+    args = parser.parse_args()
+
+    size = args.audio_kb * 1024
+    before = _delta_bytes(True, args.questions, size)
+    after = _delta_bytes(False, args.questions, size)
+    print(f"inline base64 : {before:>10,} websocket bytes per interview")
+    print(f"media URLs    : {after:>10,} websocket bytes per interview")
+    print(f"audio itself  : {size * args.questions:>10,} bytes, now fetched over HTTP and browser-cacheable")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Login throughput: one MongoClient per call (old behaviour) vs the shared pooled client.
+# Usage: python benchmarks/bench_auth.py [--logins N] [--mongomock]
+# Uses MONGODB_URI when a mongod is reachable, otherwise pass --mongomock.
+# The numbers only mean something against a real mongod: what is measured is
+# connection setup and pooling, and mongomock has neither, so with --mongomock
+# both paths run at about the same speed and this only checks the script runs.
+# bcrypt runs at --rounds (default 4) so the client overhead is not drowned out.
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules import auth  # noqa: E402
+
+
+def _use_mongomock():
+    import mongomock
+
+    shared = mongomock.MongoClient()
+    auth.MongoClient = lambda *a, **kw: shared
+
+    # mongomock clients don't share storage, so the "old" path pays for building a
+    # client object and then reads from the shared store.
+    def factory(uri):
+        mongomock.MongoClient(uri)
+        return shared
+
+    return factory
+
+
+def _old_verify(client_factory, email, password):
+    uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    client = client_factory(uri)
+    users = client[os.getenv("MONGODB_DB", "interview_bot")]["users"]
+    user = users.find_one({"email": email})
+    ok = bool(user) and auth.check_password(password, user.get("password", b""))
+    if client is not auth.get_mongo_client():
+        client.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--mongomock", action="store_true")
+    parser.add_argument("--rounds", type=int, default=4)
+    args = parser.parse_args()
+
+    auth.BCRYPT_ROUNDS = args.rounds
+    os.environ.setdefault("MONGODB_DB", "interview_bot_bench")
+    client_factory = _use_mongomock() if args.mongomock else auth.MongoClient
+
+    email, password = "bench@example.com", "bench-password"
+    users = auth.get_users_collection()
+    users.delete_many({"email": email})
+    auth.create_user("Bench User", email, password)
+
+    start = time.perf_counter()
+    for _ in range(args.logins):
+        _old_verify(client_factory, email, password)
+    old = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.logins):
+        auth.verify_user(email, password)
+    new = time.perf_counter() - start
+
+    users.delete_many({"email": email})
+    print(f"per-call client : {args.logins / old:8.1f} logins/s")
+    print(f"pooled client   : {args.logins / new:8.1f} logins/s")
+    if args.mongomock:
+        print("(mongomock: no real connections are made; run against a mongod for meaningful numbers)")
+
+
+if __name__ == "__main__":
+    main()
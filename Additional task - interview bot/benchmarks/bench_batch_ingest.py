@@ -0,0 +1,83 @@
+# Batch resume ingestion: files/sec for a one-file-at-a-time loop (parse, then
+# generate questions, like the Upload page) vs the pipelined batch entry point
+# (process-pool parse -> bounded queue -> concurrent generation), on a zip of
+# generated resumes with some duplicates, against the local stub LLM.
+# Usage: python benchmarks/bench_batch_ingest.py [--files 200] [--latency 0.3] [--concurrency 8]
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.update(QUESTION_CACHE_DB="", RESUME_CACHE_DB="", METRICS_ENABLED="0", BATCH_PROGRESS_SECONDS="0")
+
+from benchmarks._corpus import Upload, make_docx, make_pdf  # noqa: E402
+from benchmarks.stub_llm import StubLLMServer  # noqa: E402
+
+
+def _make_zip(path: str, files: int, pages: int, duplicate_every: int):
+    with zipfile.ZipFile(path, "w") as zf:
+        previous = None
+        for i in range(files):
+            if previous and duplicate_every and i % duplicate_every == duplicate_every - 1:
+                ext, data = previous  # same bytes under another name
+            elif i % 5 == 4:
+                ext, data = "docx", make_docx(40 * pages, seed=i)
+            else:
+                ext, data = "pdf", make_pdf(pages, seed=i)
+            zf.writestr(f"batch/candidate{i:05d}.{ext}", data)
+            previous = ext, data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--duplicate-every", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StubLLMServer(latency=args.latency).start()
+    os.environ.update(GROQ_API_KEY="stub", LLM_BASE_URL=server.base_url)
+    from modules import batch_ingest, question_generator, resume_parser
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = os.path.join(tmp, "resumes.zip")
+        _make_zip(archive, args.files, args.pages, args.duplicate_every)
+        print(f"{args.files} resumes ({args.pages} pages), 1 in {args.duplicate_every} duplicated, "
+              f"LLM latency {args.latency * 1000:.0f} ms, {os.cpu_count()} CPUs")
+
+        # Before: the Upload page's path, one file after another.
+        start = time.perf_counter()
+        for source, file_type, _, read in batch_ingest.iter_inputs(archive):
+            text = resume_parser.parse_resume(Upload(read(), file_type))
+            question_generator.generate_questions(text)
+        sequential = time.perf_counter() - start
+        print(f"  sequential loop      {sequential:7.2f} s  {args.files / sequential:7.1f} files/s")
+
+        # Start cold, so the pipeline run does not hit the question cache.
+        question_generator._question_cache.clear()
+        output = os.path.join(tmp, "out.jsonl")
+        batch = batch_ingest.BatchIngest(
+            output,
+            parse_workers=args.parse_workers or batch_ingest.PARSE_PROCESSES,
+            concurrency=args.concurrency,
+        )
+        s = batch.run(archive)
+        pipelined = s["elapsed_seconds"]
+        print(f"  batch pipeline       {s['elapsed_seconds']:7.2f} s  {s['files_per_second']:7.1f} files/s "
+              f"({s['parsed']} parsed, {s['duplicates']} duplicates, {s['errors']} errors, "
+              f"{batch.parse_workers} parse workers, {args.concurrency} concurrent requests)")
+
+        # Resume: every file is already in the output.
+        s = batch_ingest.BatchIngest(output).run(archive)
+        print(f"  resumed (all done)   {s['elapsed_seconds']:7.2f} s  {s['skipped']} skipped")
+    print(f"  speed-up             {sequential / pipelined:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# FAQ answer cache: hit rate and mean answer latency over a repetitive query
+# stream (exact repeats, case/punctuation variants and reworded near-duplicates),
+# with a fixed artificial LLM latency standing in for the real call.
+# Usage: python benchmarks/bench_faq_cache.py [--queries 500] [--llm-latency 0.8]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks._corpus import faq_queries, make_faq  # noqa: E402
+from modules.faq_bot import AnswerCache  # noqa: E402
+from modules.faq_index import build_index, load_index  # noqa: E402
+
+_VARIANTS = (
+    lambda q: q,
+    lambda q: q.upper() + "?",
+    lambda q: "Hi, " + q + "!!",
+    lambda q: q.replace("how does", "how do") + " exactly",
+)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--distinct", type=int, default=60)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--similarity", type=float, default=0.9)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    base = faq_queries(args.distinct)
+    stream = [rng.choice(_VARIANTS)(rng.choice(base)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        faq_path = os.path.join(tmp, "faq.txt")
+        with open(faq_path, "w", encoding="utf-8") as f:
+            f.write(make_faq(2000))
+        build_index(faq_path, os.path.join(tmp, "index"))
+        index = load_index(os.path.join(tmp, "index"))
+
+    cache = AnswerCache(similarity=args.similarity)
+    lookup_s = 0.0
+    for q in stream:
+        start = time.perf_counter()
+        vec = index["vectorizer"].transform([q])
+        answer = cache.get(q, vec, index["version"])
+        lookup_s += time.perf_counter() - start
+        if answer is None:
+            cache.put(q, vec, index["version"], f"answer to {q}")
+    info = cache.info()
+    misses = info["misses"]
+    uncached = args.llm_latency * 1000
+    cached = (lookup_s + misses * args.llm_latency) / len(stream) * 1000
+    print(f"queries={len(stream)} distinct={args.distinct} similarity>={args.similarity}")
+    print(f"exact hits={info['exact_hits']} similar hits={info['similar_hits']} misses={misses} hit rate={info['hit_rate']:.1%}")
+    print(f"mean lookup {lookup_s / len(stream) * 1000:.3f} ms")
+    print(f"mean answer latency: no cache {uncached:.0f} ms, with cache {cached:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
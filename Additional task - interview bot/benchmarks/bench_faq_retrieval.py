@@ -0,0 +1,67 @@
+# FAQ retrieval latency vs corpus size: old cosine_similarity + full argsort vs
+# sparse dot-product/argpartition TF-IDF and BM25, single and batched queries.
+# Usage: python benchmarks/bench_faq_retrieval.py [--sizes 1000,10000,100000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sklearn.metrics.pairwise import cosine_similarity  # noqa: E402
+from benchmarks._corpus import faq_queries, make_faq  # noqa: E402
+from modules.faq_index import build_index, load_index  # noqa: E402
+from modules.faq_retrieval import BM25Retriever, TfidfRetriever  # noqa: E402
+
+
+def _old_search(index, query, k=5):
+    sims = cosine_similarity(index["vectorizer"].transform([query]), index["matrix"]).flatten()
+    return sims.argsort()[::-1][:k]
+
+
+def _per_query_ms(fn, queries):
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch", type=int, default=32)
+    args = parser.parse_args()
+
+    queries = faq_queries(args.queries)
+    batch = faq_queries(args.batch, seed=2)
+    print(f"{'entries':>8} {'build s':>8} {'old ms':>8} {'tfidf ms':>9} {'bm25 ms':>8} {'tfidf batch ms/q':>17} {'bm25 batch ms/q':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in (int(s) for s in args.sizes.split(",")):
+            faq_path = os.path.join(tmp, f"faq_{n}.txt")
+            with open(faq_path, "w", encoding="utf-8") as f:
+                f.write(make_faq(n))
+            index_dir = os.path.join(tmp, f"index_{n}")
+            start = time.perf_counter()
+            build_index(faq_path, index_dir)
+            build_s = time.perf_counter() - start
+            index = load_index(index_dir)
+
+            tfidf = TfidfRetriever(index)
+            bm25 = BM25Retriever(index)
+            old = _per_query_ms(lambda q: _old_search(index, q), queries)
+            new = _per_query_ms(lambda q: tfidf.search([q]), queries)
+            okapi = _per_query_ms(lambda q: bm25.search([q]), queries)
+
+            start = time.perf_counter()
+            tfidf.search(batch)
+            tfidf_batch = (time.perf_counter() - start) / len(batch) * 1000
+            start = time.perf_counter()
+            bm25.search(batch)
+            bm25_batch = (time.perf_counter() - start) / len(batch) * 1000
+            print(f"{n:>8} {build_s:>8.2f} {old:>8.2f} {new:>9.2f} {okapi:>8.2f} {tfidf_batch:>17.2f} {bm25_batch:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
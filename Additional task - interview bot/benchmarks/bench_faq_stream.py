@@ -0,0 +1,77 @@
+# FAQ LLM path: time-to-first-token for the blocking call vs the streamed answer,
+# and prompt size for the old "five raw chunks" prompt vs the token-budgeted,
+# deduplicated context, against the local stub LLM.
+# Usage: python benchmarks/bench_faq_stream.py [--entries 10000] [--answer-words 25,100,400]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks._corpus import faq_queries, make_faq  # noqa: E402
+from benchmarks.stub_llm import StubLLMServer  # noqa: E402
+
+_REPLY = " ".join(["Interview policies vary by team, check the FAQ entry for details."] * 6)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10000)
+    parser.add_argument("--answer-words", default="25,100,400")
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    server = StubLLMServer(latency=args.latency, token_delay=args.token_delay, reply=_REPLY).start()
+    os.environ.update(GROQ_API_KEY="stub", LLM_BASE_URL=server.base_url)
+    from modules import faq_bot
+    from modules.faq_index import build_index, load_index
+    from modules.faq_retrieval import get_retriever
+
+    faq_bot.qa_ctx = {"llm": faq_bot.get_gateway()}
+    faq_bot.answer_cache.max_entries = 0
+    queries = faq_queries(args.queries)
+    avg = lambda xs: sum(xs) / len(xs)  # noqa: E731
+
+    print(f"{args.entries} FAQ entries, {len(queries)} queries, context budget {faq_bot.CONTEXT_TOKENS} tokens")
+    for words in (int(w) for w in args.answer_words.split(",")):
+        with tempfile.TemporaryDirectory() as tmp:
+            faq_path = os.path.join(tmp, "faq.txt")
+            with open(faq_path, "w", encoding="utf-8") as f:
+                f.write(make_faq(args.entries, answer_words=words))
+            build_index(faq_path, os.path.join(tmp, "index"))
+            index = load_index(os.path.join(tmp, "index"))
+        retriever = get_retriever(index)
+        old_tokens, new_tokens = [], []
+        for q in queries:
+            old_hits = retriever.search([q], k=5)[0]
+            old_tokens.append(faq_bot.estimate_tokens("\n\n".join(retriever.texts[i] for i, _ in old_hits)))
+            hits = retriever.search([q], k=faq_bot.CONTEXT_CANDIDATES)[0]
+            new_tokens.append(faq_bot.estimate_tokens(faq_bot.build_context(retriever.texts, hits)))
+        print(f"answers of {words:>3} words: context tokens old mean {avg(old_tokens):.0f} (max {max(old_tokens)}), budgeted mean {avg(new_tokens):.0f} (max {max(new_tokens)})")
+
+    blocking = []
+    faq_bot._llm_samples.clear()
+    for q in queries:
+        start = time.perf_counter()
+        faq_bot.answer_query(q, index)
+        blocking.append(time.perf_counter() - start)
+    blocking_metrics = faq_bot.llm_metrics()
+
+    faq_bot._llm_samples.clear()
+    for q in queries:
+        answer, path = faq_bot.answer_query(q, index, stream=True)
+        if path == "llm":
+            for _ in answer:
+                pass
+    streamed = faq_bot.llm_metrics()
+    print(f"prompt tokens per query (last corpus): mean {streamed['prompt_tokens_mean']:.0f}, max {streamed['prompt_tokens_max']}")
+    print(f"blocking  first token after p50 {blocking_metrics['ttft_p50_s']:.3f}s (full answer {avg(blocking):.3f}s)")
+    print(f"streaming first token after p50 {streamed['ttft_p50_s']:.3f}s p95 {streamed['ttft_p95_s']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
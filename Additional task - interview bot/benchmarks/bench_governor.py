@@ -0,0 +1,42 @@
+# Stream governor admission under rising concurrency: how many sessions are
+# admitted at each quality tier, degraded to audio-only, queued or rejected,
+# and the resulting video pixel rate the node has to decode/encode compared with
+# admitting every session at the browser default (640x480 @ 30 fps).
+# Usage: python benchmarks/bench_governor.py [--sessions 4,8,16,24,32] [--max-streams 16]
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from modules.stream_governor import StreamGovernor  # noqa: E402
+
+
+def _pixel_rate(constraints: dict) -> int:
+    video = constraints.get("video")
+    if not video:
+        return 0
+    return video["width"]["max"] * video["height"]["max"] * video["frameRate"]["max"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="4,8,16,24,32")
+    parser.add_argument("--max-streams", type=int, default=16)
+    parser.add_argument("--max-queued", type=int, default=8)
+    args = parser.parse_args()
+
+    default_rate = 640 * 480 * 30
+    print(f"{'sessions':>8} {'admitted':>8} {'queued':>6} {'rejected':>8} {'tiers':<40} {'Mpx/s':>7} {'ungoverned Mpx/s':>16}")
+    for n in (int(s) for s in args.sessions.split(",")):
+        governor = StreamGovernor(max_streams=args.max_streams, max_queued=args.max_queued)
+        admissions = [governor.acquire(f"s{i}") for i in range(n)]
+        admitted = [a for a in admissions if a.admitted]
+        rate = sum(_pixel_rate(a.constraints) for a in admitted) / 1e6
+        m = governor.metrics()
+        tiers = ", ".join(f"{tier}={count}" for tier, count in m["active_by_tier"].items())
+        print(f"{n:>8} {len(admitted):>8} {m['waiting']:>6} {m['rejected']:>8} {tiers:<40} {rate:>7.1f} {n * default_rate / 1e6:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Per-call cost of the instrumentation layer: a bare function call vs
+# metrics.span()/@timed with metrics enabled and with METRICS_ENABLED=0.
+# Usage: python benchmarks/bench_metrics_overhead.py [--calls 200000]
+import argparse
+import os
+import subprocess
+import sys
+
+_CODE = """
+import sys, time
+sys.path.insert(0, {root!r})
+from modules import metrics
+
+def work():
+    return 1
+
+timed_work = metrics.timed("bench")(work)
+n = {calls}
+for label, fn in (("bare call", work), ("@timed", timed_work)):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    print(f"{{label:>10}}: {{(time.perf_counter() - start) / n * 1e9:7.0f}} ns/call")
+start = time.perf_counter()
+for _ in range(n):
+    with metrics.span("bench"):
+        work()
+print(f"{{'span()':>10}}: {{(time.perf_counter() - start) / n * 1e9:7.0f}} ns/call")
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+    code = _CODE.format(root=root, calls=args.calls)
+    for enabled in ("1", "0"):
+        print(f"METRICS_ENABLED={enabled}")
+        env = dict(os.environ, METRICS_ENABLED=enabled)
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# Time-to-first-question: streaming vs waiting for the full completion, against the local stub.
+# Usage: python benchmarks/bench_question_stream.py [--token-delay 0.02] [--runs 5]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks.stub_llm import StubLLMServer  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    server = StubLLMServer(latency=args.latency, token_delay=args.token_delay).start()
+    os.environ.update(GROQ_API_KEY="stub", LLM_BASE_URL=server.base_url, QUESTION_CACHE_DB="")
+    from modules import question_generator as qg
+
+    full, first, total = [], [], []
+    for i in range(args.runs):
+        start = time.perf_counter()
+        qg.generate_questions(f"resume {i} blocking")
+        full.append(time.perf_counter() - start)
+
+        stream = qg.start_question_stream(f"resume {i} streaming")
+        stream.wait_first()
+        while not stream.done:
+            time.sleep(0.005)
+        first.append(stream.time_to_first)
+        total.append(stream.total_time)
+
+    avg = lambda xs: sum(xs) / len(xs)  # noqa: E731
+    print(f"blocking   first question after {avg(full):.3f}s")
+    print(f"streaming  first question after {avg(first):.3f}s (all five after {avg(total):.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Recording pipeline under load with synthetic frames: N concurrent sessions
+# each push 30 fps video + 50 fps audio for a few seconds. Reports the time a
+# frame callback blocks the WebRTC thread (enqueue only vs encoding inline),
+# dropped frames, peak queue depth and encoder throughput per session.
+# Usage: python benchmarks/bench_recording.py [--sessions 1,4,8,16] [--seconds 3]
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import av  # noqa: E402
+import numpy as np  # noqa: E402
+from modules.recording import SessionRecorder, _Segment  # noqa: E402
+
+
+def _video_frame(i: int, width: int, height: int):
+    img = np.full((height, width, 3), i % 255, np.uint8)
+    img[:, (i * 7) % width] = 255
+    return av.VideoFrame.from_ndarray(img, format="bgr24")
+
+
+def _audio_frame():
+    frame = av.AudioFrame.from_ndarray(np.zeros((1, 960 * 2), np.int16), format="s16", layout="stereo")
+    frame.sample_rate = 48000
+    return frame
+
+
+def _feed(on_video, on_audio, seconds: float, width: int, height: int, callback_ms: list):
+    # 30 fps video and 50 fps (20 ms) audio on one "WebRTC" thread, paced in real time.
+    start = time.perf_counter()
+    i = 0
+    while time.perf_counter() - start < seconds:
+        frames = _video_frame(i, width, height), _audio_frame(), _audio_frame()
+        t0 = time.perf_counter()
+        on_video(frames[0])
+        on_audio(frames[1])
+        on_audio(frames[2])
+        callback_ms.append((time.perf_counter() - t0) * 1000)
+        i += 1
+        time.sleep(max(0.0, start + i / 30 - time.perf_counter()))
+
+
+def _p(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", default="1,4,8,16")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Baseline: encode inline on the callback thread, one session.
+        segment = _Segment(os.path.join(tmp, "inline.mkv"), True, True)
+        t0 = time.perf_counter()
+        inline_ms = []
+        _feed(lambda f: segment.write_video(f, int((time.perf_counter() - t0) * 1000)), segment.write_audio,
+              args.seconds, args.width, args.height, inline_ms)
+        segment.close()
+        print(f"inline encode, 1 session: callback p50 {_p(inline_ms, 0.5):.2f} ms p99 {_p(inline_ms, 0.99):.2f} ms")
+
+        print(f"{'sessions':>8} {'cb p50 ms':>9} {'cb p99 ms':>9} {'video in':>8} {'dropped':>7} {'max depth':>9} {'encode fps':>10}")
+        for n in (int(s) for s in args.sessions.split(",")):
+            recorders = [SessionRecorder(f"bench-{n}-{i}", out_dir=tmp) for i in range(n)]
+            callback_ms = [[] for _ in range(n)]
+            threads = []
+            for rec, samples in zip(recorders, callback_ms):
+                rec.start_segment(0)
+                threads.append(threading.Thread(
+                    target=_feed, args=(rec.on_video_frame, rec.on_audio_frame, args.seconds, args.width, args.height, samples)))
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            for rec in recorders:
+                rec.stop()
+            for rec in recorders:
+                rec.join(60)
+            infos = [rec.info() for rec in recorders]
+            all_ms = [ms for samples in callback_ms for ms in samples]
+            video_in = sum(i["video_frames"] for i in infos)
+            dropped = sum(i["dropped_video"] + i["dropped_audio"] for i in infos)
+            depth = max(i["max_queue_depth"] for i in infos)
+            fps = sum(i["encode_fps"] for i in infos) / n
+            print(f"{n:>8} {_p(all_ms, 0.5):>9.2f} {_p(all_ms, 0.99):>9.2f} {video_in:>8} {dropped:>7} {depth:>9} {fps:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Prompt size and extraction throughput of the offline skill extractor on long resumes.
+# Usage: python benchmarks/bench_skill_extraction.py [--lines 50,500,5000]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks._corpus import resume_lines  # noqa: E402
+from modules import question_generator as qg  # noqa: E402
+from modules.skill_extractor import analyze_resume  # noqa: E402
+
+
+def _resume(n_lines: int) -> str:
+    lines = resume_lines(n_lines)
+    q = max(1, n_lines // 4)
+    return "\n".join(
+        ["Jane Candidate", "Summary"] + lines[:q]
+        + ["Experience"] + lines[q:2 * q]
+        + ["Projects"] + lines[2 * q:3 * q]
+        + ["Skills"] + lines[3 * q:]
+    )
+
+
+def _tokens(text: str) -> int:
+    # Rough BPE estimate; good enough to compare prompt sizes.
+    return max(1, len(text) // 4)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", default="50,500,5000")
+    args = parser.parse_args()
+
+    print(f"{'lines':>6} {'raw tok':>8} {'prompt tok':>10} {'reduction':>9} {'extract MB/s':>12} {'fallback ms':>11}")
+    for n in (int(x) for x in args.lines.split(",")):
+        text = _resume(n)
+        raw_prompt = _tokens(text) + 40
+        prompt = _tokens(qg._build_messages(text)[0]["content"])
+
+        runs = max(3, 20000 // n)
+        start = time.perf_counter()
+        for _ in range(runs):
+            analyze_resume(text)
+        per_call = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        qg._fallback_questions(text)
+        fallback_ms = (time.perf_counter() - start) * 1000
+
+        mbps = len(text.encode()) / per_call / 1e6
+        print(f"{n:>6} {raw_prompt:>8} {prompt:>10} {1 - prompt / raw_prompt:>8.0%} {mbps:>12.1f} {fallback_ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Cold-start import time and RSS per worker: what the landing page loads vs every page module.
+# Each scenario runs in a fresh interpreter with -X importtime.
+# Usage: python benchmarks/bench_startup.py [--top 8]
+import argparse
+import os
+import subprocess
+import sys
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+SCENARIOS = {
+    # app.py imports metrics and session_store eagerly on every page.
+    "landing (lazy)": ["streamlit", "streamlit.components.v1", "modules.metrics", "modules.session_store", "modules.lazy"],
+    "eager (all pages)": [
+        "streamlit",
+        "streamlit.components.v1",
+        "modules.metrics",
+        "modules.session_store",
+        "modules.auth",
+        "modules.resume_parser",
+        "modules.question_generator",
+        "modules.faq_bot",
+        "modules.video_recorder",
+        "modules.tts",
+    ],
+}
+
+_PROBE = "import resource, {imports}; print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+
+def _run(modules):
+    code = _PROBE.format(imports=", ".join(modules))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_root,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rss_kb = int(proc.stdout.strip().splitlines()[-1])
+    per_package = {}
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = (part.strip() for part in line[len("import time:"):].split("|", 2))
+        if not self_us.isdigit():
+            continue
+        top = name.split(".")[0]
+        per_package[top] = per_package.get(top, 0) + int(self_us)
+    return rss_kb, per_package
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+
+    for label, modules in SCENARIOS.items():
+        rss_kb, per_package = _run(modules)
+        total_ms = sum(per_package.values()) / 1000
+        print(f"{label}: {total_ms:.0f} ms imports, {rss_kb / 1024:.0f} MB RSS")
+        for name, us in sorted(per_package.items(), key=lambda kv: -kv[1])[: args.top]:
+            print(f"    {name:<28} {us / 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Server load of the answer countdown, measured: N concurrent AppTest candidates sit on the
+# Interview page for a fixed window under each timer model, and the script runs app.py
+# actually executed (its rerun_seconds histogram) and the process CPU are reported.
+#   before: the old countdown. Every rerun ended in time.sleep(1) + st.rerun(), so the
+#           driver replays it per candidate: a full rerun, a one-second pause, repeat.
+#   after:  the page renders once, the browser counts down, and the scheduled fragment
+#           wakes the server at expiry, which reruns once to show "Time's up". AppTest
+#           cannot run a fragment on its own, so that wake is driven as a full rerun.
+# In both models candidates answer --answer-seconds windows back to back, each opened by Next.
+# Usage: python benchmarks/bench_timer_load.py [--candidates 1,10,20] [--window 30] [--answer-seconds 15]
+import argparse
+import os
+import sys
+import threading
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, _root)
+os.environ.setdefault("SESSION_STORE", "memory")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from benchmarks.load_sessions import _percentile, _prepare_apptest, _shared  # noqa: E402
+from modules import metrics, session_store, video_recorder  # noqa: E402
+from modules.auth import issue_tokens  # noqa: E402
+
+
+def _interview_app(name: str):
+    at = AppTest.from_file(os.path.join(_root, "app.py"), default_timeout=120)
+    at._bidi_component_manager = _shared.get("components")
+    at.session_state.started = True
+    at.session_state.access_token = issue_tokens(f"{name}@example.com")["access"]
+    at.session_state.page = "Interview"
+    at.session_state.video_started = True
+    interview = session_store.get_store().create(f"{name}@example.com")
+    interview.update(questions=[f"Question {i}?" for i in range(5)], waiting_for_audio=False)
+    at.session_state.interview_id = interview.id
+    return at, interview
+
+
+def _script_runs() -> int:
+    return sum(h["count"] for name, h in metrics.snapshot()["histograms"].items() if name.startswith("rerun_seconds"))
+
+
+class Candidate:
+    def __init__(self, name: str, model: str, answer_seconds: float, delay: float):
+        self.at, self.interview = _interview_app(name)
+        self.model = model
+        self.answer_seconds = answer_seconds
+        self.delay = delay
+        self.latencies = []
+        self.error = None
+
+    def _run(self):
+        start = time.perf_counter()
+        self.at.run()
+        self.latencies.append(time.perf_counter() - start)
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def run(self, stop: threading.Event):
+        try:
+            stop.wait(self.delay)
+            while not stop.is_set():
+                # Next: a fresh answer window.
+                self.interview.update(timer=int(self.answer_seconds), timer_deadline=None)
+                self._run()
+                deadline = self.interview.timer_deadline
+                if self.model == "before":
+                    while not stop.wait(1) and self.interview.timer > 0:
+                        self.interview.timer = max(0, round(deadline - time.time()))
+                        self._run()
+                elif not stop.wait(max(0.0, deadline - time.time())):
+                    self._run()  # the fragment's wake at expiry
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+
+def run_level(n: int, model: str, args) -> dict:
+    # Starts are staggered over a second, like candidates who did not click at the same instant.
+    candidates = [Candidate(f"timer-{model}-{n}-{i}", model, args.answer_seconds, i / n) for i in range(n)]
+    stop = threading.Event()
+    threads = [threading.Thread(target=c.run, args=(stop,), daemon=True) for c in candidates]
+    runs, cpu, wall = _script_runs(), time.process_time(), time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.window)
+    stop.set()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+    runs, cpu = _script_runs() - runs, time.process_time() - cpu
+    latencies = [s for c in candidates for s in c.latencies]
+    return {
+        "reruns_per_s": runs / wall,
+        "cpu_per_s": cpu / wall,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "errors": [c.error for c in candidates if c.error],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", default="1,10,20")
+    parser.add_argument("--window", type=float, default=30.0, help="seconds measured per model and level")
+    parser.add_argument("--answer-seconds", type=float, default=15.0)
+    args = parser.parse_args()
+
+    _prepare_apptest()
+    import mongomock
+    from modules import auth
+
+    auth.MongoClient = lambda *a, **kw: mongomock.MongoClient()
+    auth.close_mongo_client()
+    # streamlit-webrtc needs a live server session; AppTest has none, so render the
+    # "WebRTC unavailable" branch (everything else on the page still runs).
+    video_recorder._WEBRTC_AVAILABLE = False
+    at, _ = _interview_app("timer-warm")
+    at.run()  # warm imports and caches
+
+    print(f"{args.window:.0f} s window per level, {args.answer_seconds:.0f} s answer windows, {os.cpu_count()} CPUs")
+    print(f"{'candidates':>10} {'model':>7} {'reruns/s':>9} {'CPU s/s':>8} {'p95 ms':>8}")
+    for n in (int(c) for c in args.candidates.split(",")):
+        for model in ("before", "after"):
+            r = run_level(n, model, args)
+            print(f"{n:>10} {model:>7} {r['reruns_per_s']:>9.2f} {r['cpu_per_s']:>8.3f} {r['p95_ms']:>8.1f}")
+            for error in r["errors"][:3]:
+                print(f"    {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Offline evaluation of the FAQ direct-answer fast path on a labelled query
+# set (benchmarks/faq_eval_set.jsonl: query + expected FAQ question, or null
+# when the FAQ does not cover it). For each threshold/margin pair it reports how
+# many queries skip the LLM, how often those direct answers agree with the label,
+# and how many uncovered queries were wrongly answered directly. Then it runs
+# the full answer_query pipeline with a stub LLM and prints the per-path latency.
+# Usage: python benchmarks/eval_faq_direct.py [--faq data/hr_faq.txt] [--llm-latency 0.8]
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_here, ".."))
+
+from modules import faq_bot  # noqa: E402
+from modules.faq_index import FAQ_PATH, build_index, load_index  # noqa: E402
+from modules.faq_retrieval import QuestionRetriever, split_question_answer  # noqa: E402
+
+
+class _StubLLM:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def chat(self, messages, **kwargs):
+        time.sleep(self.latency)
+        return "stub llm answer"
+
+
+def _load_labels(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--faq", default=FAQ_PATH)
+    parser.add_argument("--labels", default=os.path.join(_here, "faq_eval_set.jsonl"))
+    parser.add_argument("--thresholds", default="0.5,0.6,0.7,0.8,0.9")
+    parser.add_argument("--margins", default="0.1,0.2,0.3")
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    args = parser.parse_args()
+
+    labels = _load_labels(args.labels)
+    with tempfile.TemporaryDirectory() as tmp:
+        build_index(args.faq, os.path.join(tmp, "index"))
+        index = load_index(os.path.join(tmp, "index"))
+    questions = [split_question_answer(t)[0] for t in index["texts"]]
+    vectors = [index["vectorizer"].transform([row["query"]]) for row in labels]
+    in_scope = sum(1 for row in labels if row["expected"])
+
+    print(f"{len(labels)} labelled queries ({in_scope} covered by the FAQ, {len(labels) - in_scope} not)")
+    print(f"{'threshold':>9} {'margin':>6} {'direct':>7} {'agree':>6} {'wrong':>6} {'false direct':>12} {'agreement':>9}")
+    for threshold in (float(t) for t in args.thresholds.split(",")):
+        for margin in (float(m) for m in args.margins.split(",")):
+            retriever = QuestionRetriever(index, threshold=threshold, margin=margin)
+            direct = agree = wrong = false_direct = 0
+            for row, vec in zip(labels, vectors):
+                match = retriever.direct_answer(vec, row["query"])
+                if match is None:
+                    continue
+                direct += 1
+                if row["expected"] is None:
+                    false_direct += 1
+                elif questions[match[0]] == row["expected"]:
+                    agree += 1
+                else:
+                    wrong += 1
+            rate = agree / direct if direct else 0.0
+            print(f"{threshold:>9.2f} {margin:>6.2f} {direct:>7} {agree:>6} {wrong:>6} {false_direct:>12} {rate:>9.1%}")
+
+    # End-to-end with the configured defaults; the cache is disabled so every
+    # query exercises the direct or LLM path.
+    faq_bot.qa_ctx = {"llm": _StubLLM(args.llm_latency)}
+    faq_bot.answer_cache.max_entries = 0
+    paths = {}
+    for row in labels:
+        _, path = faq_bot.answer_query(row["query"], index)
+        paths[path] = paths.get(path, 0) + 1
+    print(f"\nanswer_query paths: {paths}")
+    for path, stats in faq_bot.latency_breakdown().items():
+        print(f"  {path:>6}: n={stats['count']:<3} mean {stats['mean_ms']:.3f} ms  p50 {stats['p50_ms']:.3f} ms  p95 {stats['p95_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
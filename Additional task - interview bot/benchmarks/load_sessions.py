@@ -0,0 +1,331 @@
+# Concurrent-session load harness: how many simultaneous candidates fit on one worker.
+# Drives N headless app.py sessions in parallel with streamlit's AppTest, each scripting
+# the real flow (landing -> sign up -> log in -> upload resume -> generate questions ->
+# interview with question audio, timer expiry and Next -> FAQ questions) against local
+# stand-ins only: the stub LLM server, the stub TTS engine and mongomock. For every
+# concurrency level it reports rerun latency percentiles, CPU seconds and RSS growth
+# per session, and the share of sessions that completed the flow.
+#
+# Usage: python benchmarks/load_sessions.py [--concurrency 1,4,8] [--questions 3] [--faq 3]
+#        [--llm-latency 0.2] [--token-delay 0.0] [--think 0.0] [--bcrypt-rounds 12] [--json out.json]
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+_root = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, _root)
+
+_tmp = tempfile.mkdtemp(prefix="interview_bot_load_")
+# Offline configuration, set before any app module is imported.
+os.environ.update(
+    QUESTION_CACHE_DB="",
+    RESUME_CACHE_DB="",
+    TTS_ENGINE="stub",
+    TTS_CACHE_DIR=os.path.join(_tmp, "tts"),
+    FAQ_INDEX_DIR=os.path.join(_tmp, "faq_index"),
+    RECORDING_DIR=os.path.join(_tmp, "recordings"),
+    SESSION_STORE_DB=os.path.join(_tmp, "sessions.sqlite3"),
+    AUTH_JWT_SECRET="load-secret",
+    MONGODB_DB="interview_bot_load",
+)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from benchmarks._corpus import faq_queries, make_pdf  # noqa: E402
+from modules import session_store  # noqa: E402
+
+PDF_TYPE = "application/pdf"
+BUSY_BACKOFF = 0.25
+_shared = {}  # AppTest internals shared by all sessions, see _prepare_apptest()
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class FlowError(RuntimeError):
+    pass
+
+
+class Session:
+    # One simulated candidate; every AppTest.run() is a rerun and is timed.
+    def __init__(self, name: str, resume_pdf: bytes, questions: int, faq: list, think: float, busy_retries: int):
+        self.name = name
+        self.email = f"{name}@example.com"
+        self.resume_pdf = resume_pdf
+        self.questions = questions
+        self.faq = faq
+        self.think = think
+        self.busy_retries = busy_retries
+        self.samples = []  # (step, seconds)
+        self.busy = 0
+        self.error = None
+        self.at = AppTest.from_file(os.path.join(_root, "app.py"), default_timeout=120)
+        self.at._bidi_component_manager = _shared.get("components")
+
+    def _run(self, step: str, widget=None):
+        if self.think:
+            time.sleep(self.think)
+        start = time.perf_counter()
+        if widget is None:
+            self.at.run()
+        else:
+            widget.run()
+        self.samples.append((step, time.perf_counter() - start))
+        if self.at.exception:
+            raise FlowError(f"{step}: {self.at.exception[0].message}")
+
+    @property
+    def interview(self):
+        # Interview progress lives in the server-side store, keyed by the session's handle.
+        return session_store.get_store().get(self.at.session_state.interview_id)
+
+    def _expect_page(self, step: str, page: str):
+        if self.at.session_state.page != page:
+            shown = [e.value for e in (*self.at.error, *self.at.warning)]
+            raise FlowError(f"{step}: expected page {page!r}, got {self.at.session_state.page!r} {shown}")
+
+    def _submit(self, step: str, form: str, button: str, fields: dict, page: str):
+        # The auth pool sheds load with "Server is busy"; retry like a candidate would.
+        for attempt in range(self.busy_retries + 1):
+            inputs = {t.label: t for t in self.at.text_input}
+            for label, value in fields.items():
+                inputs[label].input(value)
+            self._run(step, self.at.button(key=f"FormSubmitter:{form}-{button}").click())
+            if self.at.session_state.page == page or not any("busy" in w.value for w in self.at.warning):
+                break
+            self.busy += 1
+            time.sleep(BUSY_BACKOFF * min(attempt + 1, 8))
+        self._expect_page(step, page)
+
+    def run(self):
+        try:
+            self._flow()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    def _flow(self):
+        at = self.at
+        self._run("landing")
+        self._run("start_now", next(b for b in at.button if b.label == "Start Now!").click())
+        self._expect_page("start_now", "Sign Up")
+
+        self._submit("signup", "signup_form", "Sign Up", {
+            "Full Name": "Load Candidate",
+            "Email Address": self.email,
+            "Password": "load-password",
+            "Confirm Password": "load-password",
+        }, page="Login")
+        self._submit("login", "login_form", "Login", {
+            "Email Address": self.email,
+            "Password": "load-password",
+        }, page="Upload Resume")
+        if not at.session_state.authenticated:
+            raise FlowError("login: not authenticated")
+
+        at.get("file_uploader")[0].set_value((f"{self.name}.pdf", self.resume_pdf, PDF_TYPE))
+        self._run("upload")
+        self._run("generate", next(b for b in at.button if b.label.endswith("Generate Questions")).click())
+        if not self.interview.questions:
+            raise FlowError("generate: no questions")
+
+        self._run("open_interview", at.button(key="interview_btn").click())
+        self._run("start_recording", next(b for b in at.button if b.label.endswith("Start Recording")).click())
+        for i in range(self.questions):
+            # The question-audio rerun stops early; the next rerun renders the timer.
+            self._run("question_ready")
+            if i % 2:
+                # Let the answer window run out: the expiry rerun.
+                self.interview.timer_deadline = time.time() - 1
+                self._run("timer_expiry")
+            if i == self.questions - 1:
+                break
+            self._run("next", next(b for b in at.button if b.label.endswith("Next")).click())
+
+        self._run("open_faq", at.button(key="faq_btn").click())
+        self._expect_page("open_faq", "FAQ Bot")
+        for question in self.faq:
+            at.text_input[0].input(question)
+            self._run("faq_submit", next(b for b in at.button if b.label == "Submit").click())
+
+
+def run_level(n: int, args, level: int, rss_baseline: int = None) -> dict:
+    # A distinct resume per session, so every generation misses the question cache.
+    sessions = [
+        Session(f"load{level}-{i}", make_pdf(args.resume_pages, seed=level * 1000 + i), args.questions,
+                faq_queries(args.faq, seed=i), args.think, args.busy_retries)
+        for i in range(n)
+    ]
+    gc.collect()
+    if rss_baseline is None:
+        rss_baseline = _rss_bytes()
+    cpu_before = time.process_time()
+    wall_before = time.perf_counter()
+    threads = [threading.Thread(target=s.run, name=s.name) for s in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_before
+    cpu = time.process_time() - cpu_before
+    # Sessions are still referenced here, so their state counts towards RSS;
+    # growth is measured from the warmed-up process, before any of this level's work.
+    rss = _rss_bytes()
+
+    latencies = [s for session in sessions for _, s in session.samples]
+    by_step = {}
+    for session in sessions:
+        for step, seconds in session.samples:
+            by_step.setdefault(step, []).append(seconds)
+    errors = [f"{s.name}: {s.error}" for s in sessions if s.error]
+    result = {
+        "sessions": n,
+        "completed": n - len(errors),
+        "reruns": len(latencies),
+        "auth_busy_retries": sum(s.busy for s in sessions),
+        "wall_s": wall,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "cpu_s_per_session": cpu / n,
+        "cpu_utilisation": cpu / wall if wall else 0.0,
+        "rss_mb": rss / 2**20,
+        "rss_mb_per_session": (rss - rss_baseline) / n / 2**20,
+        "steps_p95_ms": {step: _percentile(v, 0.95) * 1000 for step, v in sorted(by_step.items())},
+        "steps_median_ms": {step: statistics.median(v) * 1000 for step, v in sorted(by_step.items())},
+        "errors": errors[:5],
+    }
+    del sessions, threads
+    gc.collect()
+    return result
+
+
+def _prepare_apptest():
+    # AppTest is built for one app at a time: every run installs a mock Runtime
+    # singleton and clears it when it finishes, flips global.appTest around the
+    # run, and compiles app.py again with a fresh script cache. With sessions
+    # running side by side, one session's cleanup would pull the runtime out
+    # from under another, and concurrent compile() calls trip a CPython 3.11
+    # bug. Share what a real worker shares: one runtime, one script cache and
+    # one component registry (discovering components costs ~200 ms per AppTest).
+    from unittest.mock import MagicMock
+    from streamlit import config
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.logger import set_log_level
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance if cls._instance is not None else shared)
+    Runtime.exists = classmethod(lambda cls: True)
+    config.set_option("global.appTest", True)
+    script_cache = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, path: get_bytecode(script_cache, path)
+    components = BidiComponentManager()
+    components.discover_and_register_components(start_file_watching=False)
+    shared.bidi_component_registry = components
+    _shared["components"] = components
+    # Every AppTest run re-applies logger.level; bare-mode threads would log a
+    # "missing ScriptRunContext" warning per background task otherwise.
+    config.set_option("logger.level", "error")
+    set_log_level("error")
+
+
+def _setup(args):
+    _prepare_apptest()
+    # Read at import time by modules.auth.
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    import mongomock
+    from benchmarks.stub_llm import StubLLMServer
+    from modules import auth, video_recorder
+
+    server = StubLLMServer(latency=args.llm_latency, token_delay=args.token_delay).start()
+    os.environ.update(GROQ_API_KEY="stub", LLM_BASE_URL=server.base_url)
+    shared = mongomock.MongoClient()
+    auth.MongoClient = lambda *a, **kw: shared
+    auth.close_mongo_client()
+    # streamlit-webrtc needs a live server session; AppTest has none, so render the
+    # "WebRTC unavailable" branch (everything else on the page still runs).
+    video_recorder._WEBRTC_AVAILABLE = False
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", default="1,4,8")
+    parser.add_argument("--questions", type=int, default=3, help="interview questions stepped through per session")
+    parser.add_argument("--faq", type=int, default=3, help="FAQ questions asked per session")
+    parser.add_argument("--resume-pages", type=int, default=2)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--think", type=float, default=0.0, help="pause before each interaction (seconds)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="production cost by default")
+    parser.add_argument("--busy-retries", type=int, default=20, help="retries when the auth pool answers busy")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = _setup(args)
+    # One untimed session warms imports, the FAQ index and the caches.
+    warm = run_level(1, args, level=0)
+    if warm["errors"]:
+        print(f"warm-up session failed: {warm['errors'][0]}")
+        return 1
+    gc.collect()
+    rss_baseline = _rss_bytes()
+
+    results = []
+    print(f"{'sessions':>8} {'done':>5} {'reruns':>6} {'wall s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'CPU s/sess':>10} {'CPU util':>8} {'RSS MB':>7} {'MB/sess':>8}")
+    for level, n in enumerate((int(c) for c in args.concurrency.split(",")), start=1):
+        r = run_level(n, args, level, rss_baseline)
+        results.append(r)
+        print(f"{r['sessions']:>8} {r['completed']:>5} {r['reruns']:>6} {r['wall_s']:>7.1f} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['cpu_s_per_session']:>10.3f} {r['cpu_utilisation']:>8.0%} "
+              f"{r['rss_mb']:>7.0f} {r['rss_mb_per_session']:>8.2f}")
+        if r["auth_busy_retries"]:
+            print(f"    auth pool busy, retried {r['auth_busy_retries']}x")
+        for error in r["errors"]:
+            print(f"    {error}")
+
+    slowest = results[-1]["steps_p95_ms"]
+    print(f"\np95 by step at {results[-1]['sessions']} sessions:")
+    for step, ms in sorted(slowest.items(), key=lambda item: -item[1]):
+        print(f"  {step:<16} {ms:8.1f} ms")
+    print(f"stub LLM requests: {server.requests}; warmed-up RSS {rss_baseline / 2**20:.0f} MB")
+    store = session_store.get_store().info()
+    print(f"session store: {store['active']} active, {store['bytes_per_session']:.0f} B/session held, "
+          f"{store['writes']} writes ({store['fields_written']} fields), {store['write_errors']} write errors")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "levels": results}, f, indent=2)
+    return 0 if all(r["completed"] == r["sessions"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
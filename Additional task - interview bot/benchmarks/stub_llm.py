@@ -0,0 +1,118 @@
+# Local stand-in for the chat-completions API, for offline benchmarks and load runs.
+# Usage: python benchmarks/stub_llm.py [--port 8765] [--latency 0.5] [--token-delay 0.02] [--fail-rate 0.0]
+# then point the app at it with LLM_BASE_URL=http://127.0.0.1:8765 GROQ_API_KEY=stub
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_REPLY = "\n".join(
+    [
+        "1. Walk me through the project on your resume you are most proud of.",
+        "2. How did you measure the impact of your last role?",
+        "3. Describe a time you disagreed with a teammate and how you resolved it.",
+        "4. Which skill on your resume are you currently improving, and how?",
+        "5. Why are you interested in this position?",
+    ]
+)
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        fail_rate: float = 0.0,
+        reply: str = DEFAULT_REPLY,
+        token_delay: float = 0.0,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.token_delay = token_delay
+        self.fail_rate = fail_rate
+        self.reply = reply
+        self.requests = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse connections
+    # Headers and body go out in separate writes; without this, Nagle plus the
+    # client's delayed ACK adds ~40 ms to every keep-alive response.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        server.requests += 1
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(server.latency)
+        if random.random() < server.fail_rate:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if payload.get("stream"):
+            self._stream(payload)
+            return
+        time.sleep(server.token_delay * len(server.reply.split(" ")))
+        body = json.dumps(
+            {
+                "id": "stub",
+                "object": "chat.completion",
+                "model": payload.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": server.reply}, "finish_reason": "stop"}],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, payload):
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = server.reply.split(" ")
+        for i, word in enumerate(words):
+            time.sleep(server.token_delay)
+            token = word if i == len(words) - 1 else word + " "
+            chunk = {"choices": [{"index": 0, "delta": {"content": token}}], "model": payload.get("model", "stub")}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = StubLLMServer(args.port, args.latency, args.fail_rate, token_delay=args.token_delay)
+    print(f"stub chat-completions API on {server.base_url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
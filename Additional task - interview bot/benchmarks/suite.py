@@ -0,0 +1,384 @@
+# Offline benchmark suite with regression gates. Every case runs without
+# network: generated PDFs/DOCX, synthetic FAQ corpora, the local stub LLM, the
+# stub TTS engine and mongomock. Each case reports the median and the minimum
+# of its runs; results are compared with benchmarks/baselines.json and the run
+# fails when a case's minimum (the least noisy statistic on a shared machine;
+# --gate-on median to change) is slower than its baseline by more than
+# --threshold (relative) and by more than the case's min_delta or --min-delta,
+# whichever is larger (absolute seconds, to ignore noise on fast cases). A case
+# that looks regressed is measured again (--confirm times) and only fails if it
+# is still slower with all of its samples pooled. Shared machines also drift
+# as a whole, so every case first times a fixed pure-Python workload and the
+# baseline is scaled by how much faster or slower that ran than when recorded.
+#
+# Usage:
+#   python benchmarks/suite.py                      # run, compare, exit 1 on regression
+#   python benchmarks/suite.py --only faq_          # cases whose name contains "faq_"
+#   python benchmarks/suite.py --update-baseline    # accept current numbers
+import argparse
+import fnmatch
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(_here, ".."))
+
+_tmp = tempfile.mkdtemp(prefix="interview_bot_suite_")
+# Offline configuration, set before any app module is imported.
+os.environ.update(
+    QUESTION_CACHE_DB="",
+    RESUME_CACHE_DB="",
+    TTS_ENGINE="stub",
+    TTS_CACHE_DIR=os.path.join(_tmp, "tts"),
+    BCRYPT_ROUNDS="4",
+    AUTH_JWT_SECRET="suite",
+    MONGODB_DB="interview_bot_suite",
+    METRICS_ENABLED="0",
+)
+
+from benchmarks._corpus import Upload, faq_queries, make_docx, make_faq, make_pdf, resume_lines  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(_here, "baselines.json")
+CASES = []
+_unique = itertools.count()  # shared, so warm-up and timed runs never reuse an input
+
+
+def case(name: str, runs: int = 5, min_delta: float = 0.0):
+    # fn(runs) -> list of per-run seconds; setup happens outside the timed part.
+    def register(fn):
+        CASES.append((name, runs, min_delta, fn))
+        return fn
+
+    return register
+
+
+def _timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# -------------------- Resume parsing --------------------
+def _parse_case(pages: int):
+    def run(runs):
+        from modules import resume_parser
+        from modules.resume_parser import PDF_TYPE
+
+        resume_parser.MAX_PAGES = 10_000
+        data = make_pdf(pages)
+        return _timed(lambda: resume_parser.parse_resume(Upload(data, PDF_TYPE)), runs)
+
+    return run
+
+
+# Small documents are cheap to repeat and noisy, so they get more runs.
+for _pages, _runs in ((1, 15), (20, 7), (100, 3)):
+    case(f"parse_pdf_{_pages}p", runs=_runs, min_delta=0.002)(_parse_case(_pages))
+
+
+@case("parse_docx_2000_lines", runs=9, min_delta=0.005)
+def _parse_docx(runs):
+    from modules import resume_parser
+    from modules.resume_parser import DOCX_TYPE
+
+    data = make_docx(2000)
+    return _timed(lambda: resume_parser.parse_resume(Upload(data, DOCX_TYPE)), runs)
+
+
+# -------------------- FAQ index and retrieval --------------------
+_faq_indexes = {}
+
+
+def _faq_index(entries: int):
+    from modules.faq_index import build_index, load_index
+
+    if entries not in _faq_indexes:
+        faq_path = os.path.join(_tmp, f"faq_{entries}.txt")
+        with open(faq_path, "w", encoding="utf-8") as f:
+            f.write(make_faq(entries))
+        index_dir = os.path.join(_tmp, f"faq_index_{entries}")
+        build_index(faq_path, index_dir)
+        _faq_indexes[entries] = (faq_path, index_dir, load_index(index_dir))
+    return _faq_indexes[entries]
+
+
+def _faq_build_case(entries: int):
+    def run(runs):
+        from modules.faq_index import build_index
+
+        faq_path, index_dir, _ = _faq_index(entries)
+        return _timed(lambda: build_index(faq_path, index_dir), runs)
+
+    return run
+
+
+def _faq_query_case(entries: int, kind: str):
+    def run(runs):
+        from modules.faq_retrieval import get_retriever
+
+        retriever = get_retriever(_faq_index(entries)[2], kind)
+        queries = faq_queries(20)
+        # One sample = mean latency of a single query over 20 queries.
+        return [t / len(queries) for t in _timed(lambda: [retriever.search([q]) for q in queries], runs)]
+
+    return run
+
+
+for _entries in (1000, 20000):
+    # Builds write files, so they carry filesystem noise on top of CPU time.
+    case(f"faq_index_build_{_entries}", runs=3, min_delta=0.015)(_faq_build_case(_entries))
+    case(f"faq_query_tfidf_{_entries}")(_faq_query_case(_entries, "tfidf"))
+    case(f"faq_query_bm25_{_entries}")(_faq_query_case(_entries, "bm25"))
+
+
+# -------------------- Question generation (stub LLM) --------------------
+_stub_server = None
+
+
+def _stub_llm():
+    global _stub_server
+    if _stub_server is None:
+        from benchmarks.stub_llm import StubLLMServer
+
+        _stub_server = StubLLMServer().start()
+        os.environ.update(GROQ_API_KEY="stub", LLM_BASE_URL=_stub_server.base_url)
+    return _stub_server
+
+
+@case("generate_questions_stub_llm", runs=10)
+def _generate_questions(runs):
+    _stub_llm()
+    from modules import question_generator
+
+    resume = "\n".join(resume_lines(120))
+    # A new resume per run so every call misses the question cache.
+    return _timed(lambda: question_generator.generate_questions(f"{resume}\nRef {next(_unique)}"), runs)
+
+
+def _breaker_cycle(stub, gateway):
+    # One outage and recovery, asserting every retry and breaker transition on the way.
+    from modules.llm_gateway import LLMUnavailableError
+
+    def fails(expected_requests: int):
+        before = stub.requests
+        try:
+            gateway.chat([{"role": "user", "content": "hi"}], model="stub")
+        except LLMUnavailableError:
+            pass
+        else:
+            raise AssertionError("chat succeeded against a failing upstream")
+        assert stub.requests - before == expected_requests, (stub.requests - before, expected_requests)
+
+    stats = dict(gateway.stats)
+    stub.fail_rate = 1.0
+    fails(1 + gateway.retries)  # every retry goes upstream
+    assert gateway.breaker.state == "closed"
+    fails(1 + gateway.retries)
+    assert gateway.breaker.state == "open"
+    fails(0)  # short-circuited, upstream untouched
+    time.sleep(gateway.breaker.reset_after)
+    assert gateway.breaker.state == "half-open"
+    fails(1 + gateway.retries)  # the failed trial reopens the breaker
+    assert gateway.breaker.state == "open"
+    stub.fail_rate = 0.0
+    fails(0)
+    time.sleep(gateway.breaker.reset_after)
+    assert gateway.breaker.state == "half-open"
+    assert gateway.chat([{"role": "user", "content": "hi"}], model="stub") == stub.reply
+    assert gateway.breaker.state == "closed"
+    delta = {name: gateway.stats[name] - stats[name] for name in stats}
+    assert delta == {"calls": 4, "retries": 3 * gateway.retries, "failures": 3, "rejected": 0, "short_circuited": 2}, delta
+
+
+@case("llm_breaker_cycle_stub_llm", runs=5, min_delta=0.02)
+def _llm_breaker_cycle(runs):
+    from benchmarks.stub_llm import StubLLMServer
+    from modules.llm_gateway import CircuitBreaker, LLMGateway
+
+    # A private stub, so flipping fail_rate cannot leak into other cases.
+    stub = StubLLMServer().start()
+    gateway = LLMGateway(
+        stub.base_url,
+        "stub",
+        retries=2,
+        backoff=0.001,
+        breaker=CircuitBreaker(failure_threshold=2, reset_after=0.05),
+    )
+    try:
+        return _timed(lambda: _breaker_cycle(stub, gateway), runs)
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+
+# -------------------- Question audio (stub TTS) --------------------
+@case("speak_text_cold", runs=20)
+def _speak_cold(runs):
+    from modules import tts
+
+    return _timed(lambda: tts.get_audio(f"Tell me about project number {next(_unique)}."), runs)
+
+
+@case("speak_text_warm", runs=20)
+def _speak_warm(runs):
+    from modules import tts
+
+    tts.get_audio("Tell me about yourself.")
+    return _timed(lambda: tts.get_audio("Tell me about yourself."), runs)
+
+
+# -------------------- Auth (mongomock) --------------------
+def _mongomock_auth():
+    import mongomock
+    from modules import auth
+
+    if not getattr(auth, "_suite_mongomock", False):
+        shared = mongomock.MongoClient()
+        auth.MongoClient = lambda *a, **kw: shared
+        auth.close_mongo_client()
+        auth._suite_mongomock = True
+    return auth
+
+
+@case("create_user_mongomock", runs=10)
+def _create_user(runs):
+    auth = _mongomock_auth()
+    return _timed(lambda: auth.create_user("Suite User", f"user{next(_unique)}@example.com", "suite-password"), runs)
+
+
+@case("verify_user_mongomock", runs=10)
+def _verify_user(runs):
+    auth = _mongomock_auth()
+    auth.create_user("Suite User", "login@example.com", "suite-password")
+    return _timed(lambda: auth.verify_user("login@example.com", "suite-password"), runs)
+
+
+# -------------------- Runner --------------------
+_samples = {}  # case name -> every sample taken this run
+_calibrations = {}  # case name -> calibration times taken next to those samples
+
+
+def _calibrate() -> float:
+    return min(_timed(lambda: sorted(str(i * 7919 % 10007) for i in range(60000)), 3))
+
+
+def _record(results: dict, name: str, fn, runs: int):
+    _calibrations.setdefault(name, []).append(_calibrate())
+    _samples.setdefault(name, []).extend(fn(runs))
+    pooled = _samples[name]
+    results[name] = {
+        "median_s": statistics.median(pooled),
+        "min_s": min(pooled),
+        "runs": len(pooled),
+        "calibration_s": min(_calibrations[name]),
+    }
+    print(f"{name:<32} median {results[name]['median_s'] * 1000:10.3f} ms  min {results[name]['min_s'] * 1000:10.3f} ms")
+
+
+def run_cases(pattern: str = None) -> dict:
+    results = {}
+    for name, runs, _, fn in CASES:
+        if pattern and not fnmatch.fnmatch(name, f"*{pattern}*"):
+            continue
+        fn(1)  # warm-up: imports, index builds, connection setup
+        _record(results, name, fn, runs)
+    return results
+
+
+def confirm(results: dict, names) -> dict:
+    # Measure suspected regressions again, pooling with the first samples.
+    for name, runs, _, fn in CASES:
+        if name in names:
+            _record(results, name, fn, runs)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float, gate_on: str = "min") -> list:
+    case_deltas = {name: delta for name, _, delta, _ in CASES}
+    stat = f"{gate_on}_s"
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("cases", {}).get(name)
+        if base is None:
+            continue
+        new, old = result[stat], base.get(stat, base["median_s"])
+        if base.get("calibration_s") and result.get("calibration_s"):
+            old *= result["calibration_s"] / base["calibration_s"]  # machine speed now vs then
+        if new > old * (1 + threshold) and new - old > max(min_delta, case_deltas.get(name, 0.0)):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", help="run cases whose name contains this substring")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", help="also write this run's results to a JSON file")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.3")))
+    parser.add_argument("--min-delta", type=float, default=float(os.getenv("BENCH_MIN_DELTA", "0.001")))
+    parser.add_argument("--gate-on", choices=("min", "median"), default=os.getenv("BENCH_GATE_ON", "min"))
+    parser.add_argument("--confirm", type=int, default=int(os.getenv("BENCH_CONFIRM", "2")),
+                        help="re-measure suspected regressions this many times before failing")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_cases(args.only)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "cases": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    if args.update_baseline:
+        # Merge, so a filtered run only replaces the cases it measured.
+        merged = dict(baseline.get("cases", {}), **results)
+        report["cases"] = dict(sorted(merged.items()))
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("no baseline yet; run with --update-baseline to record one")
+        return 0
+    regressions = compare(results, baseline, args.threshold, args.min_delta, args.gate_on)
+    for _ in range(args.confirm):
+        if not regressions:
+            break
+        print(f"re-measuring {', '.join(name for name, _, _ in regressions)}")
+        confirm(results, {name for name, _, _ in regressions})
+        regressions = compare(results, baseline, args.threshold, args.min_delta, args.gate_on)
+    missing = sorted(set(results) - set(baseline.get("cases", {})))
+    if missing:
+        print(f"not in baseline (not gated): {', '.join(missing)}")
+    if regressions:
+        print(f"\nREGRESSIONS ({args.gate_on} > {args.threshold:.0%} and > min delta slower than baseline):")
+        for name, old, new in regressions:
+            print(f"  {name:<32} {old * 1000:10.3f} ms -> {new * 1000:10.3f} ms ({new / old - 1:+.0%})")
+        return 1
+    print(f"\nno regressions against {os.path.relpath(args.baseline)} ({args.gate_on}, threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
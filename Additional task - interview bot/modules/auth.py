@@ -1,45 +1,379 @@
-import os
-import bcrypt
-from pymongo import MongoClient
-from dotenv import load_dotenv
-
-load_dotenv()
-
-def get_mongo_client():
-    uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-    return MongoClient(uri)
-
-def get_users_collection():
-    client = get_mongo_client()
-    db_name = os.getenv("MONGODB_DB", "interview_bot")
-    return client[db_name]["users"]
-
-def hash_password(password: str) -> bytes:
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-
-def check_password(password: str, hashed: bytes) -> bool:
-    try:
-        return bcrypt.checkpw(password.encode("utf-8"), hashed)
-    except Exception:
-        return False
-
-def create_user(full_name: str, email: str, password: str) -> bool:
-    users = get_users_collection()
-    if users.find_one({"email": email}):
-        return False
-    doc = {
-        "full_name": full_name,
-        "email": email,
-        "password": hash_password(password),
-    }
-    users.insert_one(doc)
-    return True
-
-def verify_user(email: str, password: str) -> bool:
-    users = get_users_collection()
-    user = users.find_one({"email": email})
-    if not user:
-        return False
-    return check_password(password, user.get("password", b""))
-
-
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import bcrypt
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import DuplicateKeyError
+from dotenv import load_dotenv
+from modules import metrics
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# One MongoClient per process: it owns the connection pool and monitor threads.
+_client = None
+_client_lock = threading.Lock()
+_indexes_ready = False
+# Build indexes in the background when the client starts; set to 0 when
+# `python -m modules.auth migrate` is run as a deploy step instead.
+ENSURE_INDEXES = os.getenv("AUTH_ENSURE_INDEXES", "1") == "1"
+
+
+def _mongo_client_options() -> dict:
+    return {
+        "maxPoolSize": int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("MONGODB_MAX_IDLE_MS", "60000")),
+        "connectTimeoutMS": int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "socketTimeoutMS": int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "10000")),
+    }
+
+
+def get_mongo_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+                _client = MongoClient(uri, **_mongo_client_options())
+                if ENSURE_INDEXES:
+                    threading.Thread(target=ensure_user_indexes, name="auth-indexes", daemon=True).start()
+    return _client
+
+
+def close_mongo_client():
+    global _client, _indexes_ready
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _indexes_ready = False
+
+
+def ensure_user_indexes(users=None) -> bool:
+    # Unique email index: makes lookups indexed and lets create_user be a single
+    # insert. Never raises: auth keeps working without it, just less strictly.
+    global _indexes_ready
+    try:
+        if users is None:
+            users = _users_collection()
+        users.create_index([("email", ASCENDING)], unique=True, name="email_unique")
+    except DuplicateKeyError:
+        logger.error(
+            "users collection holds duplicate emails; unique email index not created. "
+            "Remove the duplicates and run `python -m modules.auth migrate`."
+        )
+        return False
+    except Exception as e:
+        logger.warning("could not create the users email index: %s", e)
+        return False
+    _indexes_ready = True
+    return True
+
+
+def _users_collection():
+    client = get_mongo_client()
+    db_name = os.getenv("MONGODB_DB", "interview_bot")
+    return client[db_name]["users"]
+
+
+def get_users_collection():
+    return _users_collection()
+
+# -------------------- Password hashing --------------------
+# bcrypt releases the GIL, so a small thread pool hashes in parallel without
+# tying up the Streamlit script threads in an unbounded pile-up.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("AUTH_HASH_WORKERS", str(os.cpu_count() or 2)))
+HASH_MAX_PENDING = int(os.getenv("AUTH_HASH_MAX_PENDING", str(HASH_WORKERS * 4)))
+
+
+class AuthBusyError(RuntimeError):
+    """Raised when the hashing pool is saturated and the request is rejected."""
+
+
+_hash_pool = None
+_hash_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+_metrics_lock = threading.Lock()
+_hash_metrics = {
+    "completed": 0,
+    "rejected": 0,
+    "in_flight": 0,
+    "queue_wait_s": 0.0,
+    "hash_time_s": 0.0,
+    "max_queue_wait_s": 0.0,
+    "max_hash_time_s": 0.0,
+}
+
+
+def _get_hash_pool():
+    global _hash_pool
+    if _hash_pool is None:
+        with _client_lock:
+            if _hash_pool is None:
+                _hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+    return _hash_pool
+
+
+def _timed(fn, submitted_at, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        done = time.perf_counter()
+        wait, took = started - submitted_at, done - started
+        with _metrics_lock:
+            m = _hash_metrics
+            m["completed"] += 1
+            m["queue_wait_s"] += wait
+            m["hash_time_s"] += took
+            m["max_queue_wait_s"] = max(m["max_queue_wait_s"], wait)
+            m["max_hash_time_s"] = max(m["max_hash_time_s"], took)
+
+
+def _run_hashing(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        with _metrics_lock:
+            _hash_metrics["rejected"] += 1
+        raise AuthBusyError("Authentication is busy, please try again in a moment.")
+    with _metrics_lock:
+        _hash_metrics["in_flight"] += 1
+    try:
+        future = _get_hash_pool().submit(_timed, fn, time.perf_counter(), *args)
+        return future.result()
+    finally:
+        with _metrics_lock:
+            _hash_metrics["in_flight"] -= 1
+        _hash_slots.release()
+
+
+def get_hash_metrics() -> dict:
+    with _metrics_lock:
+        m = dict(_hash_metrics)
+    n = max(1, m["completed"])
+    m["avg_queue_wait_s"] = m["queue_wait_s"] / n
+    m["avg_hash_time_s"] = m["hash_time_s"] / n
+    m["workers"] = HASH_WORKERS
+    m["max_pending"] = HASH_MAX_PENDING
+    return m
+
+
+metrics.register_collector("auth_hash", get_hash_metrics)
+
+
+def _hash_cost(hashed: bytes) -> int:
+    try:
+        return int(hashed.split(b"$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return -1
+
+
+def _hashpw(password: str, rounds: int) -> bytes:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(password: str, hashed: bytes) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed)
+    except Exception:
+        return False
+
+
+def hash_password(password: str) -> bytes:
+    return _run_hashing(_hashpw, password, BCRYPT_ROUNDS)
+
+def check_password(password: str, hashed: bytes) -> bool:
+    return _run_hashing(_checkpw, password, hashed)
+
+@metrics.timed("create_user")
+def create_user(full_name: str, email: str, password: str) -> bool:
+    users = get_users_collection()
+    if not _indexes_ready and users.find_one({"email": email}, projection={"_id": 1}):
+        # No unique index (yet): fall back to checking first.
+        return False
+    doc = {
+        "full_name": full_name,
+        "email": email,
+        "password": hash_password(password),
+    }
+    try:
+        users.insert_one(doc)
+    except DuplicateKeyError:
+        return False
+    return True
+
+@metrics.timed("verify_user")
+def verify_user(email: str, password: str) -> bool:
+    users = get_users_collection()
+    user = users.find_one({"email": email}, projection={"password": 1, "_id": 0})
+    if not user:
+        return False
+    hashed = user.get("password", b"")
+    if not check_password(password, hashed):
+        return False
+    # Transparently upgrade/downgrade hashes stored with a different work factor.
+    if _hash_cost(hashed) != BCRYPT_ROUNDS:
+        try:
+            users.update_one({"email": email, "password": hashed}, {"$set": {"password": hash_password(password)}})
+        except Exception:
+            pass
+    return True
+
+
+# -------------------- Session tokens --------------------
+# HS256 JWTs signed with AUTH_JWT_SECRET. Any replica sharing the secret can
+# verify a token without touching MongoDB; only revocations are stored there.
+# The refresh token travels in the URL, so it is short-lived and single-use:
+# every refresh revokes it and issues a new one.
+ACCESS_TOKEN_TTL = int(os.getenv("AUTH_ACCESS_TOKEN_TTL", "900"))
+REFRESH_TOKEN_TTL = int(os.getenv("AUTH_REFRESH_TOKEN_TTL", str(12 * 3600)))
+REVOCATION_SYNC_SECONDS = int(os.getenv("AUTH_REVOCATION_SYNC_SECONDS", "30"))
+
+_revoked = {}  # jti -> exp
+_revoked_lock = threading.Lock()
+_revocation_sync_started = False
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@lru_cache(maxsize=1)
+def _signing_key() -> bytes:
+    secret = os.getenv("AUTH_JWT_SECRET")
+    if not secret:
+        # Per-process fallback: tokens then only verify on this replica, and
+        # every restart or replica change logs everyone out.
+        logger.error(
+            "AUTH_JWT_SECRET is not set; signing tokens with a random per-process key. "
+            "Sessions will not survive a restart or move between replicas."
+        )
+        return secrets.token_bytes(32)
+    return secret.encode("utf-8")
+
+
+_JWT_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def _sign(payload: dict) -> str:
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signing_input = f"{_JWT_HEADER}.{body}".encode("ascii")
+    sig = hmac.new(_signing_key(), signing_input, hashlib.sha256).digest()
+    return f"{_JWT_HEADER}.{body}.{_b64encode(sig)}"
+
+
+def _make_token(email: str, typ: str, ttl: int) -> str:
+    now = int(time.time())
+    return _sign({"sub": email, "typ": typ, "iat": now, "exp": now + ttl, "jti": secrets.token_hex(12)})
+
+
+def issue_tokens(email: str) -> dict:
+    _start_revocation_sync()
+    return {
+        "access": _make_token(email, "access", ACCESS_TOKEN_TTL),
+        "refresh": _make_token(email, "refresh", REFRESH_TOKEN_TTL),
+    }
+
+
+def verify_token(token: str, typ: str = "access"):
+    _start_revocation_sync()
+    try:
+        header, body, sig = token.split(".")
+        if header != _JWT_HEADER:
+            return None
+        expected = hmac.new(_signing_key(), f"{header}.{body}".encode("ascii"), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(sig)):
+            return None
+        claims = json.loads(_b64decode(body))
+    except Exception:
+        return None
+    if claims.get("typ") != typ or claims.get("exp", 0) < time.time():
+        return None
+    if claims.get("jti") in _revoked:
+        return None
+    return claims
+
+
+def refresh_tokens(refresh_token: str):
+    # Rotation: the old refresh token is revoked, so a leaked link stops
+    # working as soon as the owner's session refreshes.
+    claims = verify_token(refresh_token, typ="refresh")
+    if not claims or not revoke_token(refresh_token, typ="refresh"):
+        return None
+    return issue_tokens(claims["sub"])
+
+
+def _revocations_collection():
+    client = get_mongo_client()
+    db_name = os.getenv("MONGODB_DB", "interview_bot")
+    return client[db_name]["revoked_tokens"]
+
+
+def revoke_token(token: str, typ: str = "access") -> bool:
+    claims = verify_token(token, typ=typ)
+    if not claims:
+        return False
+    with _revoked_lock:
+        _revoked[claims["jti"]] = claims["exp"]
+    try:
+        _revocations_collection().update_one(
+            {"_id": claims["jti"]},
+            {"$set": {"exp": claims["exp"]}},
+            upsert=True,
+        )
+    except Exception:
+        pass
+    return True
+
+
+def sync_revocations():
+    now = int(time.time())
+    docs = _revocations_collection().find({"exp": {"$gt": now}}, projection={"exp": 1})
+    fresh = {d["_id"]: d["exp"] for d in docs}
+    with _revoked_lock:
+        fresh.update({jti: exp for jti, exp in _revoked.items() if exp > now})
+        _revoked.clear()
+        _revoked.update(fresh)
+
+
+def _revocation_sync_loop():
+    while True:
+        try:
+            sync_revocations()
+        except Exception:
+            pass
+        time.sleep(REVOCATION_SYNC_SECONDS)
+
+
+def _start_revocation_sync():
+    global _revocation_sync_started
+    if _revocation_sync_started:
+        return
+    with _revoked_lock:
+        if _revocation_sync_started:
+            return
+        _revocation_sync_started = True
+    threading.Thread(target=_revocation_sync_loop, name="token-revocations", daemon=True).start()
+
+
+if __name__ == "__main__":
+    # Deploy step: python -m modules.auth migrate
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python -m modules.auth migrate")
+    sys.exit(0 if ensure_user_indexes() else 1)
@@ -0,0 +1,339 @@
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from modules.resume_cache import file_digest, get_parse_cache
+from modules.resume_parser import DOCX_TYPE, MAX_FILE_BYTES, PDF_TYPE, PARSE_WORKERS
+
+# Headless batch ingestion for hiring drives: streams a directory or a
+# .zip/.tar(.gz) of PDF/DOCX resumes through a process-pool parse stage and a
+# concurrency-limited question-generation stage, with bounded queues between
+# them, and appends one JSON line per file to the output. The output doubles as
+# the checkpoint: a re-run skips every file already recorded in it, so an
+# interrupted batch resumes where it stopped. Files with identical bytes (by
+# SHA-256, also across runs) are parsed once and recorded as duplicates.
+# Records whose questions are the generic fallback (LLM down, breaker open)
+# get status "fallback" and are not checkpointed: the next run retries them
+# and appends a record that supersedes the earlier one.
+#
+#   python -m modules.batch_ingest resumes.zip -o candidates.jsonl
+
+PARSE_PROCESSES = int(os.getenv("BATCH_PARSE_WORKERS", str(PARSE_WORKERS)))
+GENERATE_CONCURRENCY = int(os.getenv("BATCH_GENERATE_CONCURRENCY", "4"))
+QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "32"))
+FSYNC_EVERY = int(os.getenv("BATCH_FSYNC_EVERY", "50"))
+PROGRESS_SECONDS = float(os.getenv("BATCH_PROGRESS_SECONDS", "10"))
+
+_TYPES = {".pdf": PDF_TYPE, ".docx": DOCX_TYPE}
+_DONE = object()
+
+
+class _BatchFile(io.BytesIO):
+    # The parser expects an upload-like object: bytes plus a MIME type.
+    def __init__(self, data: bytes, type: str):
+        super().__init__(data)
+        self.type = type
+
+
+def _file_type(name: str):
+    return _TYPES.get(os.path.splitext(name)[1].lower())
+
+
+# -------------------- Input --------------------
+def iter_inputs(path: str):
+    # Yields (source name, MIME type, size, read()) lazily, so an archive is
+    # never unpacked to disk and only files in flight are held in memory.
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                file_type = _file_type(name)
+                if file_type:
+                    full = os.path.join(root, name)
+                    yield full, file_type, os.path.getsize(full), lambda full=full: _read_file(full)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                file_type = _file_type(info.filename)
+                if file_type and not info.is_dir():
+                    yield f"{path}:{info.filename}", file_type, info.file_size, lambda info=info: zf.read(info)
+    elif tarfile.is_tarfile(path):
+        # Stream mode: members are read in archive order without seeking back.
+        with tarfile.open(path, "r|*") as tf:
+            for member in tf:
+                file_type = _file_type(member.name)
+                if file_type and member.isfile():
+                    data = tf.extractfile(member).read() if member.size <= MAX_FILE_BYTES else b""
+                    yield f"{path}:{member.name}", file_type, member.size, lambda data=data: data
+    else:
+        file_type = _file_type(path)
+        if file_type:
+            yield path, file_type, os.path.getsize(path), lambda: _read_file(path)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+# -------------------- Checkpoint --------------------
+def load_checkpoint(output: str) -> tuple:
+    # Sources already recorded in the output, and the first source seen for
+    # each file hash. A torn last line (the previous run was killed mid-write)
+    # is cut off so new records start on a clean line.
+    sources, digests = set(), {}
+    if not os.path.exists(output):
+        return sources, digests
+    good_end = 0
+    with open(output, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            good_end += len(line)
+            if record.get("status") == "fallback":
+                continue
+            sources.add(record.get("source"))
+            if record.get("sha256") and record.get("status") != "duplicate":
+                digests.setdefault(record["sha256"], record.get("source"))
+    if good_end != os.path.getsize(output):
+        with open(output, "r+b") as f:
+            f.truncate(good_end)
+    return sources, digests
+
+
+# -------------------- Stages --------------------
+def _init_parse_worker():
+    # Each batch worker parses whole files; no nested page-level pool.
+    from modules import resume_parser
+
+    resume_parser.PARSE_WORKERS = 1
+
+
+def _parse(data: bytes, file_type: str) -> tuple:
+    from modules import resume_parser
+
+    start = time.perf_counter()
+    try:
+        text = resume_parser.parse_resume(_BatchFile(data, file_type))
+        error = "Unsupported file format" if text == "Unsupported file format" else None
+    except Exception as e:
+        text, error = None, f"{type(e).__name__}: {e}"
+    return text, error, time.perf_counter() - start
+
+
+class BatchIngest:
+    def __init__(self, output: str, parse_workers: int = PARSE_PROCESSES,
+                 concurrency: int = GENERATE_CONCURRENCY, queue_size: int = QUEUE_SIZE,
+                 questions: bool = True):
+        self.output = output
+        self.parse_workers = max(1, parse_workers)
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(1, queue_size)
+        self.questions = questions
+        # Files between reading and generation; the reader blocks when it runs out.
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        # Room for every slot plus the stop markers, so putting never blocks.
+        self._parsed = queue.Queue(maxsize=self.queue_size + self.concurrency)
+        self._records = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self.stats = {
+            "seen": 0, "skipped": 0, "duplicates": 0, "parsed": 0, "cache_hits": 0,
+            "errors": 0, "fallbacks": 0, "written": 0, "parse_seconds": 0.0, "generate_seconds": 0.0,
+        }
+        self.input_error = None
+        self._reader_done = threading.Event()
+        self._pending = 0  # files submitted to the pool and not yet back
+        self._finished = False
+
+    def _count(self, name: str, value=1):
+        with self._lock:
+            self.stats[name] += value
+
+    # ---- reader: hash, dedup, hand to the parse pool ----
+    def _read(self, inputs, checkpoint: tuple, pool):
+        done_sources, first_source = checkpoint
+        try:
+            for source, file_type, size, read in inputs:
+                self._count("seen")
+                if source in done_sources:
+                    self._count("skipped")
+                    continue
+                if size > MAX_FILE_BYTES:
+                    self._records.put({"source": source, "sha256": None, "status": "error",
+                                       "error": f"File is {size // 1024} KB; the limit is {MAX_FILE_BYTES // 1024} KB."})
+                    continue
+                data = read()
+                digest = file_digest(data, file_type)
+                if digest in first_source:
+                    self._count("duplicates")
+                    self._records.put({"source": source, "sha256": digest, "status": "duplicate",
+                                       "duplicate_of": first_source[digest]})
+                    continue
+                first_source[digest] = source
+                self._slots.acquire()
+                cached = get_parse_cache().get(digest)
+                if cached is not None:
+                    self._count("cache_hits")
+                    self._parsed.put((source, digest, cached, None, 0.0))
+                    continue
+                future = pool.submit(_parse, data, file_type)
+                with self._lock:
+                    self._pending += 1
+                future.add_done_callback(lambda f, s=source, d=digest: self._parse_done(s, d, f))
+        except Exception as e:
+            # Unreadable archive or directory: stop reading, finish what is in flight.
+            self.input_error = f"{type(e).__name__}: {e}"
+        finally:
+            # One stop marker per generator, queued behind every parse still running.
+            self._reader_done.set()
+            self._maybe_finish()
+
+    def _parse_done(self, source: str, digest: str, future):
+        try:
+            text, error, seconds = future.result()
+        except Exception as e:  # a worker process died
+            text, error, seconds = None, f"{type(e).__name__}: {e}", 0.0
+        if error is None:
+            get_parse_cache().put(digest, text)
+        self._parsed.put((source, digest, text, error, seconds))
+        with self._lock:
+            self._pending -= 1
+        self._maybe_finish()
+
+    def _maybe_finish(self):
+        with self._lock:
+            finish = self._reader_done.is_set() and self._pending == 0 and not self._finished
+            if finish:
+                self._finished = True
+        if finish:
+            for _ in range(self.concurrency):
+                self._parsed.put(_DONE)
+
+    # ---- generators: bounded number of concurrent question requests ----
+    def _generate(self):
+        from modules.question_generator import generate_questions_with_source
+
+        while True:
+            item = self._parsed.get()
+            if item is _DONE:
+                self._records.put(_DONE)
+                return
+            source, digest, text, error, parse_seconds = item
+            self._slots.release()
+            record = {"source": source, "sha256": digest}
+            if error is not None:
+                record.update(status="error", error=error)
+            else:
+                self._count("parsed")
+                self._count("parse_seconds", parse_seconds)
+                record.update(status="ok", text=text, parse_seconds=round(parse_seconds, 4))
+                if self.questions:
+                    start = time.perf_counter()
+                    record["questions"], source = generate_questions_with_source(text)
+                    seconds = time.perf_counter() - start
+                    record["questions_source"] = source
+                    if source == "fallback" and text.strip():
+                        record["status"] = "fallback"
+                    self._count("generate_seconds", seconds)
+                    record["generate_seconds"] = round(seconds, 4)
+            self._records.put(record)
+
+    # ---- writer (calling thread): append + periodic fsync ----
+    def run(self, input_path: str) -> dict:
+        checkpoint = load_checkpoint(self.output)
+        started = time.perf_counter()
+        # Spawned workers: the parent runs HTTP and writer threads while the
+        # pool grows, and forking a threaded process can deadlock the child.
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_parse_worker)
+        threads = [threading.Thread(target=self._read, args=(iter_inputs(input_path), checkpoint, pool),
+                                    name="batch-reader", daemon=True)]
+        threads += [threading.Thread(target=self._generate, name=f"batch-generate-{i}", daemon=True)
+                    for i in range(self.concurrency)]
+        for t in threads:
+            t.start()
+
+        stopped, unsynced, last_report = 0, 0, started
+        try:
+            with open(self.output, "a", encoding="utf-8") as out:
+                while stopped < self.concurrency:
+                    record = self._records.get()
+                    if record is _DONE:
+                        stopped += 1
+                        continue
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    self._count("written")
+                    if record["status"] == "error":
+                        self._count("errors")
+                    elif record["status"] == "fallback":
+                        self._count("fallbacks")
+                    unsynced += 1
+                    if unsynced >= FSYNC_EVERY:
+                        os.fsync(out.fileno())
+                        unsynced = 0
+                    if PROGRESS_SECONDS and time.perf_counter() - last_report >= PROGRESS_SECONDS:
+                        last_report = time.perf_counter()
+                        self._report(started, sys.stderr)
+                os.fsync(out.fileno())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return self.summary(started)
+
+    def summary(self, started: float) -> dict:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            summary = dict(self.stats)
+        processed = summary["written"] - summary["duplicates"]
+        summary.update(elapsed_seconds=elapsed, files_per_second=processed / elapsed if elapsed else 0.0,
+                       input_error=self.input_error)
+        return summary
+
+    def _report(self, started: float, stream):
+        s = self.summary(started)
+        print(f"[batch] {s['written']} written ({s['parsed']} parsed, {s['duplicates']} duplicates, "
+              f"{s['skipped']} already done, {s['errors']} errors, {s['fallbacks']} fallback questions) "
+              f"- {s['files_per_second']:.1f} files/s",
+              file=stream, flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m modules.batch_ingest")
+    parser.add_argument("input", help="directory, .zip, .tar/.tar.gz, or a single PDF/DOCX")
+    parser.add_argument("-o", "--output", required=True, help="JSONL output; also the resume checkpoint")
+    parser.add_argument("--parse-workers", type=int, default=PARSE_PROCESSES)
+    parser.add_argument("--concurrency", type=int, default=GENERATE_CONCURRENCY, help="concurrent question requests")
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    parser.add_argument("--no-questions", action="store_true", help="parse only")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    batch = BatchIngest(args.output, args.parse_workers, args.concurrency, args.queue_size, not args.no_questions)
+    s = batch.run(args.input)
+    print(f"Ingested {s['written']} files in {s['elapsed_seconds']:.1f}s "
+          f"({s['files_per_second']:.1f} files/s): {s['parsed']} parsed ({s['cache_hits']} from cache), "
+          f"{s['duplicates']} duplicates, {s['skipped']} already in {args.output}, {s['errors']} errors")
+    if s["fallbacks"]:
+        print(f"{s['fallbacks']} files got fallback questions (LLM unavailable); re-run to regenerate them",
+              file=sys.stderr)
+    if s["input_error"]:
+        print(f"Stopped reading {args.input}: {s['input_error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,55 +1,285 @@
-import streamlit as st
 import os
-from functools import lru_cache
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_groq import ChatGroq
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import re
+import threading
+import time
+from collections import deque
+import streamlit as st
 from dotenv import load_dotenv
+from scipy.sparse import vstack
+from modules import metrics
+from modules.faq_index import NEGATIONS, STOP_WORDS, get_faq_index, preprocess
+from modules.faq_retrieval import get_retriever
+from modules.llm_gateway import LLMUnavailableError, get_gateway, is_configured
+from modules.result_cache import LRU
+
+FAQ_MODEL = "openai/gpt-oss-20b"
+CONTEXT_TOKENS = int(os.getenv("FAQ_CONTEXT_TOKENS", "600"))
+CONTEXT_CANDIDATES = int(os.getenv("FAQ_CONTEXT_CANDIDATES", "8"))
+UNAVAILABLE_ANSWER = "The FAQ assistant is unavailable right now. Please try again later."
+
+
+# -------------------- Answer cache --------------------
+# Tier 1: exact match on the normalised query (case, punctuation, stopwords;
+# negations are kept). Tier 2: near-duplicate queries whose TF-IDF vectors
+# (already L2-normalised) have cosine similarity >= FAQ_CACHE_SIMILARITY with a
+# cached query using the same negations, so "not" never flips a cached answer.
+# Bounded by LRU size and TTL, and dropped whenever the FAQ index version changes.
+def normalize_query(query: str) -> str:
+    words = re.findall(r"[a-z0-9]+", preprocess(query))
+    return " ".join(w for w in words if w not in STOP_WORDS)
 
 
-@lru_cache(maxsize=1)
-def _load_tfidf_index():
-    # Always resolve absolute path
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    faq_path = os.path.join(base_dir, "..", "data", "hr_faq.txt")
+class AnswerCache:
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0, similarity: float = 0.9):
+        self.ttl = ttl
+        self.similarity = similarity
+        self.version = None
+        # normalised query -> (expires_at, vector, answer)
+        self._lru = LRU(max_entries, hit_stat="exact_hits", stats=("similar_hits", "misses", "invalidations", "expired"))
+        self._lock = threading.Lock()
+        self.stats = self._lru.stats
 
-    if not os.path.exists(faq_path):
+    @property
+    def max_entries(self) -> int:
+        return self._lru.max_weight
+
+    @max_entries.setter
+    def max_entries(self, value: int):
+        self._lru.max_weight = value
+
+    def _check_version(self, version: str):
+        if version != self.version:
+            if len(self._lru):
+                self._lru.count("invalidations")
+            self._lru.clear()
+            self.version = version
+
+    def get(self, query: str, vector, version: str):
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            self._check_version(version)
+            entry = self._lru.get(key, is_stale=lambda e: e[0] <= now)
+            if entry is not None:
+                return entry[2]
+            candidates = []
+            polarity = NEGATIONS.intersection(key.split())
+            for k, (expires_at, vec, _) in self._lru.items():
+                if expires_at <= now:
+                    self._lru.pop(k)
+                elif vec is not None and NEGATIONS.intersection(k.split()) == polarity:
+                    candidates.append((k, vec))
+            if vector is not None and vector.nnz and candidates:
+                sims = (vstack([vec for _, vec in candidates]) @ vector.T).toarray().ravel()
+                best = int(sims.argmax())
+                if sims[best] >= self.similarity:
+                    return self._lru.get(candidates[best][0], hit="similar_hits")[2]
+            self._lru.count("misses")
         return None
 
-    # Load HR FAQ text file
-    loader = TextLoader(faq_path, encoding="utf-8")
-    docs = loader.load()
+    def put(self, query: str, vector, version: str, answer: str):
+        key = normalize_query(query)
+        with self._lock:
+            self._check_version(version)
+            self._lru.put(key, (time.time() + self.ttl, vector, answer))
+
+    def info(self) -> dict:
+        info = self._lru.info()
+        hits = info["exact_hits"] + info["similar_hits"]
+        lookups = hits + info["misses"]
+        info["hit_rate"] = hits / lookups if lookups else 0.0
+        return info
+
 
-    # Split into chunks
-    splitter = CharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    chunks = splitter.split_documents(docs)
-    texts = [c.page_content for c in chunks]
-    vectorizer = TfidfVectorizer(stop_words="english")
-    matrix = vectorizer.fit_transform(texts)
-    return {"texts": texts, "vectorizer": vectorizer, "matrix": matrix}
+answer_cache = AnswerCache(
+    max_entries=int(os.getenv("FAQ_CACHE_MAX_ENTRIES", "512")),
+    ttl=float(os.getenv("FAQ_CACHE_TTL", "3600")),
+    similarity=float(os.getenv("FAQ_CACHE_SIMILARITY", "0.9")),
+)
+metrics.register_collector("faq_answer_cache", answer_cache.info)
 
 
 def load_faq_bot():
     # Ensure .env is loaded so GROQ_API_KEY is available
     load_dotenv()
-    tfidf = _load_tfidf_index()
+    tfidf = get_faq_index()
     if tfidf is None:
         st.error("⚠️ Missing FAQ data file at `data/hr_faq.txt`. Please add it and reload.")
         return None
 
     # Validate Groq API key from environment
-    if not os.getenv("GROQ_API_KEY"):
+    if not is_configured():
         st.error("GROQ_API_KEY is not set. Please add it to your .env file.")
         return None
 
-    llm = ChatGroq(model="openai/gpt-oss-20b")
-    return {"llm": llm, "tfidf": tfidf}
+    return {"llm": get_gateway()}
 
 
 qa_ctx = None
 
+# Per-path answer latency (cache / direct / llm), last PATH_SAMPLES per path.
+PATH_SAMPLES = 1000
+_path_latency = {}
+_path_lock = threading.Lock()
+
+
+def _record_path(path: str, seconds: float):
+    with _path_lock:
+        _path_latency.setdefault(path, deque(maxlen=PATH_SAMPLES)).append(seconds)
+    metrics.observe("faq_answer_seconds", seconds, path=path)
+
+
+def latency_breakdown() -> dict:
+    with _path_lock:
+        samples = {path: sorted(values) for path, values in _path_latency.items()}
+    breakdown = {}
+    for path, values in samples.items():
+        n = len(values)
+        breakdown[path] = {
+            "count": n,
+            "mean_ms": sum(values) / n * 1000,
+            "p50_ms": values[n // 2] * 1000,
+            "p95_ms": values[min(n - 1, int(n * 0.95))] * 1000,
+        }
+    return breakdown
+
+
+# -------------------- Prompt context --------------------
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    # Word/punctuation count; close enough to BPE counts for budgeting English FAQ text.
+    return len(_TOKEN_RE.findall(text))
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return {tuple(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+def build_context(texts: list, hits: list, budget: int = CONTEXT_TOKENS) -> str:
+    # hits: [(entry idx, score)] best first. Keeps the highest-scoring chunks that
+    # fit the token budget, skipping chunks that mostly repeat (>= 80% of their
+    # word 3-grams) a chunk already selected.
+    chosen, seen, used = [], [], 0
+    for idx, _ in hits:
+        text = texts[idx].strip()
+        words = _shingles(text)
+        if not text or any(len(words & s) >= 0.8 * min(len(words), len(s)) for s in seen):
+            continue
+        tokens = estimate_tokens(text)
+        if used + tokens > budget:
+            if chosen:
+                continue
+            # Even the best chunk is over budget: keep its leading part.
+            text = " ".join(text.split()[: max(1, budget * 3 // 4)])
+            tokens = estimate_tokens(text)
+        chosen.append(text)
+        seen.append(words)
+        used += tokens
+    return "\n\n".join(chosen)
+
+
+def _build_messages(user_q: str, tfidf: dict) -> list:
+    retriever = get_retriever(tfidf)
+    with metrics.span("faq_retrieval", retriever=retriever.name):
+        hits = retriever.search([user_q], k=CONTEXT_CANDIDATES)[0]
+    context = build_context(retriever.texts, hits)
+    prompt = (
+        "You are an HR FAQ assistant. Answer the user's question strictly using the provided FAQ context. "
+        "If the answer is not in the context, say you don't know. Be concise.\n\n"
+        f"Context:\n{context}\n\nQuestion: {user_q}\nAnswer:"
+    )
+    return [{"role": "user", "content": prompt}]
+
+
+# Per-query LLM metrics: time to first token and prompt size, last PATH_SAMPLES queries.
+_llm_samples = deque(maxlen=PATH_SAMPLES)
+
+
+def llm_metrics() -> dict:
+    with _path_lock:
+        samples = list(_llm_samples)
+    if not samples:
+        return {"queries": 0}
+    ttft = sorted(s["ttft"] for s in samples if s["ttft"] is not None) or [0.0]
+    tokens = [s["prompt_tokens"] for s in samples]
+    return {
+        "queries": len(samples),
+        "ttft_p50_s": ttft[len(ttft) // 2],
+        "ttft_p95_s": ttft[min(len(ttft) - 1, int(len(ttft) * 0.95))],
+        "prompt_tokens_mean": sum(tokens) / len(tokens),
+        "prompt_tokens_max": max(tokens),
+    }
+
+
+metrics.register_collector("faq_llm", llm_metrics)
+
+
+def _record_llm(ttft, prompt_tokens: int):
+    with _path_lock:
+        _llm_samples.append({"ttft": ttft, "prompt_tokens": prompt_tokens})
+
+
+def _answer_with_llm(user_q: str, tfidf: dict, start: float) -> str:
+    messages = _build_messages(user_q, tfidf)
+    try:
+        answer = qa_ctx["llm"].chat(messages, model=FAQ_MODEL)
+    except LLMUnavailableError:
+        return UNAVAILABLE_ANSWER
+    # Blocking call: the first token is visible only when the whole answer is.
+    _record_llm(time.perf_counter() - start, estimate_tokens(messages[0]["content"]))
+    return answer
+
+
+def _stream_with_llm(user_q: str, tfidf: dict, q_vec, start: float):
+    messages = _build_messages(user_q, tfidf)
+    parts, ttft = [], None
+    try:
+        for delta in qa_ctx["llm"].stream_chat(messages, model=FAQ_MODEL):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(delta)
+            yield delta
+    except LLMUnavailableError:
+        if not parts:
+            yield UNAVAILABLE_ANSWER
+            return
+        yield "\n\n_(The answer was cut short. Please try again.)_"
+        parts = []
+    finally:
+        _record_path("llm", time.perf_counter() - start)
+        _record_llm(ttft, estimate_tokens(messages[0]["content"]))
+    answer = "".join(parts)
+    if answer.strip():
+        answer_cache.put(user_q, q_vec, tfidf["version"], answer)
+
+
+def answer_query(user_q: str, tfidf: dict, stream: bool = False):
+    # Returns (answer, path): cached answer, the stored answer of a confidently
+    # matched FAQ question, or an LLM answer over the retrieved context. With
+    # stream=True the LLM answer is a generator of text deltas instead of a str.
+    start = time.perf_counter()
+    q_vec = tfidf["vectorizer"].transform([user_q])
+    answer = answer_cache.get(user_q, q_vec, tfidf["version"])
+    path = "cache"
+    if answer is None:
+        questions = get_retriever(tfidf, "question")
+        with metrics.span("faq_direct_match"):
+            match = questions.direct_answer(q_vec, user_q)
+        if match is not None:
+            answer, path = questions.answers[match[0]], "direct"
+        elif stream:
+            # Latency, metrics and caching are recorded once the stream is consumed.
+            return _stream_with_llm(user_q, tfidf, q_vec, start), "llm"
+        else:
+            answer, path = _answer_with_llm(user_q, tfidf, start), "llm"
+            if answer.strip() and answer != UNAVAILABLE_ANSWER:
+                answer_cache.put(user_q, q_vec, tfidf["version"], answer)
+    _record_path(path, time.perf_counter() - start)
+    return answer, path
+
 
 def faq_chatbot():
     global qa_ctx
@@ -63,21 +293,18 @@ def faq_chatbot():
     if st.button("Submit") and user_q:
         try:
             with st.spinner("Thinking..."):
-                texts = qa_ctx["tfidf"]["texts"]
-                vectorizer = qa_ctx["tfidf"]["vectorizer"]
-                matrix = qa_ctx["tfidf"]["matrix"]
-                q_vec = vectorizer.transform([user_q])
-                sims = cosine_similarity(q_vec, matrix).flatten()
-                top_idx = sims.argsort()[::-1][:5]
-                context = "\n\n".join(texts[i] for i in top_idx if sims[i] > 0)
-                prompt = (
-                    "You are an HR FAQ assistant. Answer the user's question strictly using the provided FAQ context. "
-                    "If the answer is not in the context, say you don't know. Be concise.\n\n"
-                    f"Context:\n{context}\n\nQuestion: {user_q}\nAnswer:"
-                )
-                ai = qa_ctx["llm"].invoke(prompt)
-                answer = getattr(ai, "content", None) or str(ai)
-            if not answer.strip():
+                # Re-fetched per query so edits to hr_faq.txt are picked up without a restart.
+                tfidf = get_faq_index()
+                if tfidf is None:
+                    st.error("⚠️ Missing FAQ data file at `data/hr_faq.txt`. Please add it and reload.")
+                    return
+                answer, _ = answer_query(user_q, tfidf, stream=True)
+            if not isinstance(answer, str):
+                st.write("**Answer:**")
+                answer = st.write_stream(answer)
+                if not answer.strip():
+                    st.info("I couldn't find an answer in the FAQ. Try rephrasing your question.")
+            elif not answer.strip():
                 st.info("I couldn't find an answer in the FAQ. Try rephrasing your question.")
             else:
                 st.write("**Answer:**", answer)
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+
+# Precompiled TF-IDF index for data/hr_faq.txt. The build step writes the
+# vocabulary, idf weights and the CSR arrays of the chunk matrix as .npy files;
+# workers memory-map them, so every process on a node shares the same pages.
+# The index is keyed by the FAQ file's SHA-256 and rebuilt/reloaded whenever
+# the file content changes. Each build goes into its own directory
+# (<index_dir>-v<format>-<sha>) and INDEX_DIR is a symlink swapped atomically to
+# the current one, so a reader never sees a missing or half-replaced index.
+
+logger = logging.getLogger(__name__)
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+FAQ_PATH = os.getenv("FAQ_PATH", os.path.join(_base_dir, "..", "data", "hr_faq.txt"))
+INDEX_DIR = os.getenv("FAQ_INDEX_DIR", os.path.join(_base_dir, "..", "data", "faq_index"))
+RELOAD_CHECK_SECONDS = float(os.getenv("FAQ_RELOAD_CHECK_SECONDS", "2"))
+INDEX_FORMAT = 3
+
+# sklearn's English stopwords include negations, which would make "what should
+# I not wear" the same query as "what should I wear". Keep them as terms, and
+# let callers compare them explicitly with negations().
+NEGATIONS = frozenset({"not", "no", "never", "nor", "cannot", "cant", "without", "none", "nothing", "nobody", "noone", "neither", "nowhere"})
+STOP_WORDS = frozenset(ENGLISH_STOP_WORDS - NEGATIONS)
+_CONTRACTIONS = [
+    (re.compile(r"\bcan(?:no|['’])t\b"), "can not"),
+    (re.compile(r"\bwon['’]t\b"), "will not"),
+    (re.compile(r"(?<=\w)n['’]t\b"), " not"),
+]
+# Cheap pre-check: most chunks have no contraction, and the \b patterns scan slowly.
+_CONTRACTION_HINT = re.compile(r"['’]t|cannot")
+
+
+def preprocess(text: str) -> str:
+    # Lowercase and spell out "n't"/"cannot" so every form carries the same "not".
+    text = text.lower()
+    if _CONTRACTION_HINT.search(text):
+        for pattern, replacement in _CONTRACTIONS:
+            text = pattern.sub(replacement, text)
+    return text
+
+
+def negations(text: str) -> frozenset:
+    return NEGATIONS.intersection(re.findall(r"[a-z0-9]+", preprocess(text)))
+
+
+def make_vectorizer(**kwargs) -> TfidfVectorizer:
+    return TfidfVectorizer(stop_words=sorted(STOP_WORDS), preprocessor=preprocess, **kwargs)
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+_QUESTION_RE = re.compile(r"^\s*Q\s*[:.)-]", re.IGNORECASE | re.MULTILINE)
+
+
+def split_qa_pairs(text: str) -> list:
+    # One entry per "Q: ... A: ..." block so a question is never split from its
+    # answer; text without Q: markers falls back to blank-line paragraphs.
+    starts = [m.start() for m in _QUESTION_RE.finditer(text)]
+    if not starts:
+        return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    preamble = text[: starts[0]].strip()
+    entries = [preamble] if preamble else []
+    for start, end in zip(starts, starts[1:] + [len(text)]):
+        entry = text[start:end].strip()
+        if entry:
+            entries.append(entry)
+    return entries
+
+
+def build_index(faq_path: str = FAQ_PATH, index_dir: str = INDEX_DIR) -> dict:
+    with open(faq_path, "rb") as f:
+        raw = f.read()
+    texts = split_qa_pairs(raw.decode("utf-8").replace("\r\n", "\n"))
+    vectorizer = make_vectorizer()
+    matrix = vectorizer.fit_transform(texts).tocsr()
+
+    source_sha256 = hashlib.sha256(raw).hexdigest()
+    version_dir = f"{index_dir}-v{INDEX_FORMAT}-{source_sha256[:16]}"
+    tmp_dir = f"{version_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "data.npy"), matrix.data.astype(np.float64))
+    np.save(os.path.join(tmp_dir, "indices.npy"), matrix.indices.astype(np.int32))
+    np.save(os.path.join(tmp_dir, "indptr.npy"), matrix.indptr.astype(np.int32))
+    np.save(os.path.join(tmp_dir, "idf.npy"), vectorizer.idf_)
+    vocabulary = {term: int(i) for term, i in vectorizer.vocabulary_.items()}
+    with open(os.path.join(tmp_dir, "vocabulary.json"), "w", encoding="utf-8") as f:
+        json.dump(vocabulary, f)
+    with open(os.path.join(tmp_dir, "texts.json"), "w", encoding="utf-8") as f:
+        json.dump(texts, f)
+    meta = {
+        "format": INDEX_FORMAT,
+        "source_sha256": source_sha256,
+        "shape": list(matrix.shape),
+        "built_at": time.time(),
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    try:
+        os.rename(tmp_dir, version_dir)
+    except OSError:
+        # Another worker built the same content first; theirs is just as good.
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    _swap_link(index_dir, version_dir)
+    return meta
+
+
+def _swap_link(index_dir: str, version_dir: str):
+    previous = os.path.realpath(index_dir) if os.path.islink(index_dir) else None
+    if os.path.isdir(index_dir) and not os.path.islink(index_dir):
+        # Index from before versioned directories: a one-off, non-atomic upgrade.
+        shutil.rmtree(index_dir, ignore_errors=True)
+    link = f"{index_dir}.link-{os.getpid()}-{threading.get_ident()}"
+    os.symlink(os.path.basename(version_dir), link)
+    os.replace(link, index_dir)
+    # Keep the version just replaced for readers still loading it; drop older ones.
+    keep = {os.path.realpath(version_dir), previous}
+    parent, prefix = os.path.split(index_dir)
+    for entry in os.scandir(parent or "."):
+        if not entry.name.startswith(f"{prefix}-v") or ".tmp-" in entry.name:
+            continue
+        # A minute's grace: another worker may have just built it and not linked it yet.
+        if os.path.realpath(entry.path) not in keep and time.time() - entry.stat().st_mtime > 60:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _read_meta(index_dir: str):
+    try:
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(index_dir: str = INDEX_DIR) -> dict:
+    # Resolve the link once, so every file comes from the same build.
+    index_dir = os.path.realpath(index_dir)
+    meta = _read_meta(index_dir)
+    if meta is None:
+        raise FileNotFoundError(f"no FAQ index in {index_dir}")
+    arrays = {
+        name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r")
+        for name in ("data", "indices", "indptr", "idf")
+    }
+    with open(os.path.join(index_dir, "vocabulary.json"), encoding="utf-8") as f:
+        vocabulary = json.load(f)
+    with open(os.path.join(index_dir, "texts.json"), encoding="utf-8") as f:
+        texts = json.load(f)
+    matrix = csr_matrix((arrays["data"], arrays["indices"], arrays["indptr"]), shape=tuple(meta["shape"]), copy=False)
+    vectorizer = make_vectorizer(vocabulary=vocabulary)
+    vectorizer.idf_ = np.asarray(arrays["idf"])
+    return {"texts": texts, "vectorizer": vectorizer, "matrix": matrix, "version": meta["source_sha256"]}
+
+
+class FAQIndex:
+    # Holds the loaded index and re-checks the FAQ file at most every
+    # RELOAD_CHECK_SECONDS, reloading when its content hash changes.
+    def __init__(self, faq_path: str = FAQ_PATH, index_dir: str = INDEX_DIR):
+        self.faq_path = faq_path
+        self.index_dir = index_dir
+        self._index = None
+        self._stat = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        stat = os.stat(self.faq_path)
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+        if self._index is not None and stat_key == self._stat:
+            return
+        digest = file_hash(self.faq_path)
+        if self._index is not None and self._index["version"] == digest:
+            self._stat = stat_key
+            return
+        meta = _read_meta(self.index_dir)
+        if not meta or meta.get("format") != INDEX_FORMAT or meta.get("source_sha256") != digest:
+            build_index(self.faq_path, self.index_dir)
+        self._index = load_index(self.index_dir)
+        self._stat = stat_key
+
+    def get(self):
+        now = time.monotonic()
+        if self._index is not None and now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return self._index
+        with self._lock:
+            if self._index is None or now - self._checked_at >= RELOAD_CHECK_SECONDS:
+                try:
+                    self._refresh()
+                except Exception:
+                    # Only a missing FAQ file drops the index. Anything else (a
+                    # file with no usable terms, bad UTF-8, a disk error) keeps
+                    # serving the loaded one until the next check.
+                    if not os.path.exists(self.faq_path):
+                        self._index = None
+                    else:
+                        logger.exception("Could not load the FAQ index from %s; serving the previous one, if any", self.faq_path)
+                self._checked_at = now
+        return self._index
+
+
+_faq_index = FAQIndex()
+
+
+def get_faq_index():
+    return _faq_index.get()
+
+
+if __name__ == "__main__":
+    # Offline build: python -m modules.faq_index [faq_path] [index_dir]
+    meta = build_index(*sys.argv[1:3])
+    print(f"Built FAQ index: {meta['shape'][0]} chunks x {meta['shape'][1]} terms (sha256 {meta['source_sha256'][:12]})")
@@ -0,0 +1,154 @@
+import os
+import re
+import threading
+import numpy as np
+from scipy.sparse import csc_matrix, csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+from modules.faq_index import STOP_WORDS, negations, preprocess
+
+# Retrieval over the precompiled FAQ index (modules/faq_index.py). Each FAQ
+# entry is one Q/A pair. TF-IDF rows are already L2-normalised, so cosine
+# similarity is a plain sparse dot product; BM25 uses a precomputed per-term
+# weight matrix in CSC form, i.e. an inverted index of postings per term.
+# Both scorers take a batch of queries and select top-k with argpartition.
+# QuestionRetriever scores only the question half of each pair and powers the
+# direct-answer fast path in faq_bot.
+
+RETRIEVER = os.getenv("FAQ_RETRIEVER", "tfidf")
+BM25_K1 = float(os.getenv("FAQ_BM25_K1", "1.5"))
+BM25_B = float(os.getenv("FAQ_BM25_B", "0.75"))
+DIRECT_THRESHOLD = float(os.getenv("FAQ_DIRECT_THRESHOLD", "0.7"))
+DIRECT_MARGIN = float(os.getenv("FAQ_DIRECT_MARGIN", "0.2"))
+
+_QA_RE = re.compile(r"^\s*Q\s*[:.)-]\s*(.*?)\s*^\s*A\s*[:.)-]\s*(.*)$", re.IGNORECASE | re.MULTILINE | re.DOTALL)
+
+
+def split_question_answer(entry: str):
+    m = _QA_RE.match(entry)
+    return (m.group(1).strip(), m.group(2).strip()) if m else (None, None)
+
+
+def top_k(scores: np.ndarray, k: int) -> list:
+    # scores: (n_queries, n_docs) dense. Returns [(doc_idx, score), ...] per query, best first.
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return [[] for _ in range(scores.shape[0])]
+    if k < scores.shape[1]:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    results = []
+    for row, cand in zip(scores, part):
+        order = cand[np.argsort(-row[cand], kind="stable")]
+        results.append([(int(i), float(row[i])) for i in order if row[i] > 0])
+    return results
+
+
+class TfidfRetriever:
+    name = "tfidf"
+
+    def __init__(self, index: dict):
+        self.texts = index["texts"]
+        self.vectorizer = index["vectorizer"]
+        # Used as-is so the memory-mapped CSR arrays stay shared between workers.
+        self.matrix = index["matrix"]
+
+    def scores(self, queries: list) -> np.ndarray:
+        q = self.vectorizer.transform(queries)
+        return (self.matrix @ q.T).T.toarray()
+
+    def search(self, queries: list, k: int = 5) -> list:
+        return top_k(self.scores(queries), k)
+
+
+class BM25Retriever:
+    name = "bm25"
+
+    def __init__(self, index: dict, k1: float = BM25_K1, b: float = BM25_B):
+        self.texts = index["texts"]
+        self.counter = CountVectorizer(stop_words=sorted(STOP_WORDS), preprocessor=preprocess)
+        counts = self.counter.fit_transform(self.texts).tocsr().astype(np.float64)
+        n_docs = counts.shape[0]
+        doc_len = np.asarray(counts.sum(axis=1)).ravel()
+        avg_len = doc_len.mean() if n_docs else 0.0
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+        tf = counts.data
+        row_len = np.repeat(doc_len, np.diff(counts.indptr))
+        norm = k1 * (1 - b + b * row_len / (avg_len or 1.0))
+        weights = csr_matrix(
+            (idf[counts.indices] * tf * (k1 + 1) / (tf + norm), counts.indices, counts.indptr),
+            shape=counts.shape,
+        )
+        # Term-major layout: column slices are the postings lists for each term.
+        self.postings = csc_matrix(weights)
+
+    def scores(self, queries: list) -> np.ndarray:
+        q = self.counter.transform(queries)
+        q.data[:] = 1.0
+        return (self.postings @ q.T).T.toarray()
+
+    def search(self, queries: list, k: int = 5) -> list:
+        return top_k(self.scores(queries), k)
+
+
+class QuestionRetriever:
+    name = "question"
+
+    def __init__(self, index: dict, threshold: float = DIRECT_THRESHOLD, margin: float = DIRECT_MARGIN):
+        self.texts = index["texts"]
+        self.vectorizer = index["vectorizer"]
+        self.threshold = threshold
+        self.margin = margin
+        pairs = [split_question_answer(t) for t in self.texts]
+        self.answers = [a for _, a in pairs]
+        self.negations = [negations(q or "") for q, _ in pairs]
+        # Same vocabulary/idf as the full index; entries without Q:/A: get an empty row and never match.
+        self.questions = self.vectorizer.transform([q or "" for q, _ in pairs]).tocsr()
+
+    def scores(self, queries: list) -> np.ndarray:
+        return self._scores(self.vectorizer.transform(queries))
+
+    def _scores(self, q) -> np.ndarray:
+        return (self.questions @ q.T).T.toarray()
+
+    def search(self, queries: list, k: int = 5) -> list:
+        return top_k(self.scores(queries), k)
+
+    def direct_answer(self, q_vec, query: str):
+        # Returns (entry index, score) when the best question is a confident,
+        # unambiguous match for the query vector, else None. A query whose
+        # negations differ from the question's ("what should I not wear") is
+        # never answered directly, however high it scores.
+        best = top_k(self._scores(q_vec), 2)[0]
+        if not best:
+            return None
+        idx, score = best[0]
+        runner_up = best[1][1] if len(best) > 1 else 0.0
+        if score < self.threshold or score - runner_up < self.margin or not self.answers[idx]:
+            return None
+        if negations(query) != self.negations[idx]:
+            return None
+        return idx, score
+
+
+_RETRIEVERS = {"tfidf": TfidfRetriever, "bm25": BM25Retriever, "question": QuestionRetriever}
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_retriever(index: dict, kind: str = None):
+    # One retriever per (index version, kind); rebuilt automatically after a hot reload.
+    kind = kind or RETRIEVER
+    key = (index["version"], kind)
+    retriever = _cache.get(key)
+    if retriever is None:
+        with _cache_lock:
+            retriever = _cache.get(key)
+            if retriever is None:
+                retriever = _RETRIEVERS[kind](index)
+                for stale in [k for k in _cache if k[1] == kind]:
+                    del _cache[stale]
+                _cache[key] = retriever
+    return retriever
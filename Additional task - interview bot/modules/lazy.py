@@ -0,0 +1,68 @@
+import importlib
+import os
+import sys
+import threading
+import time
+
+# Deferred imports for the heavy page modules (langchain/scikit-learn, pymongo,
+# gTTS, streamlit-webrtc...). A LazyModule imports its target on first
+# attribute access, so a visitor only pays for the pages they actually open.
+
+WARM_UP = os.getenv("LAZY_WARM_UP", "1") == "1"
+
+_lock = threading.RLock()
+_import_seconds = {}
+_warm_up_started = False
+
+
+class LazyModule:
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            with _lock:
+                if self._module is None:
+                    # app.py builds new LazyModules every rerun; only a real
+                    # first import is timed, not the sys.modules lookup after it.
+                    cold = self._name not in sys.modules
+                    start = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    if cold:
+                        _import_seconds[self._name] = time.perf_counter() - start
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def _warm(modules):
+    for module in modules:
+        try:
+            module._load()
+        except Exception:
+            # A broken optional page must not take the process down; the page
+            # will surface the ImportError when it is actually opened.
+            pass
+
+
+def warm_up(*modules):
+    # Import the given modules on a background thread, once per process.
+    global _warm_up_started
+    if not WARM_UP or _warm_up_started:
+        return
+    with _lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm, args=(modules,), name="lazy-warm-up", daemon=True).start()
+
+
+def import_timings() -> dict:
+    with _lock:
+        return dict(_import_seconds)
@@ -0,0 +1,226 @@
+import json
+import os
+import random
+import threading
+import time
+import httpx
+from dotenv import load_dotenv
+from modules import metrics
+
+# Single entry point for chat-completion calls. One keep-alive HTTP pool per
+# process, a global cap on in-flight requests, per-call deadlines, jittered
+# retries and a circuit breaker that lets callers fail fast to their fallbacks.
+
+load_dotenv()
+
+
+class LLMUnavailableError(RuntimeError):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_after: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_after:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_after or self._trial_in_flight:
+                return False
+            # Half-open: let exactly one trial request through.
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_in_flight: int = 8,
+        deadline: float = 30.0,
+        attempt_timeout: float = 20.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        breaker: CircuitBreaker = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._http = httpx.Client(
+            headers={"Authorization": f"Bearer {api_key}"},
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+        )
+        self._stats_lock = threading.Lock()
+        self.stats = {"calls": 0, "retries": 0, "failures": 0, "rejected": 0, "short_circuited": 0}
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _retry_delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    @staticmethod
+    def _retryable(status: int) -> bool:
+        return status == 429 or status >= 500
+
+    def _post(self, payload: dict, deadline_at: float, stream: bool = False) -> httpx.Response:
+        attempt = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                raise LLMUnavailableError("LLM deadline exceeded")
+            try:
+                request = self._http.build_request(
+                    "POST",
+                    f"{self.base_url}/chat/completions",
+                    json=payload,
+                    timeout=min(remaining, self.attempt_timeout),
+                )
+                resp = self._http.send(request, stream=stream)
+                if not self._retryable(resp.status_code):
+                    if resp.is_error:
+                        resp.close()
+                    resp.raise_for_status()
+                    return resp
+                resp.close()
+                error = LLMUnavailableError(f"LLM returned HTTP {resp.status_code}")
+            except httpx.TransportError as e:
+                error = LLMUnavailableError(f"LLM transport error: {e}")
+            delay = self._retry_delay(attempt)
+            if attempt >= self.retries or time.monotonic() + delay >= deadline_at:
+                raise error
+            attempt += 1
+            self._count("retries")
+            time.sleep(delay)
+
+    def chat(self, messages: list, model: str, deadline: float = None, **params) -> str:
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        if not self._slots.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+            self._count("rejected")
+            raise LLMUnavailableError("Too many LLM requests in flight")
+        try:
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+            self._count("calls")
+            try:
+                with metrics.span("llm_chat", model=model):
+                    resp = self._post({"model": model, "messages": messages, **params}, deadline_at)
+                    content = resp.json()["choices"][0]["message"]["content"] or ""
+            except Exception:
+                self._count("failures")
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            return content
+        finally:
+            self._slots.release()
+
+    def stream_chat(self, messages: list, model: str, deadline: float = None, **params):
+        # Yields content deltas as they arrive. Only opening the stream is retried;
+        # once tokens have been yielded a failure is surfaced to the caller.
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        if not self._slots.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+            self._count("rejected")
+            raise LLMUnavailableError("Too many LLM requests in flight")
+        try:
+            if not self.breaker.allow():
+                self._count("short_circuited")
+                raise LLMUnavailableError("LLM circuit breaker is open")
+            self._count("calls")
+            started, first = time.perf_counter(), True
+            try:
+                resp = self._post({"model": model, "messages": messages, "stream": True, **params}, deadline_at, stream=True)
+                try:
+                    for line in resp.iter_lines():
+                        if time.monotonic() > deadline_at:
+                            raise LLMUnavailableError("LLM deadline exceeded")
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        choices = json.loads(data).get("choices") or [{}]
+                        delta = (choices[0].get("delta") or {}).get("content")
+                        if delta:
+                            if first:
+                                metrics.observe("llm_first_token_seconds", time.perf_counter() - started, model=model)
+                                first = False
+                            yield delta
+                finally:
+                    resp.close()
+            except GeneratorExit:
+                # Caller stopped reading early; the upstream call itself succeeded.
+                self.breaker.record_success()
+                raise
+            except Exception:
+                self._count("failures")
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+        finally:
+            self._slots.release()
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def is_configured() -> bool:
+    return bool(os.getenv("GROQ_API_KEY"))
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    base_url=os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1"),
+                    api_key=os.getenv("GROQ_API_KEY", ""),
+                    max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+                    deadline=float(os.getenv("LLM_DEADLINE", "30")),
+                    attempt_timeout=float(os.getenv("LLM_ATTEMPT_TIMEOUT", "20")),
+                    retries=int(os.getenv("LLM_RETRIES", "2")),
+                    backoff=float(os.getenv("LLM_BACKOFF", "0.5")),
+                    breaker=CircuitBreaker(
+                        failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+                        reset_after=float(os.getenv("LLM_BREAKER_RESET", "30")),
+                    ),
+                )
+                metrics.register_collector("llm_gateway", lambda: dict(_gateway.stats))
+    return _gateway
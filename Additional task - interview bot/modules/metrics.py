@@ -0,0 +1,306 @@
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# In-process latency histograms and counters for the hot paths, exposed as
+# Prometheus text (METRICS_PORT) and/or a periodic JSON log line
+# (METRICS_LOG_SECONDS). With METRICS_ENABLED=0, span() returns a shared no-op
+# and @timed leaves the function untouched. PROFILE_SLOW_RERUN_SECONDS turns on
+# a sampling profiler that dumps folded stacks for reruns slower than that.
+
+ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+PREFIX = "interview_bot_"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+LOG_SECONDS = float(os.getenv("METRICS_LOG_SECONDS", "0"))
+PROFILE_SLOW_RERUN_SECONDS = float(os.getenv("PROFILE_SLOW_RERUN_SECONDS", "0"))
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "profiles"))
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger(__name__)
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [bucket counts..., +Inf count], sum
+_counters = {}  # (name, labels) -> value
+_collectors = {}  # name -> fn returning {gauge: number}
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def observe(name: str, seconds: float, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0]
+        hist[0][bisect.bisect_left(BUCKETS, seconds)] += 1
+        hist[1] += seconds
+
+
+def incr(name: str, value: float = 1, **labels):
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+class _Span:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe("span_seconds", time.perf_counter() - self.start, span=self.name, **self.labels)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            incr("span_errors_total", span=self.name, **self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str, **labels):
+    return _Span(name, labels) if ENABLED else _NOOP
+
+
+def timed(name: str = None):
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        span_name = name or fn.__name__
+
+        def wrapper(*args, **kwargs):
+            with _Span(span_name, {}):
+                return fn(*args, **kwargs)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    return decorate
+
+
+def register_collector(name: str, fn):
+    # fn() -> {gauge name: number}; read on every export, so keep it cheap.
+    _collectors[name] = fn
+
+
+def _collect_gauges() -> dict:
+    gauges = {}
+    for name, fn in list(_collectors.items()):
+        try:
+            values = fn()
+        except Exception:
+            continue
+        for key, value in values.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                gauges[f"{name}_{key}"] = value
+    return gauges
+
+
+def snapshot() -> dict:
+    with _lock:
+        histograms = {key: (list(counts), total) for key, (counts, total) in _histograms.items()}
+        counters = dict(_counters)
+    spans = {}
+    for (name, labels), (counts, total) in histograms.items():
+        n = sum(counts)
+        label = ",".join(f"{k}={v}" for k, v in labels)
+        spans[f"{name}{{{label}}}"] = {"count": n, "sum": total, "p50": _quantile(counts, 0.5), "p95": _quantile(counts, 0.95)}
+    return {
+        "histograms": spans,
+        "counters": {f"{n}{{{','.join(f'{k}={v}' for k, v in labels)}}}": value for (n, labels), value in counters.items()},
+        "gauges": _collect_gauges(),
+    }
+
+
+def _quantile(counts: list, q: float) -> float:
+    # Upper bound of the bucket holding the q-quantile (inf for the overflow bucket).
+    n = sum(counts)
+    if not n:
+        return 0.0
+    running = 0
+    for i, count in enumerate(counts):
+        running += count
+        if running >= q * n:
+            return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+    return float("inf")
+
+
+def _labels(labels: tuple, extra: str = "") -> str:
+    parts = ['{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def render_prometheus() -> str:
+    with _lock:
+        histograms = {key: (list(counts), total) for key, (counts, total) in _histograms.items()}
+        counters = dict(_counters)
+    lines = []
+    for name in sorted({n for n, _ in histograms}):
+        lines.append(f"# TYPE {PREFIX}{name} histogram")
+        for (n, labels), (counts, total) in sorted(histograms.items()):
+            if n != name:
+                continue
+            running = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), counts):
+                running += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le)} {running}")
+            lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{PREFIX}{name}_count{_labels(labels)} {running}")
+    for name in sorted({n for n, _ in counters}):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for (n, labels), value in sorted(counters.items()):
+            if n == name:
+                lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+    for gauge, value in sorted(_collect_gauges().items()):
+        lines.append(f"# TYPE {PREFIX}{gauge} gauge")
+        lines.append(f"{PREFIX}{gauge} {value}")
+    return "\n".join(lines) + "\n"
+
+
+# -------------------- Exporters --------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _log_loop():
+    while True:
+        time.sleep(LOG_SECONDS)
+        logger.info(json.dumps(snapshot(), default=str))
+
+
+_exporters_started = False
+
+
+def start_exporters():
+    # Once per process; both exporters are off unless configured.
+    global _exporters_started
+    if _exporters_started or not ENABLED:
+        return
+    with _lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        except OSError:
+            # Another worker on this node already serves the port.
+            logger.warning("metrics port %s is in use; not exporting from pid %s", METRICS_PORT, os.getpid())
+    if LOG_SECONDS > 0:
+        if not logger.handlers and not logging.getLogger().handlers:
+            logger.addHandler(logging.StreamHandler())
+        logger.setLevel(logging.INFO)
+        threading.Thread(target=_log_loop, name="metrics-log", daemon=True).start()
+
+
+# -------------------- Rerun timing & slow-rerun profiler --------------------
+class _Sampler(threading.Thread):
+    # Samples the script thread's stack every PROFILE_INTERVAL into folded-stack counts.
+    def __init__(self, target_ident: int):
+        super().__init__(name="rerun-profiler", daemon=True)
+        self.target_ident = target_ident
+        self.stacks = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(PROFILE_INTERVAL):
+            frame = sys._current_frames().get(self.target_ident)
+            if frame is None:
+                return  # the script thread is gone; nobody will stop us
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                folded = ";".join(reversed(stack))
+                self.stacks[folded] = self.stacks.get(folded, 0) + 1
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+_rerun = threading.local()
+
+
+def start_rerun(page: str = ""):
+    # Called at the top of app.py; reruns run on the session's script thread.
+    if not ENABLED:
+        return
+    previous = getattr(_rerun, "current", None)
+    if previous is not None and previous[2] is not None:
+        # The last run on this thread was never ended; don't leave its sampler polling.
+        previous[2].stop()
+    sampler = None
+    if PROFILE_SLOW_RERUN_SECONDS > 0:
+        sampler = _Sampler(threading.get_ident())
+        sampler.start()
+    _rerun.current = (time.perf_counter(), page, sampler)
+
+
+def end_rerun():
+    # Called from the finally around app.py's page body, however the run ends.
+    current = getattr(_rerun, "current", None)
+    if current is None:
+        return
+    _rerun.current = None
+    start, page, sampler = current
+    seconds = time.perf_counter() - start
+    observe("rerun_seconds", seconds, page=page)
+    if sampler is None:
+        return
+    stacks = sampler.stop()
+    if seconds >= PROFILE_SLOW_RERUN_SECONDS and stacks:
+        incr("slow_reruns_total", page=page)
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        path = os.path.join(PROFILE_DIR, f"rerun-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{threading.get_ident()}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(stacks.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+        logger.warning("slow rerun (%.2fs, page=%s); profile written to %s", seconds, page, path)
@@ -1,11 +1,57 @@
+import hashlib
+import logging
 import os
-from groq import Groq
-from dotenv import load_dotenv
+import re
+import threading
+import time
+from collections import deque
+from modules import metrics
+from modules.llm_gateway import get_gateway, is_configured
+from modules.result_cache import SingleFlight, TTLCache
+from modules.skill_extractor import analyze_resume, skill_categories, summarize_resume
+
+MODEL_NAME = "llama-3.3-70b-versatile"
+# Bump whenever the prompt template changes so cached questions are not reused.
+PROMPT_VERSION = "v2"
+
+logger = logging.getLogger(__name__)
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def _make_question_cache() -> TTLCache:
+    limits = {
+        "max_entries": int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "2048")),
+        "ttl": float(os.getenv("QUESTION_CACHE_TTL", str(7 * 24 * 3600))),
+    }
+    db_path = os.getenv("QUESTION_CACHE_DB", os.path.join(_base_dir, "..", "data", "question_cache.sqlite3")) or None
+    try:
+        return TTLCache(db_path=db_path, table="questions", **limits)
+    except Exception:
+        # Read-only deploy directory: cache in memory rather than fail the page imports.
+        logger.warning("question cache database %s unavailable; caching in memory only", db_path, exc_info=True)
+        return TTLCache(**limits)
+
+
+_question_cache = _make_question_cache()
+_in_flight = SingleFlight()
+
+
+# Templated fallback questions, picked by the categories of skills found in the resume.
+_CATEGORY_QUESTIONS = {
+    "data": "Describe a project where you used {skill} and how you measured its impact.",
+    "languages": "What is the most complex thing you have built in {skill}, and what would you do differently now?",
+    "web": "Walk me through how you designed and shipped a feature using {skill}.",
+    "cloud": "How have you used {skill} to deploy, operate or scale a system?",
+    "databases": "Tell me about a time you had to model or optimise data in {skill}.",
+    "soft": "Give an example of how you have demonstrated {skill} in a team setting.",
+}
+_SECTION_QUESTIONS = {
+    "projects": "Pick one project from your resume and walk me through your role, the challenges and the outcome.",
+    "experience": "What was your most significant contribution in your most recent role?",
+    "certifications": "Which of your certifications or achievements has been most useful in practice, and why?",
+}
 
-# Load environment variables from .env file
-load_dotenv()
-groq_api_key = os.getenv("GROQ_API_KEY")
-client = Groq(api_key=groq_api_key) if groq_api_key else None
 
 def _fallback_questions(resume_text: str):
     base = [
@@ -15,41 +61,238 @@ def _fallback_questions(resume_text: str):
         "Why do you want to work with us?",
         "Where do you see yourself in the next few years?",
     ]
-    # If resume hints at skills, bias a bit
-    lower = (resume_text or "").lower()
-    if any(k in lower for k in ["python", "ml", "machine learning", "data"]):
-        base[1] = "What technical strengths would you bring to a data/ML team?"
-        base[2] = "Describe a data/ML project you delivered and its impact."
-    return base
-
-def generate_questions(resume_text: str):
     if not resume_text:
-        return _fallback_questions(resume_text)
+        return base
+    analysis = analyze_resume(resume_text)
+    tailored = []
+    for category, skills in skill_categories(analysis["skills"]).items():
+        if category in _CATEGORY_QUESTIONS:
+            tailored.append(_CATEGORY_QUESTIONS[category].format(skill=skills[0]))
+    for section, question in _SECTION_QUESTIONS.items():
+        if section in analysis["sections"]:
+            tailored.append(question)
+    # Keep the opener and closer, tailor the middle.
+    questions = [base[0]] + tailored[:3]
+    questions += [q for q in base[1:] if q not in questions][: 5 - len(questions)]
+    return questions[:5]
+
 
-    if client is None:
-        return _fallback_questions(resume_text)
+def _cache_key(resume_text: str) -> str:
+    normalised = re.sub(r"\s+", " ", resume_text).strip().lower()
+    digest = hashlib.sha256(normalised.encode("utf-8")).hexdigest()
+    return f"{digest}:{PROMPT_VERSION}:{MODEL_NAME}"
 
+
+def _build_messages(resume_text: str) -> list:
+    # A compact structured summary keeps the prompt small regardless of resume length.
     prompt = f"""
-    Based on the following resume, generate 5 concise HR-style interview questions.
+    Based on the following resume summary, generate 5 concise HR-style interview questions.
     Return them as a simple numbered list (1., 2., 3., ...), no extra text.
 
-    Resume:
-    {resume_text}
+    Resume summary:
+    {summarize_resume(resume_text)}
     """
+    return [{"role": "user", "content": prompt}]
+
+
+def _parse_question_line(line: str) -> str:
+    return line.strip().lstrip("-•").lstrip("0123456789. ")
+
+
+def _ask_llm(resume_text: str):
+    content = get_gateway().chat(_build_messages(resume_text), model=MODEL_NAME).strip()
+    questions = []
+    for line in content.split("\n"):
+        q = _parse_question_line(line)
+        if q:
+            questions.append(q)
+    return questions[:5]
+
+
+def generate_questions(resume_text: str):
+    return generate_questions_with_source(resume_text)[0]
+
+
+@metrics.timed("generate_questions")
+def generate_questions_with_source(resume_text: str) -> tuple:
+    # (questions, source): source is "llm", "cache" or "fallback", so batch
+    # jobs can tell generic questions from generated ones.
+    if not resume_text or not is_configured():
+        return _fallback_questions(resume_text), "fallback"
+
+    key = _cache_key(resume_text)
+    cached = _question_cache.get(key)
+    if cached:
+        return cached, "cache"
 
     try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        content = response.choices[0].message.content.strip()
-        questions = []
-        for line in content.split("\n"):
-            q = line.strip().lstrip("-•").lstrip("0123456789. ")
+        questions = _in_flight.do(key, lambda: _ask_llm(resume_text))
+    except Exception:
+        return _fallback_questions(resume_text), "fallback"
+    if not questions:
+        return _fallback_questions(resume_text), "fallback"
+    _question_cache.put(key, questions)
+    return questions, "llm"
+
+
+def question_cache_info() -> dict:
+    info = _question_cache.info()
+    with _streams_lock:
+        info["coalesced"] = _in_flight.coalesced + _streams_coalesced
+    return info
+
+
+# -------------------- Streaming --------------------
+_ttfq_samples = deque(maxlen=256)
+# Single-flight for streams: concurrent requests for the same resume share one
+# LLM stream, and each of them still sees the questions as they arrive.
+_streams = {}  # cache key -> _Broadcast
+_streams_lock = threading.Lock()
+_streams_coalesced = 0
+
+
+class _Broadcast:
+    def __init__(self):
+        self.questions = []
+        self.done = False
+        self._cond = threading.Condition()
+
+    def publish(self, q: str):
+        with self._cond:
+            self.questions.append(q)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self.done = True
+            self._cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self._cond:
+                while i >= len(self.questions) and not self.done:
+                    self._cond.wait()
+                if i >= len(self.questions):
+                    return
+                q = self.questions[i]
+            i += 1
+            yield q
+
+
+def _stream_llm_questions(resume_text: str):
+    buffer = ""
+    count = 0
+    for delta in get_gateway().stream_chat(_build_messages(resume_text), model=MODEL_NAME):
+        buffer += delta
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            q = _parse_question_line(line)
             if q:
-                questions.append(q)
-        if not questions:
-            return _fallback_questions(resume_text)
-        return questions[:5]
+                yield q
+                count += 1
+                if count >= 5:
+                    return
+    q = _parse_question_line(buffer)
+    if q:
+        yield q
+
+
+def iter_questions(resume_text: str):
+    # Yields each question as soon as its line is complete in the token stream.
+    if not resume_text or not is_configured():
+        yield from _fallback_questions(resume_text)
+        return
+
+    global _streams_coalesced
+    key = _cache_key(resume_text)
+    cached = _question_cache.get(key)
+    if cached:
+        yield from cached
+        return
+
+    with _streams_lock:
+        shared = _streams.get(key)
+        if shared is None:
+            # The LLM stream runs on its own thread, so it completes (and is
+            # cached) even if the caller that started it stops listening.
+            shared = _streams[key] = _Broadcast()
+            threading.Thread(target=_produce, args=(key, resume_text, shared), name="question-llm", daemon=True).start()
+        else:
+            _streams_coalesced += 1
+    yield from shared
+
+
+def _produce(key: str, resume_text: str, shared: _Broadcast):
+    questions = []
+    try:
+        for q in _stream_llm_questions(resume_text):
+            questions.append(q)
+            shared.publish(q)
     except Exception:
-        return _fallback_questions(resume_text)
+        # Top up a partial stream with generic questions rather than dropping it.
+        for q in _fallback_questions(resume_text)[len(questions):]:
+            shared.publish(q)
+    else:
+        if questions:
+            _question_cache.put(key, questions)
+        else:
+            for q in _fallback_questions(resume_text):
+                shared.publish(q)
+    finally:
+        with _streams_lock:
+            _streams.pop(key, None)
+        shared.close()
+
+
+class QuestionStream:
+    # Runs iter_questions on a background thread; `questions` grows as they arrive,
+    # so the Interview page can start on question 1 before the rest are ready.
+    def __init__(self, resume_text: str, on_question=None):
+        self.resume_text = resume_text
+        self.on_question = on_question
+        self.questions = []
+        self.done = False
+        self.time_to_first = None
+        self.total_time = None
+        self._started = time.perf_counter()
+        self._first = threading.Event()
+        threading.Thread(target=self._run, name="question-stream", daemon=True).start()
+
+    def _run(self):
+        try:
+            for q in iter_questions(self.resume_text):
+                if self.time_to_first is None:
+                    self.time_to_first = time.perf_counter() - self._started
+                    _ttfq_samples.append(self.time_to_first)
+                self.questions.append(q)
+                self._first.set()
+                if self.on_question is not None:
+                    self.on_question(q)
+        finally:
+            self.total_time = time.perf_counter() - self._started
+            self.done = True
+            self._first.set()
+
+    def wait_first(self, timeout: float = None) -> list:
+        self._first.wait(timeout)
+        return self.questions
+
+
+def start_question_stream(resume_text: str, on_question=None) -> QuestionStream:
+    return QuestionStream(resume_text, on_question)
+
+
+def streaming_info() -> dict:
+    samples = sorted(_ttfq_samples)
+    if not samples:
+        return {"streams": 0}
+    return {
+        "streams": len(samples),
+        "ttfq_p50_s": samples[len(samples) // 2],
+        "ttfq_p95_s": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+    }
+
+
+metrics.register_collector("question_cache", question_cache_info)
+metrics.register_collector("question_stream", streaming_info)
@@ -0,0 +1,284 @@
+import os
+import queue
+import threading
+import time
+from fractions import Fraction
+import av
+
+# Interview recording pipeline. WebRTC frame callbacks only enqueue frames
+# (never encode) into a bounded per-session queue; one background thread per
+# session encodes them with PyAV into one .mkv segment per question. When the
+# encoder falls behind, new video frames are dropped instead of buffering
+# without limit; audio keeps a little reserved headroom so speech survives a
+# burst of video. Frames can be synthetic av.VideoFrame/av.AudioFrame objects,
+# so the whole pipeline runs offline.
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+RECORDING_DIR = os.getenv("RECORDING_DIR", os.path.join(_base_dir, "..", "data", "recordings"))
+QUEUE_FRAMES = int(os.getenv("RECORDING_QUEUE_FRAMES", "120"))
+AUDIO_HEADROOM = int(os.getenv("RECORDING_AUDIO_HEADROOM", "20"))
+VIDEO_CODEC = os.getenv("RECORDING_VIDEO_CODEC", "libx264")
+AUDIO_CODEC = os.getenv("RECORDING_AUDIO_CODEC", "aac")
+VIDEO_FPS = int(os.getenv("RECORDING_FPS", "15"))
+IDLE_SECONDS = float(os.getenv("RECORDING_IDLE_SECONDS", "60"))
+PENDING_AUDIO_FRAMES = 100
+
+_STOP = object()
+_MS = Fraction(1, 1000)
+
+
+class _Segment:
+    # One open output file; streams are added lazily because the video size is
+    # only known once the first video frame arrives.
+    def __init__(self, path: str, video: bool, audio: bool):
+        self.path = path
+        self.container = av.open(path, "w")
+        self.want_video = video
+        self.want_audio = audio
+        self.vstream = None
+        self.astream = None
+        self.ready = False
+        self.pending_audio = []
+        self.resampler = None
+        self.fifo = None
+        self.audio_samples = 0
+        self.first_ms = None
+        self.last_pts = -1
+        if not video:
+            self._add_streams(None)
+
+    def _add_streams(self, first_video):
+        if first_video is not None:
+            codec = VIDEO_CODEC if VIDEO_CODEC in av.codecs_available else "mpeg4"
+            self.vstream = self.container.add_stream(codec, rate=VIDEO_FPS)
+            self.vstream.width = first_video.width - first_video.width % 2
+            self.vstream.height = first_video.height - first_video.height % 2
+            self.vstream.pix_fmt = "yuv420p"
+            self.vstream.time_base = _MS
+            if codec == "libx264":
+                self.vstream.options = {"preset": "ultrafast", "tune": "zerolatency"}
+        if self.want_audio:
+            self.astream = self.container.add_stream(AUDIO_CODEC, rate=48000)
+            self.resampler = av.AudioResampler(format=self.astream.format.name, layout="mono", rate=48000)
+            self.fifo = av.AudioFifo()
+        self.ready = True
+
+    def write_video(self, frame, t_ms: int):
+        if not self.want_video:
+            return False
+        if not self.ready:
+            self._add_streams(frame)
+            for pending in self.pending_audio:
+                self.write_audio(pending)
+            self.pending_audio = []
+        # Caps and browser adaptation can change the incoming size mid-segment.
+        # The callback frame is still being sent back to the browser, so the
+        # timestamps below go on our own copy; reformat returns the same
+        # object when there is nothing to convert.
+        out = frame.reformat(width=self.vstream.width, height=self.vstream.height, format="yuv420p")
+        frame = out if out is not frame else av.VideoFrame.from_ndarray(frame.to_ndarray(), format="yuv420p")
+        if self.first_ms is None:
+            self.first_ms = t_ms
+        frame.pts = max(t_ms - self.first_ms, self.last_pts + 1)
+        frame.time_base = _MS
+        self.last_pts = frame.pts
+        self.container.mux(self.vstream.encode(frame))
+        return True
+
+    def write_audio(self, frame):
+        if not self.want_audio:
+            return False
+        if not self.ready:
+            if len(self.pending_audio) >= PENDING_AUDIO_FRAMES:
+                return False
+            self.pending_audio.append(frame)
+            return True
+        # A copy without pts (the resampler restamps), leaving the callback frame untouched.
+        copy = av.AudioFrame.from_ndarray(frame.to_ndarray(), format=frame.format.name, layout=frame.layout.name)
+        copy.sample_rate = frame.sample_rate
+        for resampled in self.resampler.resample(copy):
+            self.fifo.write(resampled)
+        size = self.astream.codec_context.frame_size or 1024
+        while self.fifo.samples >= size:
+            chunk = self.fifo.read(size)
+            chunk.pts = self.audio_samples
+            chunk.time_base = Fraction(1, 48000)
+            self.audio_samples += size
+            self.container.mux(self.astream.encode(chunk))
+        return True
+
+    def close(self):
+        try:
+            if self.vstream is not None:
+                self.container.mux(self.vstream.encode(None))
+            if self.astream is not None:
+                self.container.mux(self.astream.encode(None))
+        finally:
+            self.container.close()
+
+
+class SessionRecorder:
+    def __init__(self, session_id: str, out_dir: str = RECORDING_DIR, queue_frames: int = QUEUE_FRAMES,
+                 video: bool = True, audio: bool = True):
+        self.session_id = session_id
+        self.out_dir = os.path.join(out_dir, session_id)
+        self.video = video
+        self.audio = audio
+        self._queue = queue.Queue(maxsize=queue_frames)
+        self._video_limit = max(1, queue_frames - AUDIO_HEADROOM)
+        self._segment = None
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.segments = []
+        self.closed = False
+        self.error = None
+        self.stats = {
+            "video_frames": 0, "audio_frames": 0,
+            "dropped_video": 0, "dropped_audio": 0,
+            "encoded_video": 0, "encoded_audio": 0,
+            "max_queue_depth": 0, "encode_seconds": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{session_id[:8]}", daemon=True)
+        self._thread.start()
+
+    # ---- called from the WebRTC worker threads: enqueue only ----
+    def _offer(self, kind: str, frame, limit: int):
+        segment = self._segment
+        if segment is None or self.closed:
+            return
+        t_ms = int((time.monotonic() - self._started_at) * 1000)
+        with self._lock:
+            self.stats[f"{kind}_frames"] += 1
+            depth = self._queue.qsize()
+            if depth >= limit:
+                self.stats[f"dropped_{kind}"] += 1
+                return
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth + 1)
+        try:
+            self._queue.put_nowait((segment, kind, frame, t_ms))
+        except queue.Full:
+            with self._lock:
+                self.stats[f"dropped_{kind}"] += 1
+
+    def on_video_frame(self, frame):
+        self._offer("video", frame, self._video_limit)
+        return frame
+
+    def on_audio_frame(self, frame):
+        self._offer("audio", frame, self._queue.maxsize)
+        return frame
+
+    # ---- called from the script thread ----
+    def start_segment(self, question_index: int):
+        # Frames offered from now on go to the segment for this question.
+        self._segment = question_index
+
+    def pause(self):
+        self._segment = None
+
+    def stop(self):
+        # Never blocks: the encoder drains what is queued and finalises the file
+        # on its own thread. The marker only wakes an idle encoder; if the queue
+        # is full the encoder is busy and sees the flag once it has drained it.
+        self._segment = None
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+
+    def join(self, timeout: float = None):
+        # For tools that need the files finished; not for the script thread.
+        self._thread.join(timeout)
+
+    # ---- encoder thread ----
+    def _open(self, question_index: int) -> _Segment:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"q{question_index + 1:02d}-{len(self.segments) + 1:03d}.mkv")
+        self.segments.append(path)
+        return _Segment(path, self.video, self.audio)
+
+    def _run(self):
+        current, current_index = None, None
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=0.1 if self._stopping.is_set() else IDLE_SECONDS)
+                except queue.Empty:
+                    break  # drained after stop(), or an abandoned session: finalise what we have
+                if item is _STOP:
+                    break
+                index, kind, frame, t_ms = item
+                start = time.perf_counter()
+                if index != current_index:
+                    if current is not None:
+                        current.close()
+                    current, current_index = self._open(index), index
+                if kind == "video":
+                    written = current.write_video(frame, t_ms)
+                else:
+                    written = current.write_audio(frame)
+                with self._lock:
+                    self.stats["encode_seconds"] += time.perf_counter() - start
+                    if written:
+                        self.stats[f"encoded_{kind}"] += 1
+        except Exception as e:
+            # A broken encoder must not take the interview down; keep the error for the stats.
+            self.error = repr(e)
+        finally:
+            self.closed = True
+            if current is not None:
+                try:
+                    current.close()
+                except Exception as e:
+                    self.error = self.error or repr(e)
+            _forget(self.session_id, self)
+
+    def info(self) -> dict:
+        with self._lock:
+            info = dict(self.stats)
+        info.update(
+            session_id=self.session_id,
+            queue_depth=self._queue.qsize(),
+            segments=len(self.segments),
+            closed=self.closed,
+            error=self.error,
+        )
+        info["encode_fps"] = info["encoded_video"] / info["encode_seconds"] if info["encode_seconds"] else 0.0
+        return info
+
+
+_recorders = {}
+_recorders_lock = threading.Lock()
+
+
+def _forget(session_id: str, recorder: SessionRecorder):
+    with _recorders_lock:
+        if _recorders.get(session_id) is recorder:
+            del _recorders[session_id]
+
+
+def get_recorder(session_id: str, video: bool = True, audio: bool = True) -> SessionRecorder:
+    # One live recorder per session; a finished one is replaced on the next call.
+    with _recorders_lock:
+        recorder = _recorders.get(session_id)
+        if recorder is None or recorder.closed or (recorder.video, recorder.audio) != (video, audio):
+            if recorder is not None and not recorder.closed:
+                recorder.stop()
+            recorder = SessionRecorder(session_id, video=video, audio=audio)
+            _recorders[session_id] = recorder
+        return recorder
+
+
+def stop_recorder(session_id: str):
+    with _recorders_lock:
+        recorder = _recorders.pop(session_id, None)
+    if recorder is not None:
+        recorder.stop()
+
+
+def recording_stats() -> dict:
+    with _recorders_lock:
+        recorders = list(_recorders.values())
+    return {r.session_id: r.info() for r in recorders}
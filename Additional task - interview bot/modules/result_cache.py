@@ -0,0 +1,227 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+# Small LRU + TTL cache for JSON-serialisable results, optionally persisted to
+# SQLite so entries survive restarts and are shared between worker processes,
+# and the pieces other caches and stores build on: LRU, SQLiteConnections and
+# SingleFlight.
+
+_MISSING = object()
+
+
+class SQLiteConnections:
+    # Call for this thread's connection: sqlite3 connections must not cross
+    # threads. WAL lets other worker processes read while one writes.
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def __call__(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+
+class LRU:
+    # Thread-safe OrderedDict LRU bounded by total weight (one per entry unless
+    # `weigh` is given), with a stats dict shared with its owner via count().
+    # get() counts its hits under `hit_stat`.
+    def __init__(self, max_weight: float, weigh=None, stats=(), hit_stat: str = "hits"):
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda value: 1)
+        self.weight = 0
+        self.hit_stat = hit_stat
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = dict.fromkeys((hit_stat, "evictions", *stats), 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def count(self, name: str, n=1):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + n
+
+    def gauge(self, name: str, value):
+        with self._lock:
+            self.stats[name] = value
+
+    def get(self, key, is_stale=None, hit: str = None):
+        # Counts a hit (as `hit`, default hit_stat); a stale entry
+        # (is_stale(value)) is dropped as "expired".
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return None
+            if is_stale is not None and is_stale(value):
+                self._remove(key)
+                self.stats["expired"] = self.stats.get("expired", 0) + 1
+                return None
+            self._entries.move_to_end(key)
+            hit = hit or self.hit_stat
+            self.stats[hit] = self.stats.get(hit, 0) + 1
+            return value
+
+    def put(self, key, value, keep_existing: bool = False):
+        # Returns (the value now stored, [(key, value) evicted]). Values heavier
+        # than the whole budget are not kept.
+        with self._lock:
+            if keep_existing and key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key], []
+            self._remove(key)
+            if self.weigh(value) > self.max_weight:
+                return value, []
+            self._entries[key] = value
+            self.weight += self.weigh(value)
+            evicted = []
+            while self.weight > self.max_weight:
+                evicted.append(self._evict_oldest())
+            return value, evicted
+
+    def evict_while(self, predicate) -> list:
+        # Evict from the least recently used end while predicate(value) holds.
+        with self._lock:
+            evicted = []
+            while self._entries and predicate(next(iter(self._entries.values()))):
+                evicted.append(self._evict_oldest())
+            return evicted
+
+    def pop(self, key):
+        with self._lock:
+            return self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.weight = 0
+
+    def values(self) -> list:
+        with self._lock:
+            return list(self._entries.values())
+
+    def items(self) -> list:
+        with self._lock:
+            return list(self._entries.items())
+
+    def info(self) -> dict:
+        with self._lock:
+            info = dict(self.stats)
+            info["entries"] = len(self._entries)
+        return info
+
+    def _remove(self, key):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self.weight -= self.weigh(value)
+        return value
+
+    def _evict_oldest(self):
+        key, value = self._entries.popitem(last=False)
+        self.weight -= self.weigh(value)
+        self.stats["evictions"] += 1
+        return key, value
+
+
+class TTLCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 24 * 3600, db_path: str = None, table: str = "results"):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.table = table
+        self._lru = LRU(max_entries, stats=("disk_hits", "misses", "expired", "disk_errors"))  # key -> (expires_at, value)
+        self.stats = self._lru.stats
+        if db_path:
+            self._db = SQLiteConnections(db_path)
+            self._db().execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def _remember(self, key: str, value, expires_at: float):
+        self._lru.put(key, (expires_at, value))
+
+    def get(self, key: str):
+        now = time.time()
+        entry = self._lru.get(key, is_stale=lambda e: e[0] <= now)
+        if entry is not None:
+            return entry[1]
+        if self.db_path:
+            try:
+                row = self._db().execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                # A locked or vanished file is a miss, not a failed request.
+                self._lru.count("disk_errors")
+                row = None
+            if row is not None and row[1] > now:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self._lru.count("disk_hits")
+                return value
+        self._lru.count("misses")
+        return None
+
+    def put(self, key: str, value):
+        expires_at = time.time() + self.ttl
+        self._remember(key, value, expires_at)
+        if self.db_path:
+            db = self._db()
+            try:
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+            except sqlite3.Error:
+                # Read-only or full disk: the entry still lives in memory.
+                self._lru.count("disk_errors")
+
+    def clear(self):
+        self._lru.clear()
+        if self.db_path:
+            self._db().execute(f"DELETE FROM {self.table}")
+
+    def info(self) -> dict:
+        info = self._lru.info()
+        lookups = info["hits"] + info["disk_hits"] + info["misses"]
+        info["hit_rate"] = (info["hits"] + info["disk_hits"]) / lookups if lookups else 0.0
+        return info
+
+
+class SingleFlight:
+    # Concurrent callers with the same key share one in-flight computation.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import threading
+import time
+from modules import metrics
+from modules.result_cache import LRU, SQLiteConnections
+
+# Parsed resume text keyed by SHA-256 of the uploaded bytes. The in-memory LRU
+# is bounded by total text size; RESUME_CACHE_DB optionally adds a SQLite file
+# shared by every worker process on the node, bounded by size and age (oldest
+# entries go first). Each row stores its UTF-8 size and the worker keeps a
+# running total, so a put only reads the few oldest rows it has to drop; the
+# total is re-read from the table (other workers write too) and aged-out rows
+# are deleted every DISK_RECOUNT_SECONDS.
+MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+DB_MAX_BYTES = int(os.getenv("RESUME_CACHE_DB_MAX_BYTES", str(256 * 1024 * 1024)))
+DB_MAX_AGE = float(os.getenv("RESUME_CACHE_DB_MAX_AGE", str(30 * 24 * 3600)))
+DISK_RECOUNT_SECONDS = 60
+
+
+class ParseCache:
+    def __init__(self, max_bytes: int = MAX_BYTES, db_path: str = None,
+                 db_max_bytes: int = DB_MAX_BYTES, db_max_age: float = DB_MAX_AGE):
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.db_max_bytes = db_max_bytes
+        self.db_max_age = db_max_age
+        self._lru = LRU(max_bytes, weigh=self._entry_size,
+                        stats=("disk_hits", "misses", "evicted_bytes", "disk_evictions", "disk_bytes"))
+        self.stats = self._lru.stats
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._recounted_at = None
+        if db_path:
+            self._db = SQLiteConnections(db_path)
+            db = self._db()
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_resumes ("
+                "digest TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, size INTEGER NOT NULL DEFAULT 0)"
+            )
+            if "size" not in {row[1] for row in db.execute("PRAGMA table_info(parsed_resumes)")}:
+                # Table from before the size column.
+                db.execute("ALTER TABLE parsed_resumes ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                db.execute("UPDATE parsed_resumes SET size = length(CAST(text AS BLOB))")
+            db.execute("CREATE INDEX IF NOT EXISTS parsed_resumes_created ON parsed_resumes (created)")
+            self._trim_disk()
+
+    @staticmethod
+    def _entry_size(text: str) -> int:
+        return len(text.encode("utf-8"))
+
+    def _remember(self, digest: str, text: str):
+        _, evicted = self._lru.put(digest, text)
+        if evicted:
+            self._lru.count("evicted_bytes", sum(self._entry_size(t) for _, t in evicted))
+
+    def get(self, digest: str):
+        text = self._lru.get(digest)
+        if text is not None:
+            return text
+        if self.db_path:
+            row = self._db().execute(
+                "SELECT text FROM parsed_resumes WHERE digest = ?", (digest,)
+            ).fetchone()
+            if row is not None:
+                self._remember(digest, row[0])
+                self._lru.count("disk_hits")
+                return row[0]
+        self._lru.count("misses")
+        return None
+
+    def put(self, digest: str, text: str):
+        self._remember(digest, text)
+        if self.db_path:
+            size = self._entry_size(text)
+            db = self._db()
+            old = db.execute("SELECT size FROM parsed_resumes WHERE digest = ?", (digest,)).fetchone()
+            db.execute(
+                "INSERT OR REPLACE INTO parsed_resumes (digest, text, created, size) VALUES (?, ?, ?, ?)",
+                (digest, text, time.time(), size),
+            )
+            with self._disk_lock:
+                self._disk_bytes += size - (old[0] if old else 0)
+            self._trim_disk()
+
+    def _trim_disk(self):
+        db = self._db()
+        removed = 0
+        with self._disk_lock:
+            now = time.monotonic()
+            if self._recounted_at is None or now - self._recounted_at > DISK_RECOUNT_SECONDS:
+                self._recounted_at = now
+                removed += db.execute(
+                    "DELETE FROM parsed_resumes WHERE created < ?", (time.time() - self.db_max_age,)
+                ).rowcount
+                self._disk_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM parsed_resumes").fetchone()[0]
+            # Oldest first, through the created index, until back under budget.
+            while self._disk_bytes > self.db_max_bytes:
+                rows = db.execute("SELECT digest, size FROM parsed_resumes ORDER BY created LIMIT 64").fetchall()
+                if not rows:
+                    self._disk_bytes = 0
+                    break
+                doomed = []
+                for digest, size in rows:
+                    if self._disk_bytes <= self.db_max_bytes:
+                        break
+                    doomed.append(digest)
+                    self._disk_bytes -= size
+                marks = ",".join("?" * len(doomed))
+                removed += db.execute(f"DELETE FROM parsed_resumes WHERE digest IN ({marks})", doomed).rowcount
+            disk_bytes = self._disk_bytes
+        self._lru.count("disk_evictions", max(0, removed))
+        self._lru.gauge("disk_bytes", disk_bytes)
+
+    def info(self) -> dict:
+        info = self._lru.info()
+        info.update(bytes=self._lru.weight, max_bytes=self.max_bytes)
+        return info
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache(db_path=os.getenv("RESUME_CACHE_DB") or None)
+    return _cache
+
+
+metrics.register_collector("resume_parse_cache", lambda: get_parse_cache().info())
+
+
+def file_digest(data: bytes, file_type: str = "") -> str:
+    h = hashlib.sha256(data)
+    h.update(file_type.encode("utf-8"))
+    return h.hexdigest()
@@ -1,18 +1,141 @@
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
 import docx2txt
 import PyPDF2
-import tempfile
+from modules import metrics
+from modules.resume_cache import file_digest, get_parse_cache
 
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+MAX_FILE_BYTES = int(os.getenv("RESUME_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+MAX_PAGES = int(os.getenv("RESUME_MAX_PAGES", "50"))
+PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "20"))
+_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", str(min(4, _CPUS))))
+# Below this many pages the process-pool hand-off costs more than it saves.
+PARALLEL_MIN_PAGES = int(os.getenv("RESUME_PARALLEL_MIN_PAGES", "16"))
+
+
+class ResumeTooLargeError(ValueError):
+    pass
+
+
+class ResumeParseTimeoutError(ValueError):
+    # Raised instead of returning part of the text, which would then be cached.
+    def __init__(self, timeout: float):
+        super().__init__(f"Resume took longer than {timeout:g}s to read. Try a smaller or text-based PDF.")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                # spawn, not fork: the Streamlit server is multi-threaded.
+                _pool = ProcessPoolExecutor(
+                    max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")
+                )
+    return _pool
+
+
+def _read_bytes(file) -> bytes:
+    data = file.getvalue() if hasattr(file, "getvalue") else file.read()
+    if len(data) > MAX_FILE_BYTES:
+        raise ResumeTooLargeError(
+            f"Resume is {len(data) // 1024} KB; the limit is {MAX_FILE_BYTES // 1024} KB."
+        )
+    return data
+
+
+def _extract_page_range(data: bytes, start: int, stop: int, deadline: float = None) -> list:
+    # deadline is wall-clock (time.time()) so it means the same in every worker;
+    # a range that runs past it stops early and comes back short.
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    pages = []
+    for i in range(start, stop):
+        if deadline is not None and time.time() > deadline:
+            break
+        pages.append(reader.pages[i].extract_text() or "")
+    return pages
+
+
+def _iter_pdf_pages(reader, max_pages: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    for i, page in enumerate(reader.pages):
+        if i >= max_pages:
+            break
+        if time.monotonic() > deadline:
+            raise ResumeParseTimeoutError(timeout)
+        yield page.extract_text() or ""
+
+
+def _parse_pdf_parallel(data: bytes, page_count: int, timeout: float) -> list:
+    workers = PARSE_WORKERS
+    step = max(1, -(-page_count // (workers * 2)))
+    deadline = time.time() + timeout
+    pool = _get_pool()
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    futures = [pool.submit(_extract_page_range, data, start, stop, deadline) for start, stop in ranges]
+    # Ranges check the deadline themselves, so running ones stop shortly after
+    # it; the grace period only covers that last page.
+    wait(futures, timeout=timeout + 1)
+    for fut in futures:
+        fut.cancel()
+    pages = []
+    for fut, (start, stop) in zip(futures, ranges):
+        if not fut.done() or fut.cancelled():
+            raise ResumeParseTimeoutError(timeout)
+        result = fut.result()  # re-raises a parse error from the worker
+        if len(result) < stop - start:
+            raise ResumeParseTimeoutError(timeout)
+        pages.extend(result)
+    return pages
+
+
+def iter_resume_pages(file, max_pages: int = MAX_PAGES, timeout: float = PARSE_TIMEOUT):
+    # Streaming API: yields page text as each page is extracted.
+    data = _read_bytes(file)
+    if file.type == PDF_TYPE:
+        reader = PyPDF2.PdfReader(io.BytesIO(data))
+        yield from _iter_pdf_pages(reader, max_pages, timeout)
+    elif file.type == DOCX_TYPE:
+        yield docx2txt.process(io.BytesIO(data))
+    else:
+        yield "Unsupported file format"
+
+
+@metrics.timed("parse_resume")
 def parse_resume(file):
-    text = ""
-    if file.type == "application/pdf":
-        pdf_reader = PyPDF2.PdfReader(file)
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-    elif file.type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            tmp.write(file.read())
-            tmp_path = tmp.name
-        text = docx2txt.process(tmp_path)
+    if file.type != PDF_TYPE:
+        return "".join(iter_resume_pages(file))
+
+    data = _read_bytes(file)
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = min(len(reader.pages), MAX_PAGES)
+    if PARSE_WORKERS > 1 and page_count >= PARALLEL_MIN_PAGES:
+        pages = _parse_pdf_parallel(data, page_count, PARSE_TIMEOUT)
     else:
-        text = "Unsupported file format"
+        pages = _iter_pdf_pages(reader, page_count, PARSE_TIMEOUT)
+    return "".join(pages)
+
+
+def parse_resume_cached(file):
+    # Streamlit reruns the page on every interaction; parse each unique upload once.
+    # A parse that times out raises, so only complete text is ever cached.
+    cache = get_parse_cache()
+    digest = file_digest(file.getvalue(), file.type)
+    text = cache.get(digest)
+    if text is None:
+        text = parse_resume(file)
+        if text != "Unsupported file format":
+            cache.put(digest, text)
     return text
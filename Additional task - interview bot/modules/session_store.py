@@ -0,0 +1,365 @@
+import copy
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from modules import metrics
+from modules.result_cache import LRU, SQLiteConnections
+
+# Server-side interview state. st.session_state keeps only the session id; the
+# progress fields live here, in an in-process LRU with idle eviction (on access
+# and from a background sweeper, so a quiet worker shrinks too) backed by
+# SQLite (default, shared by the workers on a node) or MongoDB, so a worker
+# restart does not lose an interview in progress. Every field change is
+# written through as a single-field update. Heavy fields (the resume text) are
+# never kept in the LRU: they are read from the backend on access.
+#
+# SESSION_STORE: "sqlite" (SESSION_STORE_DB), "mongo" (MONGODB_*) or "memory".
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+BACKEND = os.getenv("SESSION_STORE", "sqlite")
+DB_PATH = os.getenv("SESSION_STORE_DB", os.path.join(_base_dir, "..", "data", "sessions.sqlite3"))
+MAX_ACTIVE = int(os.getenv("SESSION_MAX_ACTIVE", "1000"))
+IDLE_SECONDS = float(os.getenv("SESSION_IDLE_SECONDS", "1800"))
+RETAIN_SECONDS = float(os.getenv("SESSION_RETAIN_SECONDS", str(7 * 24 * 3600)))
+PURGE_EVERY_SECONDS = 3600
+SWEEP_EVERY_SECONDS = min(IDLE_SECONDS / 4, 60.0)
+
+DEFAULTS = {
+    "questions": [],
+    "current_index": 0,
+    "timer": 60,
+    "timer_deadline": None,
+    "last_spoken_index": -1,
+    "waiting_for_audio": False,
+    "owner": None,
+}
+HEAVY_FIELDS = ("resume_text",)
+
+
+def _fingerprint(value) -> int:
+    return hash(json.dumps(value))
+
+
+_DEFAULT_FINGERPRINTS = {k: _fingerprint(v) for k, v in DEFAULTS.items()}
+
+
+# -------------------- Backends --------------------
+class MemoryBackend:
+    # No persistence: an evicted session is gone, like the old st.session_state.
+    persistent = False
+
+    def __init__(self):
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str, fields=None):
+        with self._lock:
+            row = self._rows.get(session_id)
+            if row is None:
+                return None
+            return {k: v for k, v in row.items() if (k in fields if fields else k not in HEAVY_FIELDS)}
+
+    def write(self, session_id: str, values: dict):
+        with self._lock:
+            self._rows.setdefault(session_id, {}).update(values)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._rows.pop(session_id, None)
+
+    def purge(self, older_than: float):
+        pass
+
+
+class SQLiteBackend:
+    # One row per (session, field), so a progress update rewrites a few bytes
+    # instead of the whole session.
+    persistent = True
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._db = SQLiteConnections(db_path)
+        self._db().execute(
+            "CREATE TABLE IF NOT EXISTS interview_sessions ("
+            "id TEXT NOT NULL, field TEXT NOT NULL, value TEXT NOT NULL, updated REAL NOT NULL, "
+            "PRIMARY KEY (id, field))"
+        )
+
+    def load(self, session_id: str, fields=None):
+        if fields:
+            marks = ",".join("?" * len(fields))
+            rows = self._db().execute(
+                f"SELECT field, value FROM interview_sessions WHERE id = ? AND field IN ({marks})",
+                (session_id, *fields),
+            ).fetchall()
+        else:
+            marks = ",".join("?" * len(HEAVY_FIELDS))
+            rows = self._db().execute(
+                f"SELECT field, value FROM interview_sessions WHERE id = ? AND field NOT IN ({marks})",
+                (session_id, *HEAVY_FIELDS),
+            ).fetchall()
+        if not rows:
+            return None
+        return {field: json.loads(value) for field, value in rows}
+
+    def write(self, session_id: str, values: dict):
+        now = time.time()
+        conn = self._db()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO interview_sessions (id, field, value, updated) VALUES (?, ?, ?, ?)",
+                [(session_id, field, json.dumps(value), now) for field, value in values.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, session_id: str):
+        self._db().execute("DELETE FROM interview_sessions WHERE id = ?", (session_id,))
+
+    def purge(self, older_than: float):
+        self._db().execute(
+            "DELETE FROM interview_sessions WHERE id IN ("
+            "SELECT id FROM interview_sessions GROUP BY id HAVING MAX(updated) < ?)",
+            (older_than,),
+        )
+
+
+class MongoBackend:
+    # One document per session; updates $set only the changed fields and a TTL
+    # index on updated_at expires abandoned sessions.
+    persistent = True
+
+    def __init__(self, collection=None):
+        if collection is None:
+            from modules.auth import get_mongo_client
+
+            collection = get_mongo_client()[os.getenv("MONGODB_DB", "interview_bot")]["interview_sessions"]
+        self.collection = collection
+        self.collection.create_index("updated_at", expireAfterSeconds=int(RETAIN_SECONDS), name="updated_at_ttl")
+
+    def load(self, session_id: str, fields=None):
+        projection = {f: 1 for f in fields} if fields else {f: 0 for f in HEAVY_FIELDS}
+        doc = self.collection.find_one({"_id": session_id}, projection=projection)
+        if doc is None:
+            return None
+        doc.pop("_id", None)
+        doc.pop("updated_at", None)
+        return doc
+
+    def write(self, session_id: str, values: dict):
+        self.collection.update_one(
+            {"_id": session_id},
+            {"$set": dict(values, updated_at=datetime.now(timezone.utc))},
+            upsert=True,
+        )
+
+    def delete(self, session_id: str):
+        self.collection.delete_one({"_id": session_id})
+
+    def purge(self, older_than: float):
+        pass  # the TTL index does it
+
+
+# -------------------- Sessions --------------------
+class InterviewSession:
+    # Attribute access to the progress fields. Assigning a field writes it
+    # through when its value changed; mutating a list in place (the question
+    # stream appends) is picked up by sync().
+    def __init__(self, store, session_id: str, values: dict = None, stored: bool = False):
+        object.__setattr__(self, "_store", store)
+        object.__setattr__(self, "id", session_id)
+        object.__setattr__(self, "_values", dict(copy.deepcopy(DEFAULTS), **(values or {})))
+        # Fingerprints of what the backend holds, to write only changed fields.
+        object.__setattr__(self, "_written", {k: _fingerprint(v) for k, v in (values or {}).items()})
+        object.__setattr__(self, "_stored", stored)
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "last_used", time.monotonic())
+
+    def __getattr__(self, name):
+        values = object.__getattribute__(self, "_values")
+        if name in values:
+            return values[name]
+        if name in HEAVY_FIELDS:
+            row = self._store.backend.load(self.id, fields=(name,)) if self._stored else None
+            return (row or {}).get(name, "")
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in DEFAULTS or name in HEAVY_FIELDS:
+            self.update(**{name: value})
+        else:
+            object.__setattr__(self, name, value)
+
+    def update(self, **fields):
+        changed = {}
+        with self._lock:
+            for name, value in fields.items():
+                if name not in DEFAULTS and name not in HEAVY_FIELDS:
+                    raise AttributeError(name)
+                if name in DEFAULTS:
+                    self._values[name] = value
+                fingerprint = _fingerprint(value)
+                if self._written.get(name, _DEFAULT_FINGERPRINTS.get(name)) != fingerprint:
+                    self._written[name] = fingerprint
+                    changed[name] = value
+            if changed:
+                self._store._write(self, changed)
+
+    def sync(self):
+        # Persist fields mutated in place since they were last written.
+        with self._lock:
+            changed = {}
+            for name, value in self._values.items():
+                fingerprint = _fingerprint(value)
+                if self._written.get(name, _DEFAULT_FINGERPRINTS[name]) != fingerprint:
+                    self._written[name] = fingerprint
+                    changed[name] = value
+            if changed:
+                self._store._write(self, changed)
+
+    def reset(self, clear_resume: bool = False):
+        # Back to a fresh interview in one write ("Skip Interview", "Finish Test").
+        fields = {k: v for k, v in copy.deepcopy(DEFAULTS).items() if k != "owner"}
+        if clear_resume:
+            fields["resume_text"] = ""
+        self.update(**fields)
+
+    def approx_bytes(self) -> int:
+        # What this session holds in the worker: its light fields, JSON-sized.
+        return len(self.id) + len(json.dumps(self._values))
+
+
+class SessionStore:
+    def __init__(self, backend=None, max_active: int = MAX_ACTIVE, idle_seconds: float = IDLE_SECONDS):
+        self.backend = backend or MemoryBackend()
+        self.max_active = max_active
+        self.idle_seconds = idle_seconds
+        # id -> InterviewSession, least recently used first
+        self._lru = LRU(max_active, stats=("loads", "created", "writes", "fields_written", "write_errors"))
+        self._purge_lock = threading.Lock()
+        self._purged_at = 0.0
+        self.stats = self._lru.stats
+
+    def create(self, owner: str = None) -> InterviewSession:
+        # Nothing is written until the first field changes, so visitors who
+        # never reach the interview cost no storage.
+        session = InterviewSession(self, uuid.uuid4().hex, {"owner": owner} if owner else None)
+        self._lru.count("created")
+        self._remember(session)
+        return session
+
+    def get(self, session_id: str):
+        # None if unknown or expired.
+        session = self._lru.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+        else:
+            try:
+                values = self.backend.load(session_id)
+            except Exception:
+                values = None
+            if values is None:
+                self.sweep()
+                return None
+            self._lru.count("loads")
+            session = self._remember(InterviewSession(self, session_id, values, stored=True))
+        self.sweep()
+        return session
+
+    def _remember(self, session: InterviewSession) -> InterviewSession:
+        # A concurrent load of the same id keeps the session already cached.
+        session, evicted = self._lru.put(session.id, session, keep_existing=True)
+        self._dropped(evicted)
+        return session
+
+    def _dropped(self, evicted):
+        if not self.backend.persistent:
+            for session_id, _ in evicted:
+                self.backend.delete(session_id)
+
+    def sweep(self):
+        # Idle sessions out of the LRU; on a persistent backend, abandoned ones
+        # out of storage now and then.
+        now = time.monotonic()
+        self._dropped(self._lru.evict_while(lambda s: now - s.last_used > self.idle_seconds))
+        if not self.backend.persistent or now - self._purged_at <= PURGE_EVERY_SECONDS:
+            return
+        with self._purge_lock:
+            if now - self._purged_at <= PURGE_EVERY_SECONDS:
+                return
+            self._purged_at = now
+        try:
+            self.backend.purge(time.time() - RETAIN_SECONDS)
+        except Exception:
+            pass
+
+    def _write(self, session: InterviewSession, values: dict):
+        if not session._stored and session._values.get("owner"):
+            values = dict(values, owner=session._values["owner"])
+        try:
+            self.backend.write(session.id, values)
+            object.__setattr__(session, "_stored", True)
+        except Exception:
+            # Keep the interview going from memory; it just won't survive a restart.
+            self._lru.count("write_errors")
+            return
+        self._lru.count("writes")
+        self._lru.count("fields_written", len(values))
+
+    def delete(self, session_id: str):
+        self._lru.pop(session_id)
+        self.backend.delete(session_id)
+
+    def info(self) -> dict:
+        info = self._lru.info()
+        sessions = self._lru.values()
+        total = sum(s.approx_bytes() for s in sessions)
+        info.pop("entries")
+        info.update(
+            active=len(sessions),
+            bytes=total,
+            bytes_per_session=total / len(sessions) if sessions else 0.0,
+            max_active=self.max_active,
+        )
+        return info
+
+
+def _sweep_forever(store: SessionStore):
+    while True:
+        time.sleep(SWEEP_EVERY_SECONDS)
+        store.sweep()
+
+
+def _make_backend():
+    if BACKEND == "mongo":
+        return MongoBackend()
+    if BACKEND == "sqlite" and DB_PATH:
+        return SQLiteBackend(DB_PATH)
+    return MemoryBackend()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                try:
+                    backend = _make_backend()
+                except Exception:
+                    # Unreachable database: serve interviews from memory rather than not at all.
+                    backend = MemoryBackend()
+                _store = SessionStore(backend)
+                threading.Thread(target=_sweep_forever, args=(_store,), name="session-sweeper", daemon=True).start()
+                metrics.register_collector("interview_sessions", _store.info)
+    return _store
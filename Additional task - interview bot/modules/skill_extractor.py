@@ -0,0 +1,126 @@
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+# Offline resume analysis: one compiled multi-pattern regex over the skills
+# lexicon plus heading-based section detection. Used to send a compact resume
+# summary to the LLM and to tailor the fallback question bank.
+
+_base_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LEXICON = os.path.join(_base_dir, "..", "data", "skills_lexicon.txt")
+SUMMARY_MAX_CHARS = int(os.getenv("RESUME_SUMMARY_MAX_CHARS", "1500"))
+
+_SECTION_ALIASES = {
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history", "internships", "internship"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "skills": ("skills", "technical skills", "core skills", "key skills", "technologies", "tech stack"),
+    "education": ("education", "academics", "qualifications"),
+    "summary": ("summary", "profile", "objective", "about me", "professional summary"),
+    "certifications": ("certifications", "certificates", "achievements", "awards"),
+}
+_HEADING_TO_SECTION = {alias: name for name, aliases in _SECTION_ALIASES.items() for alias in aliases}
+_HEADING_RE = re.compile(
+    r"^\s*(" + "|".join(sorted(map(re.escape, _HEADING_TO_SECTION), key=len, reverse=True)) + r")\s*:?\s*$",
+    re.IGNORECASE,
+)
+_SECTION_BUDGET = {"summary": 250, "experience": 500, "projects": 400, "education": 150, "certifications": 150}
+
+
+def load_lexicon(path: str = None) -> dict:
+    # Returns {canonical skill: (category, [aliases], {case-sensitive aliases})}.
+    # An alias written "=Excel" only matches with that exact case, for names
+    # that are also everyday words ("I excel at", "the rest of the team").
+    path = path or os.getenv("SKILLS_LEXICON", DEFAULT_LEXICON)
+    lexicon = {}
+    category = "general"
+    with open(path, encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("[") and line.endswith("]"):
+                category = line[1:-1].strip().lower()
+                continue
+            names = [n.strip() for n in line.split("|") if n.strip()]
+            cased = {n[1:].strip() for n in names if n.startswith("=")}
+            names = [n.lstrip("=").strip() for n in names]
+            lexicon[names[0]] = (category, names, cased)
+    return lexicon
+
+
+@lru_cache(maxsize=4)
+def _matcher(path: str = None):
+    lexicon = load_lexicon(path)
+    # Case-insensitive aliases are keyed lowercased, case-sensitive ones as written.
+    alias_to_skill = {}
+    for skill, (_, names, cased) in lexicon.items():
+        for name in names:
+            alias_to_skill[name if name in cased else name.lower()] = skill
+    cased = {name for _, _, c in lexicon.values() for name in c}
+    # Longest alternatives first so "machine learning" wins over "ml"-style prefixes.
+    alternation = "|".join(
+        re.escape(a) if a in cased else f"(?i:{re.escape(a)})"
+        for a in sorted(alias_to_skill, key=len, reverse=True)
+    )
+    pattern = re.compile(r"(?<![\w+#.])(?:" + alternation + r")(?![\w+#])")
+    return pattern, alias_to_skill, lexicon
+
+
+def extract_skills(text: str, lexicon_path: str = None) -> Counter:
+    pattern, alias_to_skill, _ = _matcher(lexicon_path)
+    return Counter(
+        alias_to_skill.get(m.group(0)) or alias_to_skill[m.group(0).lower()] for m in pattern.finditer(text or "")
+    )
+
+
+def skill_categories(skills, lexicon_path: str = None) -> dict:
+    _, _, lexicon = _matcher(lexicon_path)
+    by_category = {}
+    for skill in skills:
+        by_category.setdefault(lexicon[skill][0], []).append(skill)
+    return by_category
+
+
+def split_sections(text: str) -> dict:
+    sections = {}
+    current = None
+    for line in (text or "").splitlines():
+        m = _HEADING_RE.match(line)
+        if m and len(line.strip()) <= 40:
+            current = _HEADING_TO_SECTION[m.group(1).lower()]
+            sections.setdefault(current, [])
+            continue
+        if current and line.strip():
+            sections[current].append(line.strip())
+    return {name: "\n".join(lines) for name, lines in sections.items()}
+
+
+def _clip(text: str, limit: int) -> str:
+    text = re.sub(r"\s+", " ", text).strip()
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def analyze_resume(text: str) -> dict:
+    skills = extract_skills(text)
+    return {
+        "skills": [s for s, _ in skills.most_common()],
+        "sections": split_sections(text),
+    }
+
+
+def summarize_resume(text: str, max_chars: int = SUMMARY_MAX_CHARS, analysis: dict = None) -> str:
+    analysis = analysis or analyze_resume(text)
+    parts = []
+    if analysis["skills"]:
+        parts.append("Skills: " + ", ".join(analysis["skills"][:25]))
+    sections = analysis["sections"]
+    for name in ("summary", "experience", "projects", "education", "certifications"):
+        if sections.get(name):
+            parts.append(f"{name.title()}: {_clip(sections[name], _SECTION_BUDGET[name])}")
+    if not sections:
+        parts.append("Resume excerpt: " + _clip(text or "", max_chars // 2))
+    summary = "\n".join(parts)
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(" ", 1)[0] + "…"
+    return summary
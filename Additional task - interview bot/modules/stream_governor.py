@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from modules import metrics
+
+# Per-process admission control for WebRTC interview streams. Each session
+# holds a lease (renewed by its frame callbacks) and gets media constraints
+# picked from the load at admission time: full quality while the node is
+# quiet, lower resolution/frame rate as it fills up, audio-only near the top,
+# and a bounded FIFO wait list once every slot is taken.
+
+MAX_STREAMS = int(os.getenv("GOVERNOR_MAX_STREAMS", "16"))
+AUDIO_ONLY_AT = float(os.getenv("GOVERNOR_AUDIO_ONLY_AT", "0.85"))
+MAX_QUEUED = int(os.getenv("GOVERNOR_MAX_QUEUED", "8"))
+LEASE_SECONDS = float(os.getenv("GOVERNOR_LEASE_SECONDS", "120"))
+POLL_SECONDS = float(os.getenv("GOVERNOR_POLL_SECONDS", "5"))
+USE_LOADAVG = os.getenv("GOVERNOR_USE_LOADAVG", "0") == "1"
+
+# (load below, width, height, fps); load = share of MAX_STREAMS in use.
+VIDEO_TIERS = (
+    (0.5, 640, 480, 24),
+    (0.7, 480, 360, 15),
+    (AUDIO_ONLY_AT, 320, 240, 10),
+)
+
+
+class Admission:
+    def __init__(self, status: str, constraints: dict = None, tier: str = None, position: int = 0):
+        self.status = status  # "admitted", "queued" or "rejected"
+        self.constraints = constraints
+        self.tier = tier
+        self.position = position
+
+    @property
+    def admitted(self) -> bool:
+        return self.status == "admitted"
+
+    @property
+    def video(self) -> bool:
+        return bool(self.constraints and self.constraints.get("video"))
+
+
+def constraints_for(load: float) -> tuple:
+    for limit, width, height, fps in VIDEO_TIERS:
+        if load < limit:
+            video = {
+                "width": {"ideal": width, "max": width},
+                "height": {"ideal": height, "max": height},
+                "frameRate": {"ideal": fps, "max": fps},
+            }
+            return f"{height}p{fps}", {"video": video, "audio": True}
+    return "audio_only", {"video": False, "audio": True}
+
+
+def _cpu_load() -> float:
+    try:
+        return os.getloadavg()[0] / len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return 0.0
+
+
+class StreamGovernor:
+    def __init__(self, max_streams: int = MAX_STREAMS, max_queued: int = MAX_QUEUED, lease_seconds: float = LEASE_SECONDS):
+        self.max_streams = max_streams
+        self.max_queued = max_queued
+        self.lease_seconds = lease_seconds
+        self._active = {}  # session id -> [last seen, Admission]
+        self._waiting = OrderedDict()  # session id -> last poll
+        # Rejected sessions, so "rejected" counts sessions rather than reruns.
+        self._rejected = OrderedDict()  # session id -> last attempt
+        self._lock = threading.Lock()
+        self.stats = {"admitted": 0, "queued": 0, "rejected": 0, "rejected_attempts": 0, "expired": 0, "peak_active": 0}
+        self.tier_counts = {}
+
+    def _expire(self, now: float):
+        for sid in [s for s, (seen, _) in self._active.items() if now - seen > self.lease_seconds]:
+            del self._active[sid]
+            self.stats["expired"] += 1
+        # Queued sessions poll every POLL_SECONDS; one that stops polling gives up its place.
+        for sid in [s for s, seen in self._waiting.items() if now - seen > 3 * POLL_SECONDS]:
+            del self._waiting[sid]
+        for sid in [s for s, seen in self._rejected.items() if now - seen > self.lease_seconds]:
+            del self._rejected[sid]
+
+    def load(self) -> float:
+        load = len(self._active) / self.max_streams if self.max_streams else 1.0
+        return max(load, _cpu_load()) if USE_LOADAVG else load
+
+    def acquire(self, session_id: str) -> Admission:
+        # Idempotent per session: an admitted session keeps its constraints, so
+        # reruns do not renegotiate the stream.
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            lease = self._active.get(session_id)
+            if lease is not None:
+                lease[0] = now
+                return lease[1]
+            head = next(iter(self._waiting), None)
+            if len(self._active) < self.max_streams and head in (None, session_id):
+                self._waiting.pop(session_id, None)
+                self._rejected.pop(session_id, None)
+                tier, constraints = constraints_for(self.load())
+                admission = Admission("admitted", constraints, tier)
+                self._active[session_id] = [now, admission]
+                self.stats["admitted"] += 1
+                self.stats["peak_active"] = max(self.stats["peak_active"], len(self._active))
+                self.tier_counts[tier] = self.tier_counts.get(tier, 0) + 1
+                return admission
+            if session_id in self._waiting or len(self._waiting) < self.max_queued:
+                if session_id not in self._waiting:
+                    self.stats["queued"] += 1
+                self._rejected.pop(session_id, None)
+                self._waiting[session_id] = now
+                return Admission("queued", position=list(self._waiting).index(session_id) + 1)
+            self.stats["rejected_attempts"] += 1
+            if session_id not in self._rejected:
+                self.stats["rejected"] += 1
+            self._rejected[session_id] = now
+            return Admission("rejected")
+
+    def touch(self, session_id: str):
+        # Called from frame callbacks; a plain timestamp store, no lock needed.
+        lease = self._active.get(session_id)
+        if lease is not None:
+            lease[0] = time.monotonic()
+
+    def release(self, session_id: str):
+        with self._lock:
+            self._active.pop(session_id, None)
+            self._waiting.pop(session_id, None)
+            self._rejected.pop(session_id, None)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            metrics = dict(self.stats)
+            metrics.update(
+                active=len(self._active),
+                waiting=len(self._waiting),
+                max_streams=self.max_streams,
+                load=self.load(),
+                active_by_tier={},
+                admitted_by_tier=dict(self.tier_counts),
+            )
+            for _, admission in self._active.values():
+                metrics["active_by_tier"][admission.tier] = metrics["active_by_tier"].get(admission.tier, 0) + 1
+        return metrics
+
+
+_governor = StreamGovernor()
+
+
+metrics.register_collector("webrtc", _governor.metrics)
+
+
+def get_governor() -> StreamGovernor:
+    return _governor
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from gtts import gTTS
+from modules import metrics
+from modules.result_cache import LRU, SingleFlight
+
+# Question audio: synthesised in memory, cached by hash of (text, lang, engine)
+# in a bounded memory LRU backed by a bounded disk directory, and prefetched on
+# a small thread pool so "Next" can play immediately.
+
+MEMORY_MAX_BYTES = int(os.getenv("TTS_MEMORY_MAX_BYTES", str(16 * 1024 * 1024)))
+DISK_MAX_BYTES = int(os.getenv("TTS_DISK_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "interview_bot_tts"))
+PREFETCH_WORKERS = int(os.getenv("TTS_PREFETCH_WORKERS", "4"))
+
+
+class GTTSSynthesizer:
+    name = "gtts"
+
+    def __call__(self, text: str, lang: str) -> bytes:
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class StubSynthesizer:
+    # Offline stand-in: deterministic bytes, optional artificial latency.
+    name = "stub"
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, text: str, lang: str) -> bytes:
+        self.calls += 1
+        time.sleep(self.latency)
+        return b"ID3" + hashlib.sha256(f"{lang}:{text}".encode("utf-8")).digest() * 64
+
+
+_SYNTHESIZERS = {"gtts": GTTSSynthesizer, "stub": StubSynthesizer}
+
+
+class AudioCache:
+    def __init__(self, memory_max_bytes: int = MEMORY_MAX_BYTES, disk_max_bytes: int = DISK_MAX_BYTES, cache_dir: str = CACHE_DIR):
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.cache_dir = cache_dir
+        self._lru = LRU(memory_max_bytes, weigh=len, stats=("disk_hits", "misses"))
+        self.stats = self._lru.stats
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _remember(self, key: str, audio: bytes):
+        self._lru.put(key, audio)
+
+    def get(self, key: str):
+        audio = self._lru.get(key)
+        if audio is not None:
+            return audio
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                audio = None
+            if audio is not None:
+                self._remember(key, audio)
+                self._lru.count("disk_hits")
+                return audio
+        self._lru.count("misses")
+        return None
+
+    def put(self, key: str, audio: bytes):
+        self._remember(key, audio)
+        if not self.cache_dir:
+            return
+        tmp = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, self._path(key))
+        self._trim_disk()
+
+    def _trim_disk(self):
+        try:
+            files = [e for e in os.scandir(self.cache_dir) if e.name.endswith(".mp3")]
+        except OSError:
+            return
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path) for e in files]
+        total = sum(size for _, size, _ in stats)
+        for _, size, path in sorted(stats):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def info(self) -> dict:
+        info = self._lru.info()
+        info["bytes"] = self._lru.weight
+        return info
+
+
+_synthesizer = _SYNTHESIZERS[os.getenv("TTS_ENGINE", "gtts")]()
+_cache = None
+_pool = None
+_init_lock = threading.Lock()
+_in_flight = SingleFlight()
+
+
+def set_synthesizer(synthesizer):
+    global _synthesizer
+    _synthesizer = synthesizer
+
+
+def get_audio_cache() -> AudioCache:
+    global _cache
+    if _cache is None:
+        with _init_lock:
+            if _cache is None:
+                _cache = AudioCache()
+    return _cache
+
+
+metrics.register_collector("tts_cache", lambda: get_audio_cache().info())
+
+
+def audio_key(text: str, lang: str = "en") -> str:
+    return hashlib.sha256(f"{_synthesizer.name}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+def get_audio(text: str, lang: str = "en") -> bytes:
+    key = audio_key(text, lang)
+    cache = get_audio_cache()
+    audio = cache.get(key)
+    if audio is not None:
+        return audio
+
+    def synthesize():
+        audio = _synthesizer(text, lang)
+        cache.put(key, audio)
+        return audio
+
+    return _in_flight.do(key, synthesize)
+
+
+def _prefetch_one(text: str, lang: str):
+    try:
+        get_audio(text, lang)
+    except Exception:
+        # Best effort: the Interview page synthesises on demand if this failed.
+        pass
+
+
+def prefetch(texts, lang: str = "en"):
+    global _pool
+    if _pool is None:
+        with _init_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="tts-prefetch")
+    return [_pool.submit(_prefetch_one, text, lang) for text in texts]
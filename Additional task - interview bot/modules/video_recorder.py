@@ -1,4 +1,7 @@
+import uuid
 import streamlit as st
+from modules import recording
+from modules.stream_governor import POLL_SECONDS, get_governor
 try:
     from streamlit_webrtc import webrtc_streamer
     from streamlit_webrtc import WebRtcMode
@@ -8,7 +11,29 @@ except Exception:
     WebRtcMode = None
     _WEBRTC_AVAILABLE = False
 
-def video_interview_ui(container):
+def _recording_id() -> str:
+    if "recording_id" not in st.session_state:
+        st.session_state.recording_id = uuid.uuid4().hex
+    return st.session_state.recording_id
+
+
+def stop_recording():
+    # Finalise the current segment file and free the stream slot, e.g. when the
+    # candidate leaves the interview.
+    if "recording_id" in st.session_state:
+        recording.stop_recorder(st.session_state.recording_id)
+        get_governor().release(st.session_state.recording_id)
+
+
+@st.fragment(run_every=POLL_SECONDS)
+def _wait_for_slot(session_id: str):
+    admission = get_governor().acquire(session_id)
+    if admission.admitted:
+        st.rerun()
+    st.info(f"⏳ All recording slots are busy. You are #{admission.position} in line; recording starts automatically.")
+
+
+def video_interview_ui(container, question_index: int = 0):
     container.subheader("Candidate Recording")
 
     # If recording not started yet → show button
@@ -22,13 +47,44 @@ def video_interview_ui(container):
     stopped_now = False
     with container:
         if _WEBRTC_AVAILABLE:
+            session_id = _recording_id()
+            governor = get_governor()
+            admission = governor.acquire(session_id)
+            if admission.status == "queued":
+                _wait_for_slot(session_id)
+                container.markdown("You can already answer the questions while you wait.")
+                return {"active": True, "stopped": False}
+            if admission.status == "rejected":
+                container.warning("Recording is at capacity right now. You can still proceed with the interview questions.")
+                return {"active": True, "stopped": False}
+            if not admission.video:
+                container.caption("🎙️ High load: recording audio only.")
+            recorder = recording.get_recorder(session_id, video=admission.video)
+
+            # The callbacks run on the WebRTC worker threads and only enqueue;
+            # encoding happens on the recorder's own thread. Each frame also
+            # renews this session's stream slot.
+            def on_video_frame(frame):
+                governor.touch(session_id)
+                return recorder.on_video_frame(frame)
+
+            def on_audio_frame(frame):
+                governor.touch(session_id)
+                return recorder.on_audio_frame(frame)
+
             ctx = webrtc_streamer(
                 key="interview_whole",
                 mode=WebRtcMode.SENDRECV if WebRtcMode else None,
-                media_stream_constraints={"video": True, "audio": True},
+                media_stream_constraints=admission.constraints,
+                video_frame_callback=on_video_frame if admission.video else None,
+                audio_frame_callback=on_audio_frame,
                 async_processing=True
             )
             is_playing = bool(getattr(getattr(ctx, "state", None), "playing", False)) if ctx else False
+            if is_playing:
+                recorder.start_segment(question_index)
+            else:
+                recorder.pause()
             was_playing = st.session_state.get("webrtc_was_playing", False)
             if was_playing and not is_playing:
                 stopped_now = True